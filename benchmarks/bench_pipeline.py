@@ -0,0 +1,345 @@
+"""
+Benchmark the reconciliation pipeline on synthetic data
+
+Each case generates (or reuses) a schedule sheet and a Logic ERP export of
+the given size and format, then runs the process_files stages one by one,
+followed by Job Lookup through a JobIndex and through find_job_pos() on the
+raw DataFrame. Wall time is recorded for every stage; a second, traced pass
+records the peak memory allocated within each stage.
+
+Results are written as JSON and can be compared against an earlier run:
+
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 100000
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 --compare benchmarks/results/old.json
+
+Exit code 1 means a stage regressed past --threshold against --compare, or
+grew faster than the row count between sizes (a scaling regression).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import synthetic  # puts src/ on sys.path
+from processor import (RESULT_SHEET_NAME, read_schedule_file, read_production_file,  # noqa: E402
+                       read_concurrently, prepare_production_data, prepare_schedule_data,
+                       index_production_data, match_schedule, save_report, find_job_pos)
+from job_index import JobIndex  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Reading xlsx through openpyxl is slow; larger cases run as CSV only
+XLSX_MAX_ROWS = 100000
+
+# Stages shorter than this are too noisy to flag
+MIN_COMPARE_SECONDS = 0.1
+
+# Allowed growth of a stage's time per row between two sizes
+SCALING_TOLERANCE = 2.0
+
+STAGES = ['read_schedule', 'read_production', 'read_concurrent', 'prepare_production',
+          'prepare_schedule', 'index', 'match', 'write', 'job_index', 'find_job_pos',
+          'find_job_pos_dataframe']
+
+# Both reads again, issued together as process_files() does; left out of
+# the total since the sequential reads already count
+OVERLAP_STAGES = ['read_concurrent']
+
+def quiet(message):
+    pass
+
+class StageTimer:
+    """
+    Wall time and, when tracing, peak traced memory per named stage
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+
+        entry = {'seconds': round(seconds, 4)}
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            entry['peak_mb'] = round((peak - baseline) / 2 ** 20, 2)
+        self.stages[name] = entry
+
+def run_pipeline(schedule_path, production_path, output_path, lookups, trace_memory=False):
+    """
+    Run every benchmarked stage once
+
+    Returns:
+        Tuple of (stage dict, matched count, unmatched count)
+    """
+    timer = StageTimer(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            with timer.stage('read_schedule'):
+                df1 = read_schedule_file(schedule_path, [synthetic.SCHEDULE_SHEET_NAME])
+                df1 = df1[synthetic.SCHEDULE_SHEET_NAME]
+            with timer.stage('read_production'):
+                df2 = read_production_file(production_path, dtype=str)
+            with timer.stage('read_concurrent'):
+                read_concurrently([
+                    (schedule_path, read_schedule_file,
+                     (schedule_path, [synthetic.SCHEDULE_SHEET_NAME])),
+                    (production_path, read_production_file, (production_path, str))
+                ])
+            with timer.stage('prepare_production'):
+                df2 = prepare_production_data(df2, quiet)
+            with timer.stage('prepare_schedule'):
+                df1 = prepare_schedule_data(df1, quiet)
+            with timer.stage('index'):
+                production_index = index_production_data(df2, quiet)
+            with timer.stage('match'):
+                output_df, matched, unmatched = match_schedule(df1, production_index, quiet)
+            with timer.stage('write'):
+                save_report(output_path, {RESULT_SHEET_NAME: output_df}, quiet)
+            with timer.stage('job_index'):
+                job_index = JobIndex(df2)
+            with timer.stage('find_job_pos'):
+                for job in lookups:
+                    find_job_pos(job_index, job)
+            with timer.stage('find_job_pos_dataframe'):
+                find_job_pos(df2, lookups[0])
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    timer.stages['find_job_pos']['lookups'] = len(lookups)
+    return timer.stages, matched, unmatched
+
+def max_rss_mb():
+    """
+    Process peak resident memory so far, or None where unavailable
+
+    Arrow-backed string columns are allocated outside tracemalloc, so this
+    catches what the traced peaks miss. Cases run smallest first, so each
+    value is the high-water mark up to and including that case.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return round(peak / 2 ** (20 if sys.platform == 'darwin' else 10), 1)
+
+def run_case(rows, file_format, args):
+    """Generate inputs for one case and benchmark them"""
+    schedule_path, production_path = synthetic.generate_dataset(
+        args.data_dir, rows, file_format, args.schedule_ratio, args.seed,
+        args.duplicate_rate, not args.clean)
+    lookups = synthetic.lookup_jobs(rows, args.seed, args.duplicate_rate)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'report.xlsx')
+
+        runs = [run_pipeline(schedule_path, production_path, output_path, lookups)
+                for _ in range(args.repeat)]
+        stages, matched, unmatched = runs[0]
+        for name in stages:
+            stages[name]['seconds'] = min(run[0][name]['seconds'] for run in runs)
+
+        if args.memory:
+            traced, _, _ = run_pipeline(schedule_path, production_path, output_path,
+                                        lookups, trace_memory=True)
+            for name, entry in traced.items():
+                stages[name]['peak_mb'] = entry['peak_mb']
+
+    return {
+        'format': file_format,
+        'rows': rows,
+        'schedule_rows': matched + unmatched,
+        'matched': matched,
+        'unmatched': unmatched,
+        'stages': stages,
+        'max_rss_mb': max_rss_mb(),
+        'total_seconds': round(sum(entry['seconds'] for name, entry in stages.items()
+                                   if name not in OVERLAP_STAGES), 4)
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def case_key(case):
+    return case['format'], case['rows']
+
+def print_cases(cases):
+    """Stage timings (and peak memory, if traced) with one column per case"""
+    labels = [f"{case['format']} {case['rows']:,}" for case in cases]
+    width = max([14] + [len(label) + 2 for label in labels])
+    print(f"{'seconds':<24}" + ''.join(f"{label:>{width}}" for label in labels))
+    for name in STAGES:
+        print(f"{name:<24}" + ''.join(f"{case['stages'][name]['seconds']:>{width}.3f}"
+                                      for case in cases))
+    print(f"{'total':<24}" + ''.join(f"{case['total_seconds']:>{width}.3f}" for case in cases))
+    print(f"{'max RSS MB':<24}" + ''.join(f"{case['max_rss_mb'] or 0:>{width}.1f}" for case in cases))
+
+    if any('peak_mb' in entry for case in cases for entry in case['stages'].values()):
+        print(f"\n{'peak traced MB':<24}" + ''.join(f"{label:>{width}}" for label in labels))
+        for name in STAGES:
+            print(f"{name:<24}" + ''.join(f"{case['stages'][name].get('peak_mb', 0):>{width}.1f}"
+                                          for case in cases))
+
+def compare(cases, baseline_cases, threshold):
+    """
+    Stages slower than threshold x the baseline for the same case
+
+    Returns:
+        List of (case label, stage, old seconds, new seconds)
+    """
+    baseline = {case_key(case): case for case in baseline_cases}
+    regressions = []
+    for case in cases:
+        old = baseline.get(case_key(case))
+        if old is None:
+            continue
+        for name, entry in case['stages'].items():
+            old_seconds = old['stages'].get(name, {}).get('seconds')
+            if old_seconds is None or max(old_seconds, entry['seconds']) < MIN_COMPARE_SECONDS:
+                continue
+            if entry['seconds'] > old_seconds * threshold:
+                regressions.append((f"{case['format']} {case['rows']:,}", name,
+                                    old_seconds, entry['seconds']))
+    return regressions
+
+def scaling_regressions(cases):
+    """
+    Stages whose time grows much faster than the row count between
+    consecutive sizes of the same format
+
+    Returns:
+        List of (format, stage, smaller rows, larger rows, time ratio)
+    """
+    flagged = []
+    for file_format in sorted({case['format'] for case in cases}):
+        runs = sorted((case for case in cases if case['format'] == file_format),
+                      key=lambda case: case['rows'])
+        for small, large in zip(runs, runs[1:]):
+            row_ratio = large['rows'] / small['rows']
+            for name in STAGES:
+                before = small['stages'][name]['seconds']
+                after = large['stages'][name]['seconds']
+                if after < MIN_COMPARE_SECONDS or before <= 0:
+                    continue
+                time_ratio = after / before
+                if time_ratio > row_ratio * SCALING_TOLERANCE:
+                    flagged.append((file_format, name, small['rows'], large['rows'],
+                                    round(time_ratio, 1)))
+    return flagged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the reconciliation pipeline')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='Production export row counts (default: 1000 10000 100000)')
+    parser.add_argument('--formats', nargs='+', choices=['csv', 'xlsx'], default=['csv', 'xlsx'])
+    parser.add_argument('--xlsx-max-rows', type=int, default=XLSX_MAX_ROWS,
+                        help='Skip xlsx cases above this size')
+    parser.add_argument('--schedule-ratio', type=float, default=0.5,
+                        help='Schedule rows per production row (default: 0.5)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.02,
+                        help='Share of export rows repeating a (job, order) pair')
+    parser.add_argument('--clean', action='store_true',
+                        help='Use standard headers and values instead of messy ones')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Timed runs per case; the fastest is kept')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='Skip the traced pass for peak memory')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<time>.json)')
+    parser.add_argument('--compare', metavar='RESULTS', help='Earlier results file to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown factor reported as a regression (default: 1.25)')
+    args = parser.parse_args(argv)
+
+    cases = []
+    for rows in sorted(args.sizes):
+        for file_format in args.formats:
+            if file_format == 'xlsx' and rows > args.xlsx_max_rows:
+                print(f"Skipping xlsx {rows:,} (above --xlsx-max-rows)", file=sys.stderr)
+                continue
+            print(f"Running {file_format} {rows:,}...", file=sys.stderr)
+            cases.append(run_case(rows, file_format, args))
+
+    results = {'environment': environment(), 'settings': {
+        'schedule_ratio': args.schedule_ratio,
+        'duplicate_rate': args.duplicate_rate,
+        'messy': not args.clean,
+        'seed': args.seed,
+        'repeat': args.repeat
+    }, 'cases': cases}
+
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print_cases(cases)
+    print(f"\nResults saved to {output_path}")
+
+    failed = False
+    for file_format, name, small, large, ratio in scaling_regressions(cases):
+        print(f"⚠️ Scaling: {file_format} {name} took {ratio}x longer from {small:,} to {large:,} rows")
+        failed = True
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(cases, baseline['cases'], args.threshold)
+        print(f"\nCompared with {args.compare} ({baseline['environment'].get('commit')})")
+        for label, name, old_seconds, new_seconds in regressions:
+            print(f"⚠️ Regression: {label} {name} {old_seconds:.3f}s -> {new_seconds:.3f}s")
+            failed = True
+        if not regressions:
+            print("No regressions")
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
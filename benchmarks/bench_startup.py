@@ -0,0 +1,154 @@
+"""
+Measure GUI startup: time to first window and time to first Job Lookup
+
+Every probe runs in a fresh interpreter so import costs are counted. Times
+are measured from process spawn (interpreter startup included) and from the
+start of the probe script.
+
+- import: `import main`; also checks that no deferred module (pandas,
+  numpy, openpyxl, processor, ...) was imported with it
+- window: builds ProdSyncApp and draws it (needs a display)
+- lookup: loads a production export through the app, waits for the job
+  index and runs one search (needs a display); with a cold and a warm
+  dataset cache
+- lookup_headless: the same load, index and find_job_pos calls without Tk,
+  for machines without a display
+
+    python benchmarks/bench_startup.py [--rows 10000] [--format xlsx]
+
+Exit code 1 means a deferred module was imported with main.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic  # puts src/ on sys.path
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+PROBE_SETUP = """
+import json, os, sys, time
+spawned = float(sys.argv[1])
+started = time.perf_counter()
+sys.path.insert(0, {src!r})
+
+def elapsed():
+    return {{'since_spawn_s': round(time.time() - spawned, 4),
+             'since_start_s': round(time.perf_counter() - started, 4)}}
+"""
+
+PROBES = {
+    'import': """
+import main
+result = elapsed()
+deferred = ['pandas', 'numpy', 'openpyxl', 'processor', 'incremental', 'job_index']
+result['deferred_loaded'] = [name for name in deferred if name in sys.modules]
+print(json.dumps(result))
+""",
+    'window': """
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.ProdSyncApp(root)
+root.update()
+print(json.dumps(elapsed()))
+root.destroy()
+""",
+    'lookup': """
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.ProdSyncApp(root)
+root.update()
+window = elapsed()
+app.file2_path.set({production!r})
+app.load_data_sheet2()
+while app.job_index is None and app.loading:
+    root.update()
+    time.sleep(0.005)
+app.job_entry.set({job!r})
+app.find_pos()
+result = elapsed()
+result['window'] = window
+result['rows_shown'] = len(app.po_tree.get_children())
+print(json.dumps(result))
+root.destroy()
+""",
+    'lookup_headless': """
+import main
+from processor import load_production_data, find_job_pos
+from job_index import JobIndex
+df2 = load_production_data({production!r}, log=lambda message: None)
+results = find_job_pos(JobIndex(df2), {job!r})
+result = elapsed()
+result['rows_shown'] = len(results)
+print(json.dumps(result))
+"""
+}
+
+def run_probe(name, cache_dir, **values):
+    """Run one probe in a fresh interpreter and return its JSON result"""
+    code = PROBE_SETUP.format(src=os.path.abspath(SRC_DIR)) + PROBES[name].format(**values)
+    env = dict(os.environ, PRODSYNC_CACHE_DIR=cache_dir)
+    completed = subprocess.run([sys.executable, '-c', code, repr(time.time())],
+                               capture_output=True, text=True, env=env)
+    # The result is the last JSON line; find_job_pos prints progress before it
+    for line in reversed(completed.stdout.strip().splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    return {'error': (completed.stderr.strip().splitlines() or ['no output'])[-1]}
+
+def display_available():
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure GUI startup and first lookup')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='Production export rows for the lookup probes')
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='xlsx')
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(__file__), 'data'))
+    parser.add_argument('--output', help='Also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    _, production_path = synthetic.generate_dataset(args.data_dir, args.rows, args.format)
+    job = synthetic.lookup_jobs(args.rows)[0]
+
+    gui = display_available()
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results['import'] = run_probe('import', cache_dir)
+        if gui:
+            results['window'] = run_probe('window', cache_dir)
+        lookup = 'lookup' if gui else 'lookup_headless'
+        results[f"{lookup}_cold_cache"] = run_probe(lookup, cache_dir,
+                                                    production=production_path, job=job)
+        results[f"{lookup}_warm_cache"] = run_probe(lookup, cache_dir,
+                                                    production=production_path, job=job)
+
+    if not gui:
+        print("No display: window probes skipped, lookup measured without Tk")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<28} error: {result['error']}")
+        else:
+            print(f"{name:<28} {result['since_spawn_s']:>8.3f}s from spawn "
+                  f"{result['since_start_s']:>8.3f}s in process")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'rows': args.rows, 'format': args.format, 'results': results}, f, indent=2)
+
+    deferred = results['import'].get('deferred_loaded')
+    if deferred:
+        print(f"⚠️ Imported at startup: {', '.join(deferred)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Synthetic schedule sheets and Logic ERP exports for benchmarking
+
+Production exports carry the full ERP column set from src/idea.txt with
+numeric job numbers (196) and PO numbers; schedule sheets reference them
+with full job numbers ("SGL-25-00196"), bare or padded numbers, and a share
+of rows that cannot match. A fraction of export rows repeat an earlier
+(job, order) pair, as real exports do. With messy=True headers use the
+alternative spellings from the alias lists, schedule sheets get stray
+columns and PO numbers get case and whitespace noise.
+
+Exports are generated in chunks so a 1M-row CSV never has to be held in
+memory; xlsx files are built from the concatenated chunks.
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from processor import COL_MAPPING_DF1, COL_MAPPING_DF2  # noqa: E402
+from report_writer import write_report  # noqa: E402
+
+# Logic ERP export columns, as listed in src/idea.txt
+ERP_COLUMNS = [
+    'Order No', 'LC/SC', 'Buyer Name', 'Job Year', 'Job No', 'Style Name', 'File No',
+    'Internal Ref', 'Team Name', 'Team Member', 'Agent Name', 'Img', 'Item Name', 'SMV',
+    'Order Qty.', 'Unit Price', 'Order Value', 'PO insert Date', 'Ship Date',
+    'Ex-Factory Date', 'PP Approved Date', 'Days in Hand', 'Stan. Exc. Cut %',
+    'Plan Cut Qty', 'Total Cut Qty', 'Cutting balance', 'Actual Exc. Cut %',
+    'Total Emb. Issue Qty', 'Total Emb. Rcv. Qty', 'Total Sew Input Qty',
+    'Total Sew Output Qty', 'GMT Finishing Rcv', 'Fin. Rcv', 'Total Iron Qty',
+    'Total Re-Iron Qty', 'Total Woven Finish Qty', 'Total Packing Finish Qty', 'Ins Qty',
+    'Ready To Ship Qty', 'Fin Goods Status', 'Reject Qty', 'Total Ship Out',
+    'Ship Out Value', 'Shortage/ Excess', 'Order Status', 'Active Status',
+    'Shipping Status', 'production remarks', 'Order Remarks'
+]
+
+SCHEDULE_SHEET_NAME = 'Target'
+
+JOB_PREFIX = 'SGL-25-'
+JOB_WIDTH = 5
+
+# Known jobs are drawn below UNKNOWN_JOB_START; unmatched schedule rows use
+# job numbers at or above it
+UNKNOWN_JOB_START = 90000
+
+ROWS_PER_JOB = 20
+CHUNK_ROWS = 100000
+
+BUYERS = ['Target', 'Kmart', 'Big W', 'Myer']
+TEAMS = ['Team A', 'Team B', 'Team C', 'Team D', 'Team E']
+MEMBERS = ['Rahim', 'Karim', 'Nasir', 'Sumi', 'Tania', 'Jamal']
+AGENTS = ['Direct', 'Agent 1', 'Agent 2']
+ITEMS = ['T-Shirt', 'Polo Shirt', 'Hoodie', 'Jogger', 'Tank Top', 'Shorts', 'Cardigan']
+ORDER_STATUSES = ['Confirmed', 'Projected']
+ACTIVE_STATUSES = ['Active', 'Inactive']
+SHIPPING_STATUSES = ['Full Pending', 'Partial Shipment', 'Full Shipment']
+FIN_GOODS_STATUSES = ['In Hand', 'Shipped']
+COLORS = ['Black', 'White', 'Navy', 'Red', 'Heather Grey', 'Olive']
+DATES = pd.date_range('2025-01-01', periods=365).strftime('%d-%b-%Y').to_numpy()
+
+def messy_headers(mapping):
+    """Standard column -> alternative alias spelling, where one exists"""
+    return {std_col: names[1] for std_col, names in mapping.items() if len(names) > 1}
+
+def production_keys(rows, seed=0, duplicate_rate=0.02):
+    """
+    Job numbers and PO numbers for every export row
+
+    Returns:
+        Tuple of (job number array, PO number array), both int64
+    """
+    rng = np.random.default_rng(seed)
+    job_count = max(5, min(rows // ROWS_PER_JOB, UNKNOWN_JOB_START - 1))
+    job_numbers = rng.choice(np.arange(1, UNKNOWN_JOB_START), job_count, replace=False)
+
+    jobs = job_numbers[rng.integers(0, job_count, rows)]
+    orders = 4500000000 + rng.permutation(rows).astype('int64')
+
+    # Repeat an earlier row's (job, order) pair
+    duplicate = rng.random(rows) < duplicate_rate
+    duplicate[0] = False
+    source = (rng.random(rows) * np.arange(rows)).astype('int64')
+    jobs[duplicate] = jobs[source[duplicate]]
+    orders[duplicate] = orders[source[duplicate]]
+
+    return jobs, orders
+
+def production_chunks(rows, seed=0, duplicate_rate=0.02, messy=False, chunk_rows=CHUNK_ROWS):
+    """
+    Yield the export in DataFrame chunks with every column as text
+    """
+    jobs, orders = production_keys(rows, seed, duplicate_rate)
+    rng = np.random.default_rng(seed + 1)
+    headers = messy_headers(COL_MAPPING_DF2) if messy else {}
+
+    def pick(pool, n):
+        return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n)]
+
+    for start in range(0, rows, chunk_rows):
+        stop = min(start + chunk_rows, rows)
+        n = stop - start
+        job = jobs[start:stop]
+
+        # Each stage is a share of the one before it
+        order_qty = rng.integers(100, 5000, n)
+        plan_cut = np.ceil(order_qty * 1.03).astype('int64')
+        cut = (plan_cut * rng.uniform(0.6, 1.0, n)).astype('int64')
+        sew_in = (cut * rng.uniform(0.7, 1.0, n)).astype('int64')
+        sew_out = (sew_in * rng.uniform(0.7, 1.0, n)).astype('int64')
+        iron = (sew_out * rng.uniform(0.8, 1.0, n)).astype('int64')
+        packing = (iron * rng.uniform(0.8, 1.0, n)).astype('int64')
+        ship = (packing * rng.uniform(0.0, 1.0, n)).astype('int64')
+        unit_price = np.round(rng.uniform(1.5, 12.0, n), 2)
+
+        order_no = pd.Series(orders[start:stop]).astype(str)
+        if messy:
+            padded = rng.random(n) < 0.05
+            order_no[padded] = order_no[padded] + ' '
+
+        columns = {col: '' for col in ERP_COLUMNS}
+        columns.update({
+            'Order No': order_no.to_numpy(),
+            'LC/SC': pick(['LC', 'SC'], n),
+            'Buyer Name': pick(BUYERS, n),
+            'Job Year': '2025',
+            'Job No': job.astype(str),
+            'Style Name': np.char.add('ST-', job.astype(str)),
+            'File No': np.char.add('F-', (job % 500).astype(str)),
+            'Team Name': pick(TEAMS, n),
+            'Team Member': pick(MEMBERS, n),
+            'Agent Name': pick(AGENTS, n),
+            'Item Name': pick(ITEMS, n),
+            'SMV': np.round(rng.uniform(4, 25, n), 2).astype(str),
+            'Order Qty.': order_qty.astype(str),
+            'Unit Price': unit_price.astype(str),
+            'Order Value': np.round(order_qty * unit_price, 2).astype(str),
+            'PO insert Date': pick(DATES, n),
+            'Ship Date': pick(DATES, n),
+            'Ex-Factory Date': pick(DATES, n),
+            'PP Approved Date': pick(DATES, n),
+            'Days in Hand': rng.integers(-30, 120, n).astype(str),
+            'Stan. Exc. Cut %': '3',
+            'Plan Cut Qty': plan_cut.astype(str),
+            'Total Cut Qty': cut.astype(str),
+            'Cutting balance': (plan_cut - cut).astype(str),
+            'Total Sew Input Qty': sew_in.astype(str),
+            'Total Sew Output Qty': sew_out.astype(str),
+            'Total Iron Qty': iron.astype(str),
+            'Total Packing Finish Qty': packing.astype(str),
+            'Ready To Ship Qty': (packing - ship).astype(str),
+            'Fin Goods Status': pick(FIN_GOODS_STATUSES, n),
+            'Total Ship Out': ship.astype(str),
+            'Ship Out Value': np.round(ship * unit_price, 2).astype(str),
+            'Shortage/ Excess': (ship - order_qty).astype(str),
+            'Order Status': pick(ORDER_STATUSES, n),
+            'Active Status': pick(ACTIVE_STATUSES, n),
+            'Shipping Status': pick(SHIPPING_STATUSES, n)
+        })
+
+        chunk = pd.DataFrame(columns, index=pd.RangeIndex(start, stop))
+        yield chunk.rename(columns=headers)
+
+def schedule_frame(production_rows, schedule_rows, seed=0, duplicate_rate=0.02, messy=False):
+    """
+    Schedule sheet referencing the export built with the same seed
+
+    Row mix: 70% full job numbers ("SGL-25-00196"), 15% bare numbers
+    ("196"), 5% padded numbers ("00196"); 5% rows name an unknown job and
+    5% a known job with an unknown PO.
+    """
+    jobs, orders = production_keys(production_rows, seed, duplicate_rate)
+    rng = np.random.default_rng(seed + 2)
+
+    source = rng.integers(0, production_rows, schedule_rows)
+    job = pd.Series(jobs[source])
+    order_no = pd.Series(orders[source]).astype(str)
+
+    kind = rng.choice(5, schedule_rows, p=[0.70, 0.15, 0.05, 0.05, 0.05])
+    job[kind == 3] = rng.integers(UNKNOWN_JOB_START, 10 ** JOB_WIDTH, int((kind == 3).sum()))
+    order_no[kind == 4] = 'PO-' + order_no[kind == 4]
+
+    digits = job.astype(str)
+    job_no = (JOB_PREFIX + digits.str.zfill(JOB_WIDTH)).where(kind != 1, digits)
+    job_no = job_no.where(kind != 2, digits.str.zfill(JOB_WIDTH))
+
+    if messy:
+        noisy = rng.random(schedule_rows) < 0.10
+        order_no[noisy] = ' ' + order_no[noisy].str.lower() + ' '
+
+    df = pd.DataFrame({
+        'SL': np.arange(1, schedule_rows + 1),
+        'JOB NO': job_no.to_numpy(),
+        'Order No': order_no.to_numpy(),
+        'STYLE NO': np.char.add('ST-', job.to_numpy().astype(str)),
+        'COLOR': np.asarray(COLORS, dtype=object)[rng.integers(0, len(COLORS), schedule_rows)]
+    })
+
+    if messy:
+        df = df.rename(columns=messy_headers(COL_MAPPING_DF1))
+        df.insert(3, 'Unnamed: 3', '')
+        df['Remarks'] = ''
+    return df
+
+def lookup_jobs(production_rows, seed=0, duplicate_rate=0.02, count=20):
+    """Job numbers to look up: known jobs in full format plus one unknown"""
+    jobs, _ = production_keys(production_rows, seed, duplicate_rate)
+    rng = np.random.default_rng(seed + 3)
+    known = [f"{JOB_PREFIX}{job:0{JOB_WIDTH}d}" for job in rng.choice(jobs, count - 1)]
+    return known + [f"{JOB_PREFIX}{UNKNOWN_JOB_START:0{JOB_WIDTH}d}"]
+
+def write_frames(path, chunks, sheet_name):
+    """
+    Write DataFrame chunks to .csv (appending) or .xlsx, replacing path
+    only once the file is complete
+    """
+    stem, ext = os.path.splitext(path)
+    partial_path = f"{stem}.partial{ext}"
+    if ext == '.csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(partial_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    else:
+        write_report(partial_path, {sheet_name: pd.concat(chunks, ignore_index=True)})
+    os.replace(partial_path, path)
+
+def generate_dataset(data_dir, rows, file_format='csv', schedule_ratio=0.5, seed=0,
+                     duplicate_rate=0.02, messy=True):
+    """
+    Write a schedule file and production export, reusing earlier files
+    generated with the same parameters
+
+    Returns:
+        Tuple of (schedule path, production path)
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    schedule_rows = max(1, int(rows * schedule_ratio))
+    tag = f"{rows}-s{seed}-d{duplicate_rate}{'-messy' if messy else ''}"
+    schedule_path = os.path.join(data_dir, f"schedule-{schedule_rows}-{tag}.{file_format}")
+    production_path = os.path.join(data_dir, f"production-{tag}.{file_format}")
+
+    if not os.path.exists(production_path):
+        write_frames(production_path,
+                     production_chunks(rows, seed, duplicate_rate, messy),
+                     'Sheet1')
+    if not os.path.exists(schedule_path):
+        write_frames(schedule_path,
+                     [schedule_frame(rows, schedule_rows, seed, duplicate_rate, messy)],
+                     SCHEDULE_SHEET_NAME)
+
+    return schedule_path, production_path
@@ -0,0 +1,164 @@
+"""
+Stage-to-stage shortage analytics for report sheets
+
+Production runs Order Qty -> Plan Cut -> Cut -> Sew In -> Sew Out -> Iron ->
+Packing -> Ship Out. For every step the report gets the balance (previous
+stage minus this stage) and this stage as a percentage of the previous one,
+computed column-wise over the whole sheet. A percentage below 100 minus the
+stage's shortage tolerance, or above 100 plus its excess tolerance, is
+flagged; 'Shortage At' / 'Excess At' name the first flagged stage of each
+row. highlight_rules() describes the matching conditional formats, which
+the report writer applies to whole column ranges.
+"""
+import numpy as np
+import pandas as pd
+
+# (quantity column, stage label), in production order
+STAGE_FLOW = [
+    ('Order Qty.', 'Order'),
+    ('Plan Cut Qty', 'Plan Cut'),
+    ('Total Cut Qty', 'Cut'),
+    ('Total Sew Input Qty', 'Sew In'),
+    ('Total Sew Output Qty', 'Sew Out'),
+    ('Total Iron Qty', 'Iron'),
+    ('Total Packing Finish Qty', 'Packing'),
+    ('Total Ship Out', 'Ship Out')
+]
+
+# Allowed (shortage %, excess %) around 100% of the previous stage
+DEFAULT_TOLERANCE = (2.0, 5.0)
+STAGE_TOLERANCES = {
+    # Plan cut is raised above the order for cutting wastage
+    'Plan Cut': (0.0, 10.0)
+}
+
+SHORTAGE_COL = 'Shortage At'
+EXCESS_COL = 'Excess At'
+PERCENT_DECIMALS = 1
+
+def stage_steps():
+    """(previous column, column, label) for each stage after Order Qty"""
+    return [(STAGE_FLOW[i - 1][0], col, label) for i, (col, label) in enumerate(STAGE_FLOW) if i]
+
+def balance_col(label):
+    return f"{label} Balance"
+
+def percent_col(label):
+    return f"{label} %"
+
+ANALYTICS_COLS = ([balance_col(label) for _, _, label in stage_steps()] +
+                  [percent_col(label) for _, _, label in stage_steps()] +
+                  [SHORTAGE_COL, EXCESS_COL])
+
+def stage_tolerances(tolerances=None):
+    """
+    Stage label -> (shortage %, excess %), defaults overridden by tolerances
+
+    Args:
+        tolerances: Optional dict of stage label -> (shortage %, excess %);
+            the key None sets the default for every stage
+    """
+    tolerances = dict(tolerances or {})
+    default = tolerances.pop(None, DEFAULT_TOLERANCE)
+    resolved = {}
+    for _, _, label in stage_steps():
+        resolved[label] = tolerances.get(label, STAGE_TOLERANCES.get(label, default))
+    return resolved
+
+def parse_tolerance(text):
+    """
+    Parse a tolerance setting such as "2:5" or "Plan Cut=0:10"
+
+    Returns:
+        Tuple of (stage label or None for all stages, (shortage %, excess %))
+    """
+    stage, _, values = text.rpartition('=')
+    stage = stage.strip() or None
+    labels = [label for _, _, label in stage_steps()]
+    if stage is not None and stage not in labels:
+        raise ValueError(f"Unknown stage '{stage}' (expected one of: {', '.join(labels)})")
+
+    shortage, _, excess = values.partition(':')
+    shortage = float(shortage)
+    return stage, (shortage, float(excess) if excess else shortage)
+
+def quantity_values(series):
+    """
+    Report quantity column as float64, blank cells as NaN
+
+    Report cells hold numbers or '' for unmatched rows, so a direct cast
+    is tried before the much slower pd.to_numeric.
+    """
+    values = series.to_numpy(dtype=object, copy=True)
+    values[values == ''] = np.nan
+    try:
+        return values.astype('float64')
+    except (TypeError, ValueError):
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64')
+
+def add_shortage_analytics(output_df, tolerances=None):
+    """
+    Append stage balances, percentages and shortage/excess flags
+
+    Args:
+        output_df: Result sheet in OUTPUT_COLS layout; unmatched rows have
+            blank quantities and get blank analytics
+        tolerances: Optional overrides, see stage_tolerances()
+
+    Returns:
+        New DataFrame with ANALYTICS_COLS after the existing columns
+    """
+    steps = stage_steps()
+    limits = stage_tolerances(tolerances)
+    quantities = {col: quantity_values(output_df[col]) if col in output_df.columns
+                  else np.full(len(output_df), np.nan)
+                  for col, _ in STAGE_FLOW}
+
+    analytics = {}
+    shortage = np.zeros((len(output_df), len(steps)), dtype=bool)
+    excess = np.zeros_like(shortage)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i, (previous, col, label) in enumerate(steps):
+            analytics[balance_col(label)] = quantities[previous] - quantities[col]
+            percent = np.where(quantities[previous] != 0,
+                               quantities[col] / quantities[previous] * 100, np.nan)
+            percent = np.round(percent, PERCENT_DECIMALS)
+            analytics[percent_col(label)] = percent
+
+            # NaN compares False, so blank percentages are never flagged
+            shortage_pct, excess_pct = limits[label]
+            shortage[:, i] = percent < 100 - shortage_pct
+            excess[:, i] = percent > 100 + excess_pct
+
+    # First flagged stage per row, blank when none
+    labels = np.array([label for _, _, label in steps] + [''], dtype=object)
+    for col, flags in [(SHORTAGE_COL, shortage), (EXCESS_COL, excess)]:
+        first = np.where(flags.any(axis=1), flags.argmax(axis=1), len(steps))
+        analytics[col] = labels[first]
+
+    # One concat instead of inserting the columns one by one
+    added = pd.DataFrame({col: analytics[col] for col in ANALYTICS_COLS}, index=output_df.index)
+    return pd.concat([output_df, added], axis=1)
+
+def highlight_rules(tolerances=None):
+    """
+    Conditional formats for the analytics columns
+
+    Each rule is (column name, Excel formula for its first data cell with
+    {cell} in place of the cell reference, style name). Blank cells never
+    match, so unmatched rows stay unformatted.
+
+    Returns:
+        List of rules for write_report(highlights=...)
+    """
+    limits = stage_tolerances(tolerances)
+    rules = []
+    for _, _, label in stage_steps():
+        shortage_pct, excess_pct = limits[label]
+        rules.append((percent_col(label), f"AND(ISNUMBER({{cell}}),{{cell}}<{100 - shortage_pct:g})",
+                      'shortage'))
+        rules.append((percent_col(label), f"AND(ISNUMBER({{cell}}),{{cell}}>{100 + excess_pct:g})",
+                      'excess'))
+    rules.append((SHORTAGE_COL, 'LEN({cell})>0', 'shortage'))
+    rules.append((EXCESS_COL, 'LEN({cell})>0', 'excess'))
+    return rules
@@ -0,0 +1,170 @@
+"""
+On-disk cache of prepared production datasets
+
+Entries are keyed by file path, size and mtime, with a content hash as
+fallback so a copied or touched export still hits. Each entry records the
+schema version it was prepared with. Old entries are evicted least
+recently used first once the cache grows past CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+
+CACHE_DIR = os.environ.get(
+    'PRODSYNC_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.prodsync', 'cache')
+)
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+INDEX_FILE = 'index.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Feather (Arrow IPC) when pyarrow is installed, pickle otherwise
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+_lock = threading.Lock()
+_hash_memo = {}
+
+def file_signature(file_path):
+    """
+    Return (absolute path, size, mtime in ns) for a file
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+def content_hash(file_path):
+    """
+    SHA-1 of the file contents, memoized per file signature
+    """
+    signature = file_signature(file_path)
+    if signature in _hash_memo:
+        return _hash_memo[signature]
+
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    _hash_memo[signature] = digest.hexdigest()
+    return _hash_memo[signature]
+
+def _read_index():
+    try:
+        with open(os.path.join(CACHE_DIR, INDEX_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_index(index):
+    index_path = os.path.join(CACHE_DIR, INDEX_FILE)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+def _find_entry(index, signature, schema_version):
+    path, size, mtime = signature
+
+    # Fast path: same file, unchanged on disk
+    for name, entry in index.items():
+        if (entry['path'] == path and entry['size'] == size and
+                entry['mtime'] == mtime and entry['schema_version'] == schema_version):
+            return name
+
+    # Same contents under another path or mtime
+    digest = content_hash(path)
+    for name, entry in index.items():
+        if entry['hash'] == digest and entry['schema_version'] == schema_version:
+            return name
+
+    return None
+
+def _evict(index, keep):
+    total = sum(entry['bytes'] for entry in index.values())
+    for name in sorted(index, key=lambda n: index[n]['last_used']):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if name == keep:
+            continue
+        total -= index[name]['bytes']
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+        del index[name]
+
+def load(file_path, schema_version):
+    """
+    Return the cached dataset for file_path, or None on a miss
+
+    Cache problems are never fatal: any error is treated as a miss.
+    """
+    try:
+        signature = file_signature(file_path)
+        with _lock:
+            index = _read_index()
+            name = _find_entry(index, signature, schema_version)
+            if name is None:
+                return None
+
+            entry = index[name]
+            data_path = os.path.join(CACHE_DIR, name)
+            if entry['format'] == 'feather':
+                df = pd.read_feather(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+
+            entry.update(path=signature[0], size=signature[1], mtime=signature[2],
+                         last_used=time.time())
+            _write_index(index)
+            return df
+    except Exception as e:
+        print(f"Dataset cache read skipped: {e}")
+        return None
+
+def store(file_path, schema_version, df):
+    """
+    Save a prepared dataset for file_path and evict old entries
+
+    Returns:
+        Boolean indicating whether the dataset was cached
+    """
+    try:
+        signature = file_signature(file_path)
+        digest = content_hash(file_path)
+        name = f"{digest}-v{schema_version}.{CACHE_FORMAT}"
+
+        with _lock:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            data_path = os.path.join(CACHE_DIR, name)
+            tmp_path = f"{data_path}.tmp"
+
+            if CACHE_FORMAT == 'feather':
+                df.reset_index(drop=True).to_feather(tmp_path)
+            else:
+                df.to_pickle(tmp_path, compression=None)
+            os.replace(tmp_path, data_path)
+
+            index = _read_index()
+            index[name] = {
+                'path': signature[0],
+                'size': signature[1],
+                'mtime': signature[2],
+                'hash': digest,
+                'schema_version': schema_version,
+                'format': CACHE_FORMAT,
+                'bytes': os.path.getsize(data_path),
+                'last_used': time.time()
+            }
+            _evict(index, keep=name)
+            _write_index(index)
+        return True
+    except Exception as e:
+        print(f"Dataset cache write skipped: {e}")
+        return False
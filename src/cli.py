@@ -0,0 +1,435 @@
+"""
+Headless command-line entry point
+
+Runs the same reconciliation and Job Lookup as the GUI without importing
+tkinter, so it works on servers and in scheduled tasks. Progress messages go
+to stderr; a JSON summary is printed to stdout.
+
+Usage:
+    python cli.py reconcile --schedule SCHEDULE.xlsx [...] --sheets all
+                            --production ERP.xlsx --output report.xlsx
+    python cli.py lookup --production ERP.xlsx --job SGL-25-00196 [...]
+    python cli.py reconcile --schedule SCHEDULE.xlsx --production UNIT1.xlsx UNIT2.xlsx
+                            --dedupe row --output report.xlsx
+    python cli.py watch --input-dir EXPORTS --schedule SCHEDULE.xlsx [...]
+                        --output-dir REPORTS
+    python cli.py import --production ERP.xlsx [...]
+    python cli.py history --job 196 --stage "Total Sew Output Qty" --last 6
+
+reconcile and lookup take --snapshot ID (or "latest") instead of
+--production to run against the local snapshot store.
+
+Exit codes:
+    0  success
+    1  processing failed
+    2  invalid arguments
+    3  an input file does not exist
+    4  lookup or history found no rows for any job
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_MISSING_INPUT = 3
+EXIT_NOT_FOUND = 4
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='prodsync',
+        description='Reconcile buyer schedules against Logic ERP production data'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    reconcile = commands.add_parser('reconcile', help='Match schedule sheets and write a report')
+    reconcile.add_argument('--schedule', nargs='+', required=True, metavar='FILE',
+                           help='Schedule file(s) with buyer orders')
+    reconcile.add_argument('--sheets', nargs='+', default=['all'], metavar='SHEET',
+                           help='Sheet names to process, or "all" (default)')
+    add_production_source(reconcile)
+    reconcile.add_argument('--output', required=True, metavar='FILE',
+                           help='Report path (.xlsx, or base name for CSV output)')
+    reconcile.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx',
+                           help='Report format (default: xlsx)')
+    reconcile.add_argument('--workers', type=int, default=1,
+                           help='Worker processes for reading and matching (default: 1)')
+    reconcile.add_argument('--fuzzy-threshold', type=float, default=0.85, metavar='SCORE',
+                           help='Minimum similarity (0-1) for suggested matches of unmatched '
+                                'rows in the review sheet; 0 turns the review off (default: 0.85)')
+    reconcile.add_argument('--tolerance', action='append', type=tolerance_arg,
+                           metavar='[STAGE=]SHORT:EXCESS',
+                           help='Allowed shortage and excess %% against the previous stage, for '
+                                'all stages ("2:5", the default) or one ("Plan Cut=0:10"); '
+                                'repeatable')
+    reconcile.add_argument('--no-cache', action='store_true',
+                           help='Do not read or write the production dataset cache')
+    reconcile.add_argument('--quiet', action='store_true',
+                           help='Suppress progress messages on stderr')
+    reconcile.add_argument('--report-json', metavar='FILE',
+                           help='Also write the per-stage run report as JSON')
+    reconcile.add_argument('--trace-memory', action='store_true',
+                           help='Record peak traced memory per stage (slower)')
+    reconcile.add_argument('--profile', metavar='FILE',
+                           help='Dump cProfile stats for the run (view with pstats)')
+
+    lookup = commands.add_parser('lookup', help='List the POs for one or more jobs')
+    add_production_source(lookup)
+    lookup.add_argument('--job', nargs='+', required=True, metavar='JOB',
+                        help='Job numbers, e.g. 196 or SGL-25-00196')
+    lookup.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the production dataset cache')
+    lookup.add_argument('--quiet', action='store_true',
+                        help='Suppress progress messages on stderr')
+
+    watch = commands.add_parser('watch', help='Reconcile every new ERP export dropped in a folder')
+    watch.add_argument('--input-dir', required=True, metavar='DIR',
+                       help='Folder the ERP exports are saved to')
+    watch.add_argument('--schedule', nargs='+', required=True, metavar='FILE',
+                       help='Schedule file(s) with buyer orders')
+    watch.add_argument('--sheets', nargs='+', default=['all'], metavar='SHEET',
+                       help='Sheet names to process, or "all" (default)')
+    watch.add_argument('--output-dir', required=True, metavar='DIR',
+                       help='Folder for the timestamped reports')
+    watch.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx',
+                       help='Report format (default: xlsx)')
+    watch.add_argument('--pattern', nargs='+', metavar='GLOB',
+                       help='Export file name patterns (default: *.xlsx *.xls *.csv)')
+    watch.add_argument('--interval', type=float, default=30,
+                       help='Seconds between polls (default: 30)')
+    watch.add_argument('--settle', type=float, default=10,
+                       help='Seconds an export must stay unchanged before it is read (default: 10)')
+    watch.add_argument('--run-existing', action='store_true',
+                       help='Reconcile the newest export already in the folder at start')
+    watch.add_argument('--max-runs', type=int, metavar='N',
+                       help='Stop after N runs (default: run until interrupted)')
+    watch.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for reading and matching (default: 1)')
+    watch.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the production dataset cache')
+    watch.add_argument('--import-snapshots', action='store_true',
+                       help='Also store each export in the snapshot store')
+    watch.add_argument('--store', metavar='FILE',
+                       help='Snapshot store database (default: ~/.prodsync/snapshots.db)')
+    watch.add_argument('--quiet', action='store_true',
+                       help='Suppress progress messages on stderr')
+
+    store_import = commands.add_parser('import', help='Store production exports as dated snapshots')
+    store_import.add_argument('--production', nargs='+', required=True, metavar='FILE',
+                              help='Production data exported from Logic ERP')
+    store_import.add_argument('--taken-at', metavar='DATE',
+                              help='Snapshot date, e.g. 2025-01-31 (default: file modified time)')
+    store_import.add_argument('--store', metavar='FILE',
+                              help='Snapshot store database (default: ~/.prodsync/snapshots.db)')
+    store_import.add_argument('--no-cache', action='store_true',
+                              help='Do not read or write the production dataset cache')
+    store_import.add_argument('--quiet', action='store_true',
+                              help='Suppress progress messages on stderr')
+
+    history = commands.add_parser('history', help='Stage quantities for a job across snapshots')
+    history.add_argument('--job', required=True, metavar='JOB',
+                         help='Job number, e.g. 196 or SGL-25-00196')
+    history.add_argument('--order', metavar='ORDER',
+                         help='Only this order number')
+    history.add_argument('--stage', nargs='+', metavar='COLUMN',
+                         help='Stage columns, e.g. "Total Sew Output Qty" (default: all)')
+    history.add_argument('--last', type=int, default=6,
+                         help='Number of most recent snapshots (default: 6)')
+    history.add_argument('--store', metavar='FILE',
+                         help='Snapshot store database (default: ~/.prodsync/snapshots.db)')
+    history.add_argument('--quiet', action='store_true',
+                         help='Suppress progress messages on stderr')
+
+    return parser
+
+def snapshot_arg(value):
+    """--snapshot value: a snapshot id or 'latest'"""
+    if value.lower() == 'latest':
+        return 'latest'
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a snapshot id or 'latest', got {value!r}")
+
+def tolerance_arg(value):
+    """--tolerance value parsed with analytics.parse_tolerance()"""
+    from analytics import parse_tolerance
+    try:
+        return parse_tolerance(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid tolerance {value!r}: {e}")
+
+def add_production_source(command):
+    """--production FILE [...], or --snapshot ID from the snapshot store"""
+    from production_merge import DEDUPE_MODES, DEDUPE_LATEST
+
+    source = command.add_mutually_exclusive_group(required=True)
+    source.add_argument('--production', nargs='+', metavar='FILE',
+                        help='Production data exported from Logic ERP; several exports '
+                             'or folders of exports are merged into one dataset')
+    source.add_argument('--snapshot', type=snapshot_arg, metavar='ID',
+                        help='Stored snapshot id, or "latest", instead of an export')
+    command.add_argument('--dedupe', choices=DEDUPE_MODES, default=DEDUPE_LATEST,
+                         help='Rows repeated across exports: keep each job/order from the '
+                              'newest export ("latest", default) or drop only exact '
+                              'duplicates ("row")')
+    command.add_argument('--store', metavar='FILE',
+                         help='Snapshot store database (default: ~/.prodsync/snapshots.db)')
+
+def open_store(args):
+    from snapshot_store import SnapshotStore, STORE_PATH
+    return SnapshotStore(args.store or STORE_PATH)
+
+def snapshot_id(args):
+    """--snapshot as an int, None for latest"""
+    return None if args.snapshot == 'latest' else args.snapshot
+
+def production_source(args):
+    """--production as one path, or the list when several were given"""
+    return args.production[0] if len(args.production) == 1 else args.production
+
+def missing_inputs(paths):
+    """Input paths that do not exist"""
+    return [path for path in paths if not os.path.exists(path)]
+
+def run_reconcile(args, log):
+    from processor import run_reconciliation
+    from run_report import RunReport
+
+    report = RunReport(trace_memory=args.trace_memory)
+    df2 = None
+    if args.snapshot is not None:
+        with open_store(args) as store, report.stage('load') as record:
+            df2 = store.load_snapshot(snapshot_id(args), log)
+            record['rows'] = len(df2)
+            production = store.path
+    else:
+        production = production_source(args)
+
+    sheet_names = None if [name.lower() for name in args.sheets] == ['all'] else args.sheets
+    return run_reconciliation(args.schedule, production, args.output,
+                              sheet_names=sheet_names,
+                              workers=max(1, args.workers),
+                              output_format=args.format,
+                              log=log,
+                              use_cache=not args.no_cache,
+                              report=report,
+                              report_path=args.report_json,
+                              profile_path=args.profile,
+                              df2=df2,
+                              fuzzy_threshold=args.fuzzy_threshold,
+                              tolerances=dict(args.tolerance or []),
+                              dedupe=args.dedupe)
+
+def run_lookup(args, log):
+    if args.snapshot is not None:
+        return run_store_lookup(args, log)
+
+    from processor import find_job_pos
+    from production_merge import load_production_sources
+    from job_index import JobIndex
+
+    timings = {}
+    start = time.perf_counter()
+    df2 = load_production_sources(production_source(args), log, use_cache=not args.no_cache,
+                                  dedupe=args.dedupe)
+    timings['load_production'] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    job_index = JobIndex(df2)
+    timings['index'] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    jobs = {}
+    for job in args.job:
+        result_df = find_job_pos(job_index, job)
+        jobs[job] = {
+            'count': len(result_df),
+            'rows': json.loads(result_df.to_json(orient='records', date_format='iso'))
+        }
+    timings['lookup'] = round(time.perf_counter() - start, 3)
+
+    return {
+        'production_file': production_source(args),
+        'jobs': jobs,
+        'found': sum(1 for result in jobs.values() if result['count']),
+        'timings': timings
+    }
+
+def run_store_lookup(args, log):
+    """Job Lookup straight from the snapshot store, without loading the snapshot"""
+    from processor import extract_numeric_from_job
+
+    timings = {}
+    jobs = {}
+    with open_store(args) as store:
+        start = time.perf_counter()
+        selected = snapshot_id(args)
+        if selected is None:
+            selected = store.latest_snapshot()
+        for job in args.job:
+            search_job = extract_numeric_from_job(job)
+            result_df = store.find_job_rows(search_job, selected) if search_job else None
+            count = 0 if result_df is None else len(result_df)
+            log(f"Job {job}: {count} rows in snapshot {selected}")
+            jobs[job] = {
+                'count': count,
+                'rows': json.loads(result_df.to_json(orient='records', date_format='iso'))
+                        if count else []
+            }
+        timings['lookup'] = round(time.perf_counter() - start, 3)
+
+    return {
+        'store': store.path,
+        'snapshot': selected,
+        'jobs': jobs,
+        'found': sum(1 for result in jobs.values() if result['count']),
+        'timings': timings
+    }
+
+def run_import(args, log):
+    timings = {}
+    snapshots = []
+    start = time.perf_counter()
+    with open_store(args) as store:
+        for file_path in args.production:
+            snapshot, stored = store.import_file(file_path, args.taken_at, log,
+                                                 use_cache=not args.no_cache)
+            snapshots.append({'production_file': file_path, 'snapshot': snapshot,
+                              'stored': stored})
+    timings['import'] = round(time.perf_counter() - start, 3)
+
+    return {'store': store.path, 'snapshots': snapshots, 'timings': timings}
+
+def run_history(args, log):
+    from processor import extract_numeric_from_job
+
+    search_job = extract_numeric_from_job(args.job)
+    start = time.perf_counter()
+    with open_store(args) as store:
+        history = store.job_history(search_job, args.stage, args.order, args.last)
+    timings = {'query': round(time.perf_counter() - start, 3)}
+    log(f"Job {args.job}: {len(history)} rows over "
+        f"{history['snapshot_id'].nunique()} snapshot(s)")
+
+    # Stage totals per snapshot, then the rows behind them
+    stages = [col for col in history.columns if col not in ('snapshot_id', 'taken_at', 'Order No')]
+    totals = history.groupby(['snapshot_id', 'taken_at'], sort=False)[stages].sum().reset_index()
+    totals['orders'] = history.groupby('snapshot_id', sort=False).size().to_numpy()
+
+    return {
+        'store': store.path,
+        'job': args.job,
+        'found': len(history),
+        'snapshots': json.loads(totals.to_json(orient='records')),
+        'rows': json.loads(history.to_json(orient='records')),
+        'timings': timings
+    }
+
+def run_watch(args, log, stdout):
+    from watch import watch_folder
+
+    def on_run(summary):
+        # One JSON line per run, for whatever reads the daemon's output
+        line = {key: summary[key] for key in
+                ('status', 'production_file', 'snapshot', 'outputs', 'matched', 'unmatched', 'total',
+                 'suggestions', 'timings', 'error') if key in summary}
+        print(json.dumps(line, default=str), file=stdout, flush=True)
+
+    store_path = None
+    if args.import_snapshots:
+        from snapshot_store import STORE_PATH
+        store_path = args.store or STORE_PATH
+
+    sheet_names = None if [name.lower() for name in args.sheets] == ['all'] else args.sheets
+    try:
+        runs = watch_folder(args.input_dir, args.schedule, args.output_dir,
+                            sheet_names=sheet_names,
+                            output_format=args.format,
+                            workers=max(1, args.workers),
+                            interval=args.interval,
+                            settle_seconds=args.settle,
+                            patterns=args.pattern,
+                            use_cache=not args.no_cache,
+                            run_existing=args.run_existing,
+                            max_runs=args.max_runs,
+                            store_path=store_path,
+                            log=log,
+                            on_run=on_run)
+    except KeyboardInterrupt:
+        log("Watch stopped")
+        return EXIT_OK
+    log(f"Watch finished after {runs} run(s)")
+    return EXIT_OK
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'watch':
+        inputs = [args.input_dir] + args.schedule
+    elif args.command == 'import':
+        inputs = args.production
+    elif args.command == 'history' or args.snapshot is not None:
+        from snapshot_store import STORE_PATH
+        inputs = [args.store or STORE_PATH] + getattr(args, 'schedule', [])
+    else:
+        inputs = args.production + getattr(args, 'schedule', [])
+    missing = missing_inputs(inputs)
+    if missing:
+        print(json.dumps({'status': 'error', 'error': 'missing input', 'files': missing}, indent=2))
+        return EXIT_MISSING_INPUT
+
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    stdout = sys.stdout
+    if args.command == 'watch':
+        # Runs until interrupted; each run prints its own summary line
+        try:
+            with open(os.devnull, 'w') as devnull, \
+                    contextlib.redirect_stdout(devnull if args.quiet else sys.stderr):
+                return run_watch(args, log, stdout)
+        except Exception as e:
+            log(f"❌ Error in processing: {str(e)}")
+            print(json.dumps({'status': 'error', 'error': str(e)}, indent=2), file=stdout)
+            return EXIT_FAILED
+
+    start = time.perf_counter()
+    try:
+        # Keep stdout for the JSON summary; library prints go to stderr
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.redirect_stdout(devnull if args.quiet else sys.stderr):
+            if args.command == 'reconcile':
+                summary = run_reconcile(args, log)
+            elif args.command == 'import':
+                summary = run_import(args, log)
+            elif args.command == 'history':
+                summary = run_history(args, log)
+            else:
+                summary = run_lookup(args, log)
+    except Exception as e:
+        log(f"❌ Error in processing: {str(e)}")
+        print(json.dumps({'status': 'error', 'error': str(e)}, indent=2), file=stdout)
+        return EXIT_FAILED
+
+    summary['timings']['total'] = round(time.perf_counter() - start, 3)
+
+    if args.command in ('lookup', 'history') and not summary['found']:
+        summary['status'] = 'not found'
+        exit_code = EXIT_NOT_FOUND
+    else:
+        summary['status'] = 'ok'
+        exit_code = EXIT_OK
+
+    print(json.dumps(summary, indent=2, default=str), file=stdout)
+    return exit_code
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Thread-safe console logging for the GUI
+
+Any thread posts records to a queue. The Tk main loop drains the queue on
+a timer and inserts each batch into the console in one call. The same
+records go to a rotating log file.
+"""
+import logging
+import os
+import queue
+from collections import namedtuple
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+LOG_DIR = os.path.join(os.path.expanduser('~'), '.prodsync', 'logs')
+LOG_FILE_MAX_BYTES = 1024 * 1024  # 1 MB
+LOG_FILE_BACKUPS = 3
+
+DRAIN_INTERVAL_MS = 100
+MAX_BATCH = 500
+MAX_CONSOLE_LINES = 5000
+
+# Console message type -> logging level for the log file
+LEVELS = {
+    'info': logging.INFO,
+    'success': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR
+}
+
+LogRecord = namedtuple('LogRecord', ['time', 'message_type', 'message'])
+
+def file_logger(log_dir=None):
+    """
+    Logger writing to a rotating prodsync.log, or None if the log
+    directory cannot be created
+    """
+    logger = logging.getLogger('prodsync')
+    if logger.handlers:
+        return logger
+
+    log_dir = log_dir or LOG_DIR
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(log_dir, 'prodsync.log'),
+                                      maxBytes=LOG_FILE_MAX_BYTES,
+                                      backupCount=LOG_FILE_BACKUPS,
+                                      encoding='utf-8')
+    except OSError as e:
+        print(f"Log file disabled: {e}")
+        return None
+
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+class ConsoleLogPump:
+    """
+    Queue between worker threads and the console Text widget
+    """
+
+    def __init__(self, root, text_widget, max_lines=MAX_CONSOLE_LINES):
+        self.root = root
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.records = queue.SimpleQueue()
+        self.logger = file_logger()
+
+    def post(self, message, message_type="info"):
+        """Queue a message; safe to call from any thread"""
+        record = LogRecord(datetime.now(), message_type, message)
+        self.records.put(record)
+        if self.logger is not None:
+            self.logger.log(LEVELS.get(message_type, logging.INFO), message)
+
+    def start(self):
+        """Begin draining on the Tk main loop"""
+        self.root.after(DRAIN_INTERVAL_MS, self.drain)
+
+    def drain(self):
+        """Insert up to MAX_BATCH queued records in one call, then reschedule"""
+        chunks = []
+        try:
+            for _ in range(MAX_BATCH):
+                record = self.records.get_nowait()
+                chunks += [f"[{record.time:%H:%M:%S}] ", "info",
+                           f"{record.message}\n", record.message_type]
+        except queue.Empty:
+            pass
+
+        if chunks:
+            self.text.insert('end', *chunks)
+
+            # Cap the console length by dropping the oldest lines
+            line_count = int(self.text.index('end-1c').split('.')[0])
+            if line_count > self.max_lines:
+                self.text.delete('1.0', f"{line_count - self.max_lines + 1}.0")
+
+            self.text.see('end')
+
+        self.root.after(DRAIN_INTERVAL_MS, self.drain)
@@ -0,0 +1,33 @@
+"""
+Find the ERP export files in a folder
+
+Shared by the folder watch and by production loads given a folder, so
+neither has to import the other.
+"""
+import fnmatch
+import os
+
+EXPORT_PATTERNS = ['*.xlsx', '*.xls', '*.csv']
+# Excel lock files, hidden files and downloads still in progress
+IGNORED_PREFIXES = ('~$', '.')
+IGNORED_SUFFIXES = ('.tmp', '.partial', '.crdownload', '.part')
+
+def is_export(file_name, patterns):
+    if file_name.startswith(IGNORED_PREFIXES) or file_name.lower().endswith(IGNORED_SUFFIXES):
+        return False
+    return any(fnmatch.fnmatch(file_name.lower(), pattern.lower()) for pattern in patterns)
+
+def scan_exports(input_dir, patterns=None):
+    """
+    Return {path: (size, mtime in ns)} for export files directly in input_dir
+    """
+    stats = {}
+    for entry in os.scandir(input_dir):
+        if entry.is_file() and is_export(entry.name, patterns or EXPORT_PATTERNS):
+            try:
+                stat = entry.stat()
+            except OSError:
+                # Removed or renamed since the listing
+                continue
+            stats[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return stats
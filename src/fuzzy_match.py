@@ -0,0 +1,125 @@
+"""
+Second-pass fuzzy matching for unmatched schedule rows
+
+An Order No that misses the exact (job, order) key is compared only with
+the ERP orders of the same extracted job, so the cost grows with the size
+of each job rather than the whole export. Both sides are first reduced to a
+canonical form (punctuation, a leading "PO" and O/I look-alikes of 0/1
+removed), then scored with difflib's ratio. Cheap upper bounds skip most
+candidates before the full ratio is computed. Suggestions are only listed
+for review; the matched results are not changed.
+"""
+import re
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+# Minimum similarity (0-1) for a suggestion
+FUZZY_THRESHOLD = 0.85
+# Suggestions listed per unmatched row, best first
+FUZZY_SUGGESTIONS = 3
+# Runners-up are listed only when they score this close to the best
+# candidate; sequential PO numbers one digit apart would be noise otherwise
+FUZZY_MARGIN = 0.05
+
+NON_ALNUM_PATTERN = re.compile(r'[^0-9A-Z]')
+ORDER_PREFIX_PATTERN = re.compile(r'^(?:PO|ORDER|ORD)(?=\d)')
+LOOKALIKES = str.maketrans({'O': '0', 'I': '1'})
+
+REVIEW_COLS = ['Sheet', 'SL', 'JOB NO', 'Order No', 'Suggested Order No', 'Score']
+# Production fields shown next to each suggestion, when indexed
+REVIEW_DETAIL_COLS = ['Style Name', 'Order Qty.']
+
+def canonical_order(order):
+    """
+    Comparison form of a normalized Order No
+    Examples:
+    "PO-4501234" -> "4501234"
+    "45O1234" -> "4501234"
+    """
+    text = NON_ALNUM_PATTERN.sub('', order)
+    text = ORDER_PREFIX_PATTERN.sub('', text)
+    return text.translate(LOOKALIKES)
+
+def best_candidates(order, candidates, threshold=FUZZY_THRESHOLD, limit=FUZZY_SUGGESTIONS):
+    """
+    Score one canonical Order No against the canonical orders of its job
+
+    Args:
+        order: Canonical schedule Order No
+        candidates: List of (canonical ERP order, ERP order key)
+        threshold: Minimum similarity
+        limit: Maximum number of results
+
+    Returns:
+        List of (score, ERP order key), best first, within FUZZY_MARGIN of the best
+    """
+    matcher = SequenceMatcher(None, autojunk=False)
+    # SequenceMatcher caches details about its second sequence
+    matcher.set_seq2(order)
+    scored = []
+    for candidate, key in candidates:
+        matcher.set_seq1(candidate)
+        if (matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold):
+            score = matcher.ratio()
+            if score >= threshold:
+                scored.append((score, key))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(score, key) for score, key in scored[:limit] if score >= scored[0][0] - FUZZY_MARGIN]
+
+def suggest_matches(df1, production_index, sheet_name='', threshold=FUZZY_THRESHOLD,
+                    limit=FUZZY_SUGGESTIONS):
+    """
+    Suggest ERP orders for schedule rows without an exact match
+
+    Args:
+        df1: Prepared schedule data with 'EXTRACTED_JOB' / 'Order No_NORM' keys
+        production_index: Keyed table from build_production_index()
+        sheet_name: Label written in the 'Sheet' column
+        threshold: Minimum similarity (0-1)
+        limit: Suggestions per unmatched row
+
+    Returns:
+        DataFrame with REVIEW_COLS plus the available REVIEW_DETAIL_COLS,
+        one row per suggestion, in schedule row order
+    """
+    detail_cols = [col for col in REVIEW_DETAIL_COLS if col in production_index.columns]
+    jobs = df1['EXTRACTED_JOB'].to_numpy(dtype=object)
+    orders = df1['Order No_NORM'].to_numpy(dtype=object)
+
+    # Only the jobs of schedule rows are blocked; every other job is skipped
+    block_rows = production_index[production_index['MATCH_JOB'].isin(set(jobs))]
+    blocks = {}
+    for position, (job, key) in enumerate(zip(block_rows['MATCH_JOB'].to_numpy(dtype=object),
+                                              block_rows['MATCH_ORDER'].to_numpy(dtype=object))):
+        blocks.setdefault(job, {})[key] = position
+
+    # Canonical forms are computed once per ERP order
+    canonical_blocks = {}
+    schedule_rows, index_rows, suggested, scores = [], [], [], []
+    for idx, (job, order) in enumerate(zip(jobs, orders)):
+        block = blocks.get(job)
+        if not block or not order or order in block:
+            continue
+        canonical = canonical_order(order)
+        if not canonical:
+            continue
+        if job not in canonical_blocks:
+            canonical_blocks[job] = [(canonical_order(key), key) for key in block]
+
+        for score, key in best_candidates(canonical, canonical_blocks[job], threshold, limit):
+            schedule_rows.append(idx)
+            index_rows.append(block[key])
+            suggested.append(key)
+            scores.append(round(score, 3))
+
+    # Gather the schedule and production columns once for all suggestions
+    review = pd.DataFrame({'Sheet': [sheet_name] * len(schedule_rows)})
+    for col in ['SL', 'JOB NO', 'Order No']:
+        review[col] = (df1[col].to_numpy(dtype=object)[schedule_rows] if col in df1.columns
+                       else '')
+    review['Suggested Order No'] = suggested
+    review['Score'] = scores
+    for col in detail_cols:
+        review[col] = block_rows[col].to_numpy(dtype=object)[index_rows]
+    return review[REVIEW_COLS + detail_cols]
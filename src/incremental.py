@@ -0,0 +1,215 @@
+"""
+Incremental re-reconciliation against a previous report
+
+Schedule rows are taken from last week's report (or its snapshot). Each
+row's stage quantities are hashed and compared with the hash of the new
+production data for the same (job, order) key, and only rows whose hash
+moved are matched again. The output keeps the report layout and adds a
+Delta sheet with the per-stage changes.
+"""
+import os
+import numpy as np
+import pandas as pd
+from analytics import add_shortage_analytics, highlight_rules
+from processor import (NUMERIC_COLS_DF2, SCHEDULE_COLS, OUTPUT_COLS, MATCH_KEYS,
+                       COMBINED_SHEET_NAME, REVIEW_SHEET_NAME, index_production_data,
+                       match_schedule, combine_results, save_report)
+from production_merge import load_production_sources, production_files
+from utils import normalize_text_series, extract_numeric_job_series, to_key_series
+
+DELTA_SHEET_NAME = 'Delta'
+SNAPSHOT_SUFFIX = '.snapshot.pkl'
+
+DELTA_COLS = (['SL', 'JOB NO', 'Order No', 'Status', 'Changed Stages'] +
+              [f"{col} Change" for col in NUMERIC_COLS_DF2])
+
+def snapshot_path(output_path):
+    """Snapshot file stored next to a report"""
+    return os.path.splitext(output_path)[0] + SNAPSHOT_SUFFIX
+
+def read_previous_report(path):
+    """
+    Load result sheets from a previous report workbook or snapshot
+
+    Returns:
+        Dict of sheet name -> DataFrame with numeric quantity columns,
+        excluding the combined, delta and review sheets
+    """
+    if path.endswith(SNAPSHOT_SUFFIX):
+        return pd.read_pickle(path)
+
+    sheets = pd.read_excel(path, sheet_name=None, dtype=str)
+    previous = {}
+    for sheet_name, df in sheets.items():
+        if sheet_name in (COMBINED_SHEET_NAME, DELTA_SHEET_NAME, REVIEW_SHEET_NAME):
+            continue
+        for col in OUTPUT_COLS[len(SCHEDULE_COLS):]:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        previous[sheet_name] = df
+    return previous
+
+def quantity_frame(df):
+    """Stage quantities as float64, blanks as NaN, missing columns added"""
+    return pd.DataFrame({
+        col: pd.to_numeric(df[col], errors='coerce') if col in df.columns else np.nan
+        for col in NUMERIC_COLS_DF2
+    }, index=df.index).astype('float64')
+
+def quantity_hash(df):
+    """One hash per row over the stage quantities"""
+    return pd.util.hash_pandas_object(quantity_frame(df), index=False).to_numpy()
+
+def build_delta(old_rows, new_rows):
+    """
+    Per-stage changes between old and new versions of the same report rows
+
+    Args:
+        old_rows: Previous report rows
+        new_rows: Recomputed rows, aligned with old_rows
+
+    Returns:
+        DataFrame in DELTA_COLS layout, only for rows that actually moved
+    """
+    old_qty = quantity_frame(old_rows).reset_index(drop=True)
+    new_qty = quantity_frame(new_rows).reset_index(drop=True)
+
+    was_matched = old_qty.notna().any(axis=1)
+    is_matched = new_qty.notna().any(axis=1)
+    change = new_qty.fillna(0) - old_qty.fillna(0)
+    moved = change != 0
+
+    delta = pd.DataFrame({col: new_rows[col].to_numpy() for col in ['SL', 'JOB NO', 'Order No']})
+    delta['Status'] = np.select(
+        [is_matched & ~was_matched, was_matched & ~is_matched],
+        ['Newly matched', 'No longer matched'],
+        default='Changed'
+    )
+
+    # Comma-separated names of the stages that moved
+    names = np.array(NUMERIC_COLS_DF2, dtype=object)
+    delta['Changed Stages'] = [', '.join(names[row]) for row in moved.to_numpy()]
+
+    for col in NUMERIC_COLS_DF2:
+        delta[f"{col} Change"] = change[col].where(moved[col])
+
+    keep = moved.any(axis=1) | (was_matched != is_matched)
+    return delta.loc[keep.to_numpy(), DELTA_COLS].reset_index(drop=True)
+
+def update_sheet(previous_df, production_index, index_hashes, log=print):
+    """
+    Bring one report sheet up to date, rematching only changed rows
+
+    Args:
+        previous_df: Sheet from the previous report
+        production_index: Keyed table from build_production_index()
+        index_hashes: DataFrame of MATCH_KEYS plus 'ROW_HASH' for the index
+        log: Callback for status messages
+
+    Returns:
+        Tuple of (updated DataFrame, delta DataFrame)
+    """
+    df1 = pd.DataFrame({
+        col: previous_df[col].to_numpy() if col in previous_df.columns else ''
+        for col in SCHEDULE_COLS
+    })
+    df1['EXTRACTED_JOB'] = to_key_series(extract_numeric_job_series(df1['JOB NO']))
+    df1['Order No_NORM'] = to_key_series(normalize_text_series(df1['Order No']))
+
+    keys = pd.DataFrame({
+        'MATCH_JOB': df1['EXTRACTED_JOB'].array,
+        'MATCH_ORDER': df1['Order No_NORM'].array
+    })
+    # Merge on row positions: a left merge would turn uint64 hashes into floats
+    positions = keys.merge(index_hashes[MATCH_KEYS].assign(ROW_POS=np.arange(len(index_hashes))),
+                           on=MATCH_KEYS, how='left')['ROW_POS']
+    found = positions.notna().to_numpy()
+
+    # Unmatched on both sides hash the same (all NaN quantities)
+    blank_hash = quantity_hash(pd.DataFrame(index=[0]))[0]
+    current = np.full(len(keys), blank_hash, dtype='uint64')
+    current[found] = index_hashes['ROW_HASH'].to_numpy()[positions[found].astype(int)]
+    changed = current != quantity_hash(previous_df)
+
+    updated = previous_df.reindex(columns=OUTPUT_COLS).reset_index(drop=True).astype(object)
+
+    if changed.any():
+        new_rows, _, _ = match_schedule(df1.loc[changed].reset_index(drop=True),
+                                        production_index, log)
+        delta = build_delta(updated.loc[changed], new_rows)
+        updated.loc[changed, OUTPUT_COLS] = new_rows[OUTPUT_COLS].to_numpy()
+    else:
+        delta = pd.DataFrame(columns=DELTA_COLS)
+
+    log(f"Rows re-matched: {int(changed.sum())} of {len(updated)}, moved: {len(delta)}")
+    return updated, delta
+
+def process_incremental(previous_path, file2_path, output_path, status_callback=None):
+    """
+    Update a previous report against a new production export
+
+    Args:
+        previous_path: Previous report workbook or its snapshot
+        file2_path: Path to the new production data file, a folder of
+            exports or a list of them
+        output_path: Path to save the updated report
+        status_callback: Optional callback function for status updates
+
+    Returns:
+        Boolean indicating success/failure
+    """
+
+    def log(message):
+        if status_callback:
+            status_callback(message)
+        print(message)
+
+    try:
+        # Step 1: Load the files
+        log("\n=== Loading Files ===")
+        log(f"Previous report: {os.path.basename(previous_path)}")
+        for path in production_files(file2_path):
+            log(f"File 2 (Production): {os.path.basename(path)}")
+
+        previous = read_previous_report(previous_path)
+        log(f"Loaded {len(previous)} result sheets from previous report")
+
+        df2 = load_production_sources(file2_path, log)
+
+        # Step 2: Index and hash the new production data
+        production_index = index_production_data(df2, log)
+        index_hashes = production_index[MATCH_KEYS].copy()
+        index_hashes['ROW_HASH'] = quantity_hash(production_index)
+
+        # Step 3: Rematch changed rows in every sheet
+        results = {}
+        deltas = {}
+        for sheet_name, previous_df in previous.items():
+            log(f"\n=== Updating Sheet: {sheet_name} ===")
+            results[sheet_name], deltas[sheet_name] = update_sheet(
+                previous_df, production_index, index_hashes, log)
+
+        # Step 4: Save the updated report with shortage analytics, the delta
+        # sheet and the next snapshot
+        sheets = {sheet_name: add_shortage_analytics(df) for sheet_name, df in results.items()}
+        if len(results) > 1:
+            sheets[COMBINED_SHEET_NAME] = combine_results(sheets)
+            delta_frames = [delta.assign(Buyer=sheet_name) for sheet_name, delta in deltas.items()]
+            delta_df = pd.concat(delta_frames, ignore_index=True)
+            sheets[DELTA_SHEET_NAME] = delta_df[['Buyer'] + DELTA_COLS]
+        else:
+            sheets[DELTA_SHEET_NAME] = next(iter(deltas.values()))
+
+        log(f"\n=== Delta ===")
+        log(f"Rows with moved quantities: {sum(len(delta) for delta in deltas.values())}")
+
+        save_report(output_path, sheets, log, highlights=highlight_rules())
+        pd.to_pickle(results, snapshot_path(output_path))
+        log(f"Snapshot saved: {os.path.basename(snapshot_path(output_path))}")
+        return True
+
+    except Exception as e:
+        log(f"❌ Error in processing: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
@@ -0,0 +1,154 @@
+import heapq
+import numpy as np
+import pandas as pd
+
+# Job Lookup columns in production data
+JOB_COL_NAMES = ['Job No', 'JOB NO', 'job no', 'Job_No']
+ORDER_COL_NAMES = ['Order No', 'ORDER NO', 'Order_No']
+
+# Display columns for Job Lookup
+# From your proddata.xls, the columns are:
+# 'Order No', 'Style Name', 'Item Name', 'Order Qty.', 'Ship Date'
+JOB_LOOKUP_COLUMNS = {
+    'Order No': ORDER_COL_NAMES,
+    'Style Name': ['Style Name', 'STYLE NAME', 'Style'],
+    'Item Name': ['Item Name', 'ITEM NAME', 'Item'],
+    'Order Qty.': ['Order Qty.', 'ORDER QTY', 'Qty'],
+    'Ship Date': ['Ship Date', 'SHIP DATE', 'Ex-Factory Date']
+}
+
+# Width of the numeric segment in full job numbers, e.g. "SGL-25-00196"
+JOB_SEGMENT_WIDTH = 5
+
+# Upper bound for prefix searches over sorted string keys
+PREFIX_END = '\uffff'
+
+def find_column(df, possible_names):
+    """Return the first of possible_names present in df, or None"""
+    for name in possible_names:
+        if name in df.columns:
+            return name
+    return None
+
+class JobIndex:
+    """
+    Job number -> row positions for Job Lookup, built once per production
+    dataset
+
+    Column aliases are resolved at build time, so each lookup only gathers
+    the matching rows. The index keeps a reference to df2 rather than a
+    copy of its display columns, so the GUI and the processor share one
+    production table.
+    """
+
+    def __init__(self, df2):
+        self.source = df2
+        self.row_count = len(df2)
+        self.job_col = find_column(df2, JOB_COL_NAMES)
+        self.display_names = {}
+        self.display_positions = np.array([], dtype=int)
+        self.missing_columns = []
+        self.positions = {}
+        self.padded_positions = {}
+        self.sorted_keys = np.array([], dtype=object)
+        self.sorted_padded_keys = np.array([], dtype=object)
+        self.padded_order = np.array([], dtype=int)
+        # Normalized order numbers when df2 was prepared, else the raw column
+        self.order_col = ('Order No_NORM' if 'Order No_NORM' in df2.columns
+                          else find_column(df2, ORDER_COL_NAMES))
+
+        if self.job_col is None:
+            return
+
+        # Select relevant columns for display - BASED ON YOUR ACTUAL DATA
+        col_rename = {}
+        for display_col, possible_names in JOB_LOOKUP_COLUMNS.items():
+            name = find_column(df2, possible_names)
+            if name is None:
+                self.missing_columns.append(display_col)
+            else:
+                col_rename[name] = display_col
+
+        if not col_rename:
+            # Fallback: job number and Order No if we have it
+            order_col = find_column(df2, ORDER_COL_NAMES)
+            col_rename = {self.job_col: 'Job No'}
+            if order_col:
+                col_rename[order_col] = 'Order No'
+        self.display_names = col_rename
+        self.display_positions = df2.columns.get_indexer(list(col_rename))
+
+        # Production data already has numeric job numbers (196, 202, etc.)
+        keys = df2[self.job_col].astype(str).str.strip()
+        row_numbers = pd.Series(np.arange(len(df2)))
+        self.positions = row_numbers.groupby(keys.to_numpy()).indices
+        self.padded_positions = row_numbers.groupby(keys.str.zfill(3).to_numpy()).indices
+
+        # Sorted key arrays for type-ahead prefix search
+        self.sorted_keys = np.array(sorted(self.positions), dtype=object)
+        padded = np.array([key.zfill(JOB_SEGMENT_WIDTH) for key in self.sorted_keys], dtype=object)
+        self.padded_order = np.argsort(padded, kind='stable')
+        self.sorted_padded_keys = padded[self.padded_order]
+
+    @property
+    def job_count(self):
+        return len(self.positions)
+
+    def job_keys(self):
+        """All normalized job numbers in the index"""
+        return list(self.positions)
+
+    def find(self, search_job):
+        """
+        Rows for a normalized job number, falling back to a zero-padded match
+
+        Returns:
+            DataFrame of display columns for the matching rows (empty if none)
+        """
+        rows = self.positions.get(search_job)
+        if rows is None:
+            rows = self.padded_positions.get(search_job.zfill(3))
+        if rows is None:
+            return pd.DataFrame()
+        return self.source.iloc[rows, self.display_positions].rename(columns=self.display_names)
+
+    def po_count(self, job_key):
+        """
+        Number of distinct POs (Order No) for a job; without an order
+        column, its number of production rows
+        """
+        rows = self.positions.get(job_key, ())
+        if self.order_col is None:
+            return len(rows)
+        orders = self.source[self.order_col].iloc[rows].dropna()
+        return len(set(str(order).strip().upper() for order in orders) - {''})
+
+    def suggest(self, text, limit=20):
+        """
+        Candidate jobs for partially typed input
+
+        Plain numbers match as prefixes of the job number ("19" -> 19, 190,
+        196, ...). Input with a hyphen matches the last segment against the
+        zero-padded job segment ("SGL-25-001" -> 100 to 199).
+
+        Returns:
+            List of (job key, PO count), shortest and lowest first
+        """
+        text = text.strip()
+        if '-' in text:
+            prefix = text.rsplit('-', 1)[1].strip()
+            keys, order = self.sorted_padded_keys, self.padded_order
+        else:
+            prefix = text.lstrip('0')
+            keys, order = self.sorted_keys, None
+
+        if not prefix:
+            return []
+
+        lo = np.searchsorted(keys, prefix, side='left')
+        hi = np.searchsorted(keys, prefix + PREFIX_END, side='left')
+        matches = order[lo:hi] if order is not None else np.arange(lo, hi)
+        candidates = heapq.nsmallest(limit, self.sorted_keys[matches],
+                                     key=lambda key: (len(key), key))
+
+        return [(key, self.po_count(key)) for key in candidates]
@@ -1,10 +1,25 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
 import os
-from processor import process_files, find_job_pos
+import importlib
+from console_log import ConsoleLogPump
 import threading
-from datetime import datetime
+import multiprocessing
+
+# Delay after the last keystroke before refreshing job suggestions
+SUGGEST_DELAY_MS = 200
+
+# Imported on first use, or in the background once the window is up, so
+# the window does not wait for pandas to load
+DEFERRED_MODULES = ['pandas', 'numpy', 'openpyxl', 'processor', 'incremental', 'job_index']
+
+class LoadCancelled(Exception):
+    """Raised on the load thread once Cancel Load is pressed"""
+
+def warm_up_imports():
+    """Import the data modules ahead of their first use"""
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
 
 class ProdSyncApp:
     def __init__(self, root):
@@ -18,8 +33,16 @@ class ProdSyncApp:
         self.file2_path = tk.StringVar()
         self.selected_sheet = tk.StringVar()
         self.job_entry = tk.StringVar()
+        self.all_sheets = tk.BooleanVar(value=False)
+        self.workers = tk.IntVar(value=os.cpu_count() or 1)
         self.sheets_list = []
+        self.load_generation = 0  # Bumped per production load; stale results are dropped
+        self.load_cancel = threading.Event()  # Set to stop the production load in progress
+        self.sheets_generation = 0
+        self.loading = False
+        self.busy_count = 0
         self.df2 = None  # Store Data Sheet 2 for job lookup
+        self.job_index = None  # JobIndex over self.df2, rebuilt when it changes
         
         # Colors - Clean modern look
         self.bg_color = "#ffffff"
@@ -165,6 +188,19 @@ class ProdSyncApp:
                  cursor='hand2',
                  command=self.select_file2).pack(side=tk.LEFT)
         
+        self.cancel_load_btn = tk.Button(file2_row, 
+                                         text="✖ Cancel",
+                                         font=('Segoe UI', 9),
+                                         bg='#f1f5f9',
+                                         fg=self.text_color,
+                                         relief='flat',
+                                         padx=10,
+                                         pady=2,
+                                         cursor='hand2',
+                                         command=self.cancel_load,
+                                         state='disabled')
+        self.cancel_load_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Sheet selection
         sheet_row = tk.Frame(content_frame, bg=self.bg_color)
         sheet_row.pack(fill=tk.X, pady=(10, 5))
@@ -193,6 +229,28 @@ class ProdSyncApp:
                  cursor='hand2',
                  command=self.load_sheets).pack(side=tk.LEFT)
         
+        tk.Checkbutton(sheet_row,
+                      text="All sheets",
+                      variable=self.all_sheets,
+                      font=('Segoe UI', 9),
+                      fg=self.text_color,
+                      bg=self.bg_color,
+                      activebackground=self.bg_color,
+                      cursor='hand2').pack(side=tk.LEFT, padx=(10, 0))
+        
+        tk.Label(sheet_row,
+                text="Workers:",
+                font=('Segoe UI', 9),
+                fg=self.text_color,
+                bg=self.bg_color).pack(side=tk.LEFT, padx=(10, 0))
+        
+        tk.Spinbox(sheet_row,
+                  from_=1,
+                  to=os.cpu_count() or 1,
+                  textvariable=self.workers,
+                  width=4,
+                  font=('Segoe UI', 9)).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Job Lookup Section
         job_frame = tk.Frame(main_container, bg=self.bg_color, highlightbackground=self.border_color, highlightthickness=1)
         job_frame.pack(fill=tk.X, pady=(0, 15))
@@ -214,6 +272,7 @@ class ProdSyncApp:
         # Job entry
         job_entry_row = tk.Frame(job_content, bg=self.bg_color)
         job_entry_row.pack(fill=tk.X)
+        self.job_entry_row = job_entry_row
         
         tk.Label(job_entry_row, 
                 text="Enter Job Number:",
@@ -230,6 +289,10 @@ class ProdSyncApp:
                                         relief='solid',
                                         borderwidth=1)
         self.job_entry_widget.pack(side=tk.LEFT, padx=(0, 10), fill=tk.X, expand=True)
+        self.job_entry_widget.bind('<KeyRelease>', self.schedule_suggestions)
+        self.job_entry_widget.bind('<Return>', self.on_job_entry_return)
+        self.job_entry_widget.bind('<Down>', self.focus_suggestions)
+        self.job_entry_widget.bind('<Escape>', lambda event: self.hide_suggestions())
         
         self.find_po_btn = tk.Button(job_entry_row, 
                                      text="🔎 Find POs",
@@ -244,6 +307,21 @@ class ProdSyncApp:
                                      state='disabled')
         self.find_po_btn.pack(side=tk.LEFT)
         
+        # Type-ahead suggestions, shown under the entry while typing
+        self.suggest_list = tk.Listbox(job_content,
+                                       height=6,
+                                       font=('Consolas', 10),
+                                       bg='#f8fafc',
+                                       fg=self.text_color,
+                                       relief='solid',
+                                       borderwidth=1,
+                                       activestyle='none')
+        self.suggest_list.bind('<Double-Button-1>', self.choose_suggestion)
+        self.suggest_list.bind('<Return>', self.choose_suggestion)
+        self.suggest_list.bind('<Escape>', lambda event: self.hide_suggestions(focus_entry=True))
+        self.suggestions = []
+        self.suggest_after_id = None
+        
         # Example text
         example_label = tk.Label(job_content, 
                                 text="Examples: 196, 240, 263, SGL-25-00196",
@@ -324,6 +402,19 @@ class ProdSyncApp:
                                      state='disabled')
         self.process_btn.pack(side=tk.LEFT)
         
+        self.update_btn = tk.Button(action_frame, 
+                                    text="🔁 Update Previous Report",
+                                    font=('Segoe UI', 10),
+                                    bg='#f1f5f9',
+                                    fg=self.text_color,
+                                    relief='flat',
+                                    padx=15,
+                                    pady=8,
+                                    cursor='hand2',
+                                    command=self.update_report, 
+                                    state='disabled')
+        self.update_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Progress bar
         self.progress = ttk.Progressbar(action_frame, mode='indeterminate',
                                         length=200)
@@ -375,10 +466,23 @@ class ProdSyncApp:
         console_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.console_text.config(yscrollcommand=console_scroll.set)
         
+        # Configure tags for different message types
+        self.console_text.tag_configure("info", foreground=self.console_fg)
+        self.console_text.tag_configure("success", foreground="#4ade80")
+        self.console_text.tag_configure("error", foreground="#f87171")
+        self.console_text.tag_configure("warning", foreground="#fbbf24")
+        
+        # Messages are queued and drained in batches on the Tk main loop
+        self.log_pump = ConsoleLogPump(self.root, self.console_text)
+        self.log_pump.start()
+        
         # Initial console message
         self.log_to_console("ProdSync - Garments Intelligence System initialized")
         self.log_to_console("Ready to process files...")
         
+        # Load the data modules once the window has been drawn
+        self.root.after_idle(self.start_warm_up)
+        
         # Footer
         footer_frame = tk.Frame(main_container, bg=self.bg_color)
         footer_frame.pack(fill=tk.X)
@@ -389,20 +493,20 @@ class ProdSyncApp:
                 fg='#94a3b8',
                 bg=self.bg_color).pack(side=tk.RIGHT)
         
-    def log_to_console(self, message, message_type="info"):
-        """Add timestamped message to console with color coding"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Configure tags for different message types
-        self.console_text.tag_configure("info", foreground=self.console_fg)
-        self.console_text.tag_configure("success", foreground="#4ade80")
-        self.console_text.tag_configure("error", foreground="#f87171")
-        self.console_text.tag_configure("warning", foreground="#fbbf24")
+    def start_warm_up(self):
+        thread = threading.Thread(target=self.run_warm_up)
+        thread.daemon = True
+        thread.start()
         
-        self.console_text.insert(tk.END, f"[{timestamp}] ", "info")
-        self.console_text.insert(tk.END, f"{message}\n", message_type)
-        self.console_text.see(tk.END)
-        self.root.update()
+    def run_warm_up(self):
+        try:
+            warm_up_imports()
+        except Exception as e:
+            self.log_to_console(f"❌ Error loading data modules: {str(e)}", "error")
+            
+    def log_to_console(self, message, message_type="info"):
+        """Queue a timestamped, color-coded console message (safe from any thread)"""
+        self.log_pump.post(message, message_type)
         
     def clear_console(self):
         """Clear the console"""
@@ -422,70 +526,172 @@ class ProdSyncApp:
             self.log_to_console(f"✓ Selected buyer file: {os.path.basename(filename)}", "success")
             
     def select_file2(self):
-        filename = filedialog.askopenfilename(
-            title="Select Production Data File",
+        # Several unit exports are merged into one production dataset
+        filenames = filedialog.askopenfilenames(
+            title="Select Production Data File(s)",
             filetypes=[("Excel files", "*.xlsx *.xls"), 
                       ("CSV files", "*.csv"), 
                       ("All files", "*.*")]
         )
-        if filename:
-            self.file2_path.set(filename)
+        if filenames:
+            self.file2_path.set(os.pathsep.join(filenames))
+            names = ', '.join(os.path.basename(filename) for filename in filenames)
+            self.log_to_console(f"✓ Selected production file(s): {names}", "success")
             # Load Data Sheet 2 for job lookup
             self.load_data_sheet2()
             self.update_buttons()
-            self.log_to_console(f"✓ Selected production file: {os.path.basename(filename)}", "success")
-            
-    def load_data_sheet2(self):
-        """Load Data Sheet 2 for job lookup functionality"""
-        try:
-            self.log_to_console("Loading production data for job lookup...", "info")
             
-            file_ext2 = os.path.splitext(self.file2_path.get())[1].lower()
+    def file2_sources(self):
+        """Production export paths entered in the File 2 field"""
+        return [path.strip() for path in self.file2_path.get().split(os.pathsep) if path.strip()]
             
-            if file_ext2 == '.csv':
-                self.df2 = pd.read_csv(self.file2_path.get())
-            else:
-                self.df2 = pd.read_excel(self.file2_path.get())
+    def begin_busy(self):
+        """Start the progress bar for a background task"""
+        self.busy_count += 1
+        if self.busy_count == 1:
+            self.progress.start()
             
-            self.log_to_console(f"✅ Loaded {len(self.df2)} rows from production data", "success")
+    def end_busy(self):
+        """Stop the progress bar once no background task is running"""
+        self.busy_count = max(self.busy_count - 1, 0)
+        if self.busy_count == 0:
+            self.progress.stop()
             
+    def load_data_sheet2(self):
+        """Load Data Sheet 2 for job lookup functionality on a worker thread"""
+        # A newer load supersedes any load still running
+        self.load_generation += 1
+        generation = self.load_generation
+        # Each load gets its own event so a cancel cannot stop a later load
+        self.load_cancel.set()
+        self.load_cancel = threading.Event()
+        
+        self.df2 = None
+        self.job_index = None
+        self.hide_suggestions()
+        self.find_po_btn.config(state='disabled')
+        self.cancel_load_btn.config(state='normal')
+        if not self.loading:
+            self.loading = True
+            self.begin_busy()
+        
+        self.log_to_console("Loading production data for job lookup...", "info")
+        
+        thread = threading.Thread(target=self.run_load_data_sheet2,
+                                 args=(generation, self.file2_sources(), self.load_cancel))
+        thread.daemon = True
+        thread.start()
+        
+    def run_load_data_sheet2(self, generation, file_paths, cancel):
+        from production_merge import load_production_sources
+        from job_index import JobIndex
+        
+        def progress(message):
+            # The loader reports between stages, so a cancel stops it at
+            # the next one instead of finishing a load nobody will use
+            if cancel.is_set():
+                raise LoadCancelled()
+            self.root.after(0, self.load_progress, generation, message)
+        
+        try:
+            df2 = load_production_sources(file_paths, log=progress)
+            progress("Building job index...")
+            job_index = JobIndex(df2)
+            self.root.after(0, self.data_sheet2_loaded, generation, df2, job_index)
+        except LoadCancelled:
+            return
         except Exception as e:
-            self.log_to_console(f"❌ Error loading production data: {str(e)}", "error")
-            messagebox.showerror("Error", f"Failed to load production data: {str(e)}")
+            self.root.after(0, self.data_sheet2_failed, generation, str(e))
+            
+    def load_progress(self, generation, message):
+        if generation == self.load_generation:
+            self.log_to_console(message, "info")
+            
+    def finish_load(self):
+        self.loading = False
+        self.cancel_load_btn.config(state='disabled')
+        self.end_busy()
+        
+    def data_sheet2_loaded(self, generation, df2, job_index):
+        if generation != self.load_generation:
+            return
+        self.finish_load()
+        self.df2 = df2
+        self.job_index = job_index
+        self.log_to_console(f"✅ Loaded {len(self.df2)} rows from production data", "success")
+        self.update_buttons()
+        
+    def data_sheet2_failed(self, generation, error_msg):
+        if generation != self.load_generation:
+            return
+        self.finish_load()
+        self.log_to_console(f"❌ Error loading production data: {error_msg}", "error")
+        messagebox.showerror("Error", f"Failed to load production data: {error_msg}")
+        
+    def cancel_load(self):
+        """Stop the production data load in progress"""
+        if not self.loading:
+            return
+        self.load_cancel.set()
+        self.load_generation += 1
+        self.finish_load()
+        self.log_to_console("⚠️ Production data load cancelled", "warning")
             
     def load_sheets(self):
         if not self.file1_path.get():
             messagebox.showerror("Error", "Please select buyer orders file first")
             return
-            
+        
+        self.log_to_console("Loading sheets from buyer file...", "info")
+        
+        self.sheets_generation += 1
+        self.begin_busy()
+        thread = threading.Thread(target=self.run_load_sheets,
+                                 args=(self.sheets_generation, self.file1_path.get()))
+        thread.daemon = True
+        thread.start()
+        
+    def run_load_sheets(self, generation, file_path):
         try:
-            self.log_to_console("Loading sheets from buyer file...", "info")
-            
             # Get file extension
-            file_ext = os.path.splitext(self.file1_path.get())[1].lower()
+            file_ext = os.path.splitext(file_path)[1].lower()
             
             if file_ext == '.csv':
-                self.sheets_list = ['Sheet1']  # CSV has only one sheet
+                sheets_list = ['Sheet1']  # CSV has only one sheet
             else:
                 # Read Excel file to get sheet names
-                xl = pd.ExcelFile(self.file1_path.get())
-                self.sheets_list = xl.sheet_names
-            
-            self.sheet_combo['values'] = self.sheets_list
-            if self.sheets_list:
-                self.sheet_combo.current(0)
-                self.selected_sheet.set(self.sheets_list[0])
-                
-            self.log_to_console(f"✅ Found {len(self.sheets_list)} sheets in buyer file", "success")
-            self.update_buttons()
+                import pandas as pd
+                with pd.ExcelFile(file_path) as xl:
+                    sheets_list = xl.sheet_names
             
+            self.root.after(0, self.sheets_loaded, generation, sheets_list)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load sheets: {str(e)}")
-            self.log_to_console(f"❌ Error: {str(e)}", "error")
+            self.root.after(0, self.sheets_failed, generation, str(e))
+            
+    def sheets_loaded(self, generation, sheets_list):
+        self.end_busy()
+        if generation != self.sheets_generation:
+            return
+        
+        self.sheets_list = sheets_list
+        self.sheet_combo['values'] = self.sheets_list
+        if self.sheets_list:
+            self.sheet_combo.current(0)
+            self.selected_sheet.set(self.sheets_list[0])
+            
+        self.log_to_console(f"✅ Found {len(self.sheets_list)} sheets in buyer file", "success")
+        self.update_buttons()
+        
+    def sheets_failed(self, generation, error_msg):
+        self.end_busy()
+        if generation != self.sheets_generation:
+            return
+        messagebox.showerror("Error", f"Failed to load sheets: {error_msg}")
+        self.log_to_console(f"❌ Error: {error_msg}", "error")
             
     def find_pos(self):
         """Find POs for entered job number"""
-        if self.df2 is None:
+        if self.job_index is None:
             messagebox.showerror("Error", "Please load production data first")
             return
             
@@ -501,8 +707,11 @@ class ProdSyncApp:
             self.po_tree.delete(item)
         
         try:
+            import pandas as pd
+            from processor import find_job_pos
+            
             # Call the find_job_pos function from processor
-            results = find_job_pos(self.df2, job_input)
+            results = find_job_pos(self.job_index, job_input)
             
             if results.empty:
                 self.log_to_console(f"⚠️ No POs found for job: {job_input}", "warning")
@@ -535,6 +744,67 @@ class ProdSyncApp:
             import traceback
             traceback.print_exc()
             
+    def schedule_suggestions(self, event=None):
+        """Debounce keystrokes before refreshing job suggestions"""
+        if event is not None and event.keysym in ('Return', 'Down', 'Up', 'Escape'):
+            return
+        if self.suggest_after_id is not None:
+            self.root.after_cancel(self.suggest_after_id)
+        self.suggest_after_id = self.root.after(SUGGEST_DELAY_MS, self.update_suggestions)
+        
+    def update_suggestions(self):
+        """Show candidate jobs with PO counts for the typed text"""
+        self.suggest_after_id = None
+        if self.job_index is None:
+            return
+        
+        self.suggestions = self.job_index.suggest(self.job_entry.get())
+        if not self.suggestions:
+            self.hide_suggestions()
+            return
+        
+        self.suggest_list.delete(0, tk.END)
+        for job, count in self.suggestions:
+            self.suggest_list.insert(tk.END, f"{job:<10} {count:>6,} POs")
+        self.suggest_list.config(height=min(len(self.suggestions), 6))
+        if not self.suggest_list.winfo_ismapped():
+            self.suggest_list.pack(after=self.job_entry_row, anchor='w', fill=tk.X,
+                                   padx=(145, 130), pady=(2, 0))
+        
+    def hide_suggestions(self, focus_entry=False):
+        """Hide the suggestion list"""
+        if self.suggest_after_id is not None:
+            self.root.after_cancel(self.suggest_after_id)
+            self.suggest_after_id = None
+        self.suggest_list.pack_forget()
+        if focus_entry:
+            self.job_entry_widget.focus_set()
+        
+    def focus_suggestions(self, event=None):
+        """Move keyboard focus from the entry into the suggestion list"""
+        if self.suggest_list.winfo_ismapped():
+            self.suggest_list.focus_set()
+            self.suggest_list.selection_clear(0, tk.END)
+            self.suggest_list.selection_set(0)
+            self.suggest_list.activate(0)
+        return 'break'
+        
+    def choose_suggestion(self, event=None):
+        """Look up the selected suggestion"""
+        selection = self.suggest_list.curselection()
+        if not selection:
+            return
+        job, _ = self.suggestions[selection[0]]
+        self.job_entry.set(job)
+        self.hide_suggestions(focus_entry=True)
+        self.find_pos()
+        
+    def on_job_entry_return(self, event=None):
+        """Enter in the job box runs the lookup"""
+        self.hide_suggestions()
+        if str(self.find_po_btn['state']) == 'normal':
+            self.find_pos()
+            
     def clear_results(self):
         """Clear the PO results treeview"""
         for item in self.po_tree.get_children():
@@ -543,8 +813,13 @@ class ProdSyncApp:
             
     def update_buttons(self):
         """Update button states based on loaded files"""
-        if self.file2_path.get() and self.df2 is not None:
+        if self.file2_path.get() and self.job_index is not None:
             self.find_po_btn.config(state='normal')
+        else:
+            self.find_po_btn.config(state='disabled')
+        
+        if self.file2_path.get():
+            self.update_btn.config(state='normal')
         
         if (self.file1_path.get() and self.file2_path.get() and 
             self.selected_sheet.get()):
@@ -553,6 +828,22 @@ class ProdSyncApp:
             self.process_btn.config(state='disabled')
             
     def process_files(self):
+        # Tk variables are read here; the worker thread must not touch them
+        try:
+            workers = self.workers.get()
+        except tk.TclError:
+            workers = 0
+        if workers < 1:
+            messagebox.showerror("Error", "Workers must be a whole number of at least 1")
+            return
+        options = {
+            'file1_path': self.file1_path.get(),
+            'file2_path': self.file2_sources(),
+            'sheet_names': list(self.sheets_list) if self.all_sheets.get() else None,
+            'sheet_name': self.selected_sheet.get(),
+            'workers': workers,
+        }
+        
         # Ask for output file
         output_file = filedialog.asksaveasfilename(
             title="Save Output File",
@@ -565,27 +856,98 @@ class ProdSyncApp:
             
         # Disable buttons and start progress
         self.process_btn.config(state='disabled')
+        self.update_btn.config(state='disabled')
         self.find_po_btn.config(state='disabled')
-        self.progress.start()
+        self.begin_busy()
         
-        # Run processing in separate thread
+        # Run processing in separate thread, reusing the production table
+        # already loaded for Job Lookup
+        df2 = self.df2 if self.job_index is not None else None
         thread = threading.Thread(target=self.run_processing, 
-                                 args=(output_file,))
+                                 args=(output_file, options, df2))
         thread.daemon = True
         thread.start()
         
-    def run_processing(self, output_file):
+    def run_processing(self, output_file, options, df2=None):
         try:
+            from processor import process_files, process_all_sheets
+            
             self.log_to_console("🚀 Starting file processing...", "info")
-            self.log_to_console(f"📁 File 1: {os.path.basename(self.file1_path.get())}", "info")
-            self.log_to_console(f"📁 File 2: {os.path.basename(self.file2_path.get())}", "info")
-            self.log_to_console(f"📄 Selected sheet: {self.selected_sheet.get()}", "info")
+            self.log_to_console(f"📁 File 1: {os.path.basename(options['file1_path'])}", "info")
+            for file2 in options['file2_path']:
+                self.log_to_console(f"📁 File 2: {os.path.basename(file2)}", "info")
             
             # Call the processor function
-            result = process_files(
-                file1_path=self.file1_path.get(),
-                file2_path=self.file2_path.get(),
-                sheet_name=self.selected_sheet.get(),
+            if options['sheet_names'] is not None:
+                self.log_to_console(f"📄 All sheets: {', '.join(options['sheet_names'])}", "info")
+                result = process_all_sheets(
+                    file1_path=options['file1_path'],
+                    file2_path=options['file2_path'],
+                    sheet_names=options['sheet_names'],
+                    output_path=output_file,
+                    status_callback=self.log_to_console,
+                    workers=options['workers'],
+                    df2=df2
+                )
+            else:
+                self.log_to_console(f"📄 Selected sheet: {options['sheet_name']}", "info")
+                result = process_files(
+                    file1_path=options['file1_path'],
+                    file2_path=options['file2_path'],
+                    sheet_name=options['sheet_name'],
+                    output_path=output_file,
+                    status_callback=self.log_to_console,
+                    df2=df2,
+                    workers=options['workers']
+                )
+            
+            if result:
+                self.root.after(0, self.processing_complete, output_file)
+            else:
+                self.root.after(0, self.processing_failed)
+                
+        except Exception as e:
+            self.root.after(0, self.show_error, str(e))
+            
+    def update_report(self):
+        """Update a previous report against the selected production file"""
+        previous_file = filedialog.askopenfilename(
+            title="Select Previous Report or Snapshot",
+            filetypes=[("Reports", "*.xlsx *.snapshot.pkl"), ("All files", "*.*")]
+        )
+        
+        if not previous_file:
+            return
+        
+        output_file = filedialog.asksaveasfilename(
+            title="Save Updated Report",
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+        )
+        
+        if not output_file:
+            return
+        
+        # Disable buttons and start progress
+        self.process_btn.config(state='disabled')
+        self.update_btn.config(state='disabled')
+        self.find_po_btn.config(state='disabled')
+        self.begin_busy()
+        
+        thread = threading.Thread(target=self.run_update, 
+                                 args=(previous_file, output_file, self.file2_sources()))
+        thread.daemon = True
+        thread.start()
+        
+    def run_update(self, previous_file, output_file, file2_sources):
+        try:
+            from incremental import process_incremental
+            
+            self.log_to_console("🔁 Updating previous report...", "info")
+            
+            result = process_incremental(
+                previous_path=previous_file,
+                file2_path=file2_sources,
                 output_path=output_file,
                 status_callback=self.log_to_console
             )
@@ -599,27 +961,35 @@ class ProdSyncApp:
             self.root.after(0, self.show_error, str(e))
             
     def processing_complete(self, output_file):
-        self.progress.stop()
+        self.end_busy()
         self.process_btn.config(state='normal')
-        self.find_po_btn.config(state='normal')
+        self.update_btn.config(state='normal')
+        if self.job_index is not None:
+            self.find_po_btn.config(state='normal')
         self.log_to_console("✅ Processing completed successfully!", "success")
         messagebox.showinfo("Success", 
                            f"File processed successfully!\nSaved to:\n{output_file}")
         
     def processing_failed(self):
-        self.progress.stop()
+        self.end_busy()
         self.process_btn.config(state='normal')
-        self.find_po_btn.config(state='normal')
+        self.update_btn.config(state='normal')
+        if self.job_index is not None:
+            self.find_po_btn.config(state='normal')
         self.log_to_console("❌ Processing failed. Check the console for details.", "error")
         
     def show_error(self, error_msg):
-        self.progress.stop()
+        self.end_busy()
         self.process_btn.config(state='normal')
-        self.find_po_btn.config(state='normal')
+        self.update_btn.config(state='normal')
+        if self.job_index is not None:
+            self.find_po_btn.config(state='normal')
         self.log_to_console(f"❌ Error: {error_msg}", "error")
         messagebox.showerror("Error", f"Processing failed:\n{error_msg}")
 
 def main():
+    # Needed for worker processes in frozen Windows builds
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ProdSyncApp(root)
     root.mainloop()
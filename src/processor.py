@@ -1,8 +1,98 @@
 import pandas as pd
 import numpy as np
 import os
-import re
-from utils import normalize_text, extract_job_number, normalize_dataframe
+from concurrent.futures import ProcessPoolExecutor
+import cache as dataset_cache
+from job_index import JobIndex, JOB_COL_NAMES, ORDER_COL_NAMES, JOB_LOOKUP_COLUMNS
+from analytics import (add_shortage_analytics, highlight_rules, ANALYTICS_COLS,
+                       SHORTAGE_COL, EXCESS_COL)
+from fuzzy_match import suggest_matches, FUZZY_THRESHOLD
+from production_merge import production_files, production_reads, prepare_exports, DEDUPE_LATEST
+from report_writer import write_report, write_csv_reports
+from run_report import RunReport, measure, profiled
+from utils import (normalize_text_series, extract_numeric_job_series,
+                   to_key_series, downcast_quantity_series, parse_quantity_series,
+                   LEADING_ZEROS_PATTERN)
+
+# Stage quantity columns fetched from production data
+NUMERIC_COLS_DF2 = ['Order Qty.', 'Plan Cut Qty', 'Total Cut Qty',
+                    'Cutting balance', 'Total Sew Input Qty',
+                    'Total Sew Output Qty', 'Total Iron Qty',
+                    'Total Packing Finish Qty', 'Total Ship Out']
+
+# Columns carried over from the schedule file
+SCHEDULE_COLS = ['SL', 'JOB NO', 'Order No', 'STYLE NO', 'COLOR']
+
+# Output report layout
+OUTPUT_COLS = [
+    'SL', 'JOB NO', 'Order No', 'STYLE NO', 'COLOR',
+    'Order Qty.', 'Plan Cut Qty', 'Total Cut Qty', 'Cutting balance',
+    'Total Sew Input Qty', 'Total Sew Output Qty', 'Sewing Balance',
+    'Total Iron Qty', 'Total Packing Finish Qty', 'Total Ship Out'
+]
+
+# Schedule file columns: SL, JOB NO, Order No, Style, Color
+COL_MAPPING_DF1 = {
+    'JOB NO': ['JOB NO', 'Job No', 'JOB_NUMBER'],
+    'Order No': ['Order No', 'ORDER NO', 'PO No'],
+    'STYLE NO': ['Style', 'STYLE', 'Style No', 'STYLE NO'],
+    'COLOR': ['Color', 'COLOR', 'Colour']
+}
+
+# Production data columns based on the actual file
+COL_MAPPING_DF2 = {
+    'Job No': ['Job No', 'JOB NO'],
+    'Order No': ['Order No', 'ORDER NO'],
+    'Order Qty.': ['Order Qty.', 'ORDER QTY'],
+    'Plan Cut Qty': ['Plan Cut Qty', 'PLAN CUT QTY'],
+    'Total Cut Qty': ['Total Cut Qty', 'TOTAL CUT QTY'],
+    'Cutting balance': ['Cutting balance', 'CUTTING BALANCE'],
+    'Total Sew Input Qty': ['Total Sew Input Qty', 'TOTAL SEW INPUT'],
+    'Total Sew Output Qty': ['Total Sew Output Qty', 'TOTAL SEW OUTPUT'],
+    'Total Iron Qty': ['Total Iron Qty', 'TOTAL IRON QTY'],
+    'Total Packing Finish Qty': ['Total Packing Finish Qty', 'TOTAL PACKING FINISH'],
+    'Total Ship Out': ['Total Ship Out', 'TOTAL SHIP OUT'],
+    'Style Name': ['Style Name', 'STYLE NAME'],
+    'Item Name': ['Item Name', 'ITEM NAME'],
+    'Ship Date': ['Ship Date', 'SHIP DATE', 'Ex-Factory Date']
+}
+
+# Unparsed quantity cells shown per column in the log
+UNPARSED_SAMPLE_SIZE = 3
+
+# Repeated descriptive production fields, stored as categoricals. Only
+# columns read_production_file() loads (see production_column_names()).
+CATEGORY_COLS = ['Item Name', 'Style Name', 'Ship Date']
+
+# Output workbook sheet names
+RESULT_SHEET_NAME = 'Matched Results'
+COMBINED_SHEET_NAME = 'All Buyers'
+REVIEW_SHEET_NAME = 'Review Matches'
+
+# Excel limits sheet names to 31 characters
+MAX_SHEET_NAME_LENGTH = 31
+
+# Bump when prepare_production_data() output changes, so cached
+# datasets from older versions are not reused
+PRODUCTION_SCHEMA_VERSION = 3
+
+# Key columns used by the matching engine
+MATCH_KEYS = ['MATCH_JOB', 'MATCH_ORDER']
+
+# Descriptive production columns carried into the index. When a key spans
+# several ERP rows (split colors, countries, deliveries) the quantities are
+# summed and these keep the value from the first row.
+INDEX_DESCRIPTIVE_COLS = ['Style Name', 'Item Name', 'Ship Date']
+DESCRIPTIVE_KEEP = 'first'
+
+# Number of ERP rows aggregated into each index key
+SOURCE_ROWS_COL = 'SOURCE_ROWS'
+
+# Processes for parsing input files at the same time. Below
+# CONCURRENT_READ_MIN_BYTES of input, starting the processes would cost
+# more than the parsing they overlap.
+LOAD_WORKERS = os.cpu_count() or 1
+CONCURRENT_READ_MIN_BYTES = 2 * 1024 * 1024
 
 def extract_numeric_from_job(job_string):
     """
@@ -23,17 +113,257 @@ def extract_numeric_from_job(job_string):
     if len(parts) > 1:
         last_part = parts[-1]
         # Remove leading zeros
-        return re.sub(r'^0+', '', last_part)
+        return LEADING_ZEROS_PATTERN.sub('', last_part)
     else:
         # If no hyphens, just remove leading zeros
-        return re.sub(r'^0+', '', job_str)
+        return LEADING_ZEROS_PATTERN.sub('', job_str)
+
+def production_column_names():
+    """
+    All production data header names the processor and Job Lookup can use,
+    collected from the alias lists
+    """
+    names = set(JOB_COL_NAMES) | set(ORDER_COL_NAMES)
+    for possible_names in list(COL_MAPPING_DF2.values()) + list(JOB_LOOKUP_COLUMNS.values()):
+        names.update(possible_names)
+    return names
+
+def read_production_file(file_path, dtype=None):
+    """
+    Load production data, reading only the columns named in the alias lists
+    
+    Args:
+        file_path: Path to the production data file (.xlsx, .xls or .csv)
+        dtype: Optional dtype passed to the pandas reader
+    
+    Returns:
+        DataFrame with the used production columns
+    """
+    wanted = production_column_names()
+    usecols = lambda name: name in wanted
+    
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.csv':
+        return pd.read_csv(file_path, dtype=dtype, usecols=usecols)
+    
+    # Production data is in the first/only sheet
+    return pd.read_excel(file_path, dtype=dtype, usecols=usecols)
+
+def read_error(file_path, error):
+    """ValueError for a failed read that names the file"""
+    return ValueError(f"Could not read {os.path.basename(file_path)}: {error}")
+
+def read_pool_size(file_paths, workers=None):
+    """
+    Number of processes read_concurrently() uses for reads of file_paths
+    
+    Args:
+        file_paths: File path of every read; a file read several times
+            counts once towards CONCURRENT_READ_MIN_BYTES
+        workers: Maximum number of processes (default: LOAD_WORKERS)
+    
+    Returns:
+        Process count, or 1 when the reads run in this process
+    """
+    def size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            # Missing files fail in their read, with the file name
+            return 0
+    
+    workers = min(len(file_paths), workers or LOAD_WORKERS)
+    if workers > 1 and sum(size(path) for path in set(file_paths)) >= CONCURRENT_READ_MIN_BYTES:
+        return workers
+    return 1
+
+def read_concurrently(reads, workers=None):
+    """
+    Run file reads at the same time in worker processes
+    
+    Spreadsheet parsing holds the GIL, so threads would not overlap it.
+    With a single read, a single worker or small inputs the reads run in
+    this process.
+    
+    Args:
+        reads: List of (file path, function, args); functions must be
+            module-level so they can be sent to a worker
+        workers: Maximum number of processes (default: LOAD_WORKERS)
+    
+    Returns:
+        List of results, in reads order
+    
+    Raises:
+        ValueError naming the file whose read failed
+    """
+    results = []
+    workers = read_pool_size([file_path for file_path, _, _ in reads], workers)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(function, *args) for _, function, args in reads]
+            for (file_path, _, _), future in zip(reads, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    raise read_error(file_path, e) from e
+    else:
+        for file_path, function, args in reads:
+            try:
+                results.append(function(*args))
+            except Exception as e:
+                raise read_error(file_path, e) from e
+    
+    return results
+
+def prepare_production_data(df2, log=print, report=None):
+    """
+    Map, type and normalize raw production data for matching and Job Lookup
+    
+    Args:
+        df2: Production data as read by read_production_file(dtype=str)
+        log: Callback for status messages
+        report: Optional RunReport collecting stage measurements
+    
+    Returns:
+        DataFrame with standard column names, stage quantities as compact
+        integers, CATEGORY_COLS as categoricals and the 'JOB_STR' /
+        'Order No_NORM' match keys in the compact key dtype
+    """
+    # Map columns
+    log("\n=== Mapping Production File Columns ===")
+    
+    with measure(report, 'column mapping', len(df2)):
+        df2_renamed = {}
+        for std_col, possible_names in COL_MAPPING_DF2.items():
+            for name in possible_names:
+                if name in df2.columns:
+                    df2_renamed[name] = std_col
+                    log(f"  Mapped '{name}' to '{std_col}'")
+                    break
+        
+        if df2_renamed:
+            df2 = df2.rename(columns=df2_renamed)
+    
+    # Convert numeric columns
+    log("\n=== Converting Data Types ===")
+    
+    with measure(report, 'type conversion', len(df2)):
+        for col in NUMERIC_COLS_DF2:
+            if col in df2.columns:
+                values, unparsed = parse_quantity_series(df2[col])
+                if unparsed.any():
+                    samples = ', '.join(repr(value) for value in
+                                        df2.loc[unparsed, col].unique()[:UNPARSED_SAMPLE_SIZE])
+                    log(f"Warning: {int(unparsed.sum())} '{col}' cells could not be read "
+                        f"as numbers and count as 0 (e.g. {samples})")
+                df2[col] = downcast_quantity_series(values.fillna(0))
+        
+        for col in CATEGORY_COLS:
+            if col in df2.columns:
+                df2[col] = df2[col].astype('category')
+    
+    # Build match keys
+    log("\n=== Preparing Production Data for Matching ===")
+    
+    with measure(report, 'normalization', len(df2)):
+        # Production data already has numeric job numbers
+        if 'Job No' in df2.columns:
+            df2['JOB_STR'] = to_key_series(df2['Job No']).str.strip()
+            unique_jobs = df2['JOB_STR'].unique()[:10].tolist()
+            log(f"Job numbers in production data: {unique_jobs}")
+        else:
+            df2['JOB_STR'] = ""
+            log("Warning: 'Job No' column not found in Production data")
+        
+        # Normalize Order No in production data
+        if 'Order No' in df2.columns:
+            df2['Order No_NORM'] = to_key_series(normalize_text_series(df2['Order No']))
+        else:
+            df2['Order No_NORM'] = ""
+    
+    return df2
+
+def restore_production_dtypes(df2):
+    """
+    Give prepared production data back the dtypes of prepare_production_data()
+    
+    For tables rebuilt from prepared data, such as several exports stacked
+    together or a snapshot read back from SQLite: missing quantities come
+    back as NaN and categoricals or keys as plain objects.
+    
+    Args:
+        df2: Production DataFrame with the prepared column names
+    
+    Returns:
+        The same DataFrame, converted in place
+    """
+    for col in df2.columns:
+        if col in NUMERIC_COLS_DF2:
+            df2[col] = downcast_quantity_series(df2[col].fillna(0))
+        elif col in CATEGORY_COLS:
+            df2[col] = df2[col].astype('category')
+        elif col in ('JOB_STR', 'Order No_NORM'):
+            df2[col] = to_key_series(df2[col])
+        elif df2[col].dtype == object:
+            # Before pandas 3, astype('str') turns missing cells into "nan"
+            df2[col] = df2[col].astype('str').where(df2[col].notna())
+    return df2
+
+def load_production_data(file_path, log=print, use_cache=True, report=None):
+    """
+    Load and prepare production data, reusing the on-disk cache when the
+    file is unchanged
+    
+    Args:
+        file_path: Path to the production data file
+        log: Callback for status messages
+        use_cache: Whether to read from and write to the dataset cache
+        report: Optional RunReport collecting stage measurements
+    
+    Returns:
+        Prepared production DataFrame (see prepare_production_data)
+    """
+    if use_cache:
+        with measure(report, 'load') as record:
+            df2 = dataset_cache.load(file_path, PRODUCTION_SCHEMA_VERSION)
+            record['rows'] = len(df2) if df2 is not None else 0
+        if df2 is not None:
+            log(f"Loaded {len(df2)} rows from Production data (cached)")
+            return df2
+    
+    with measure(report, 'load') as record:
+        df2 = read_production_file(file_path, dtype=str)
+        record['rows'] = len(df2)
+    
+    return finish_production_data(file_path, df2, log, use_cache, report)
+
+def finish_production_data(file_path, df2, log=print, use_cache=True, report=None):
+    """
+    Prepare production data just read from file_path and cache the result
+    
+    Args:
+        df2: Raw data from read_production_file(file_path, dtype=str)
+    
+    Returns:
+        Prepared production DataFrame (see prepare_production_data)
+    """
+    log(f"Loaded {len(df2)} rows from Production data")
+    
+    df2 = prepare_production_data(df2, log, report)
+    
+    if use_cache:
+        with measure(report, 'load'):
+            dataset_cache.store(file_path, PRODUCTION_SCHEMA_VERSION, df2)
+    
+    return df2
 
 def find_job_pos(df2, job_input):
     """
     Find all POs for a given job number
     
     Args:
-        df2: Data Sheet 2 dataframe (production data)
+        df2: Data Sheet 2 dataframe (production data), or a JobIndex built from it
         job_input: Job number to search for (e.g., "196" or "SGL-25-00196")
     
     Returns:
@@ -51,164 +381,149 @@ def find_job_pos(df2, job_input):
         print("No job number extracted")
         return pd.DataFrame()
     
-    # Create a copy
-    df_copy = df2.copy()
+    # Build a one-off index when given a plain DataFrame
+    job_index = df2 if isinstance(df2, JobIndex) else JobIndex(df2)
     
-    # Print column names for debugging
-    print(f"Available columns in production data: {list(df_copy.columns)}")
+    if job_index.job_col is None:
+        print("No Job No column found in production data")
+        return pd.DataFrame()
     
-    # Find Job No column in production data - based on your actual data
-    job_col = None
-    # Your production data has 'Job No' column (from the analysis)
-    possible_job_cols = ['Job No', 'JOB NO', 'job no', 'Job_No']
+    for display_col in job_index.missing_columns:
+        print(f"Warning: No column found for '{display_col}'")
     
-    for col in possible_job_cols:
-        if col in df_copy.columns:
-            job_col = col
-            print(f"Found Job No column: '{job_col}'")
-            break
+    result_df = job_index.find(search_job)
     
-    if job_col is None:
-        print("No Job No column found in production data")
+    if result_df.empty:
+        print(f"No matches found for job: {job_input}")
         return pd.DataFrame()
     
-    # Production data already has numeric job numbers (196, 202, etc.)
-    # Convert to string for comparison
-    df_copy['JOB_STR'] = df_copy[job_col].astype(str).str.strip()
+    print(f"Returning {len(result_df)} results")
+    return result_df
+
+def build_production_index(df2):
+    """
+    Build the keyed production table used for matching
     
-    # Print sample job numbers
-    sample_jobs = df_copy['JOB_STR'].head(10).tolist()
-    print(f"Sample job numbers in production data: {sample_jobs}")
+    Args:
+        df2: Prepared production data with 'JOB_STR' and 'Order No_NORM' columns
     
-    # Direct match (production data has numeric like "196")
-    mask = df_copy['JOB_STR'] == search_job
-    match_count = mask.sum()
-    print(f"Found {match_count} matching rows for job '{search_job}'")
+    Returns:
+        DataFrame with one row per (job, normalized order) key, the stage
+        quantities summed over all rows of the key, the descriptive columns
+        from its first row, and SOURCE_ROWS_COL counting the rows aggregated
+    """
+    qty_cols = [col for col in NUMERIC_COLS_DF2 if col in df2.columns]
+    descriptive_cols = [col for col in INDEX_DESCRIPTIVE_COLS if col in df2.columns]
     
-    if match_count == 0:
-        # Try without removing leading zeros
-        mask = df_copy['JOB_STR'].str.zfill(3) == search_job.zfill(3)
-        match_count = mask.sum()
-        print(f"Found {match_count} matching rows with zero-padded match")
+    index_df = df2.loc[df2['JOB_STR'] != "", ['JOB_STR', 'Order No_NORM'] + qty_cols + descriptive_cols]
+    index_df = index_df.rename(columns={'JOB_STR': 'MATCH_JOB', 'Order No_NORM': 'MATCH_ORDER'})
     
-    if not mask.any():
-        print(f"No matches found for job: {job_input}")
-        return pd.DataFrame()
+    # One groupby; a per-column agg() dict is several times slower
+    grouped = index_df.groupby(MATCH_KEYS, sort=False, observed=True)
+    parts = []
+    if qty_cols:
+        parts.append(grouped[qty_cols].sum())
+    if descriptive_cols:
+        parts.append(getattr(grouped[descriptive_cols], DESCRIPTIVE_KEEP)())
+    parts.append(grouped.size().rename(SOURCE_ROWS_COL))
     
-    # Select relevant columns for display - BASED ON YOUR ACTUAL DATA
-    # From your proddata.xls, the columns are:
-    # 'Order No', 'Style Name', 'Item Name', 'Order Qty.', 'Ship Date'
+    return pd.concat(parts, axis=1).reset_index()
+
+def match_schedule(df1, production_index, log=print):
+    """
+    Match schedule rows against the production index with a single merge
     
-    column_mapping = {
-        'Order No': ['Order No', 'ORDER NO', 'Order_No'],
-        'Style Name': ['Style Name', 'STYLE NAME', 'Style'],
-        'Item Name': ['Item Name', 'ITEM NAME', 'Item'],
-        'Order Qty.': ['Order Qty.', 'ORDER QTY', 'Qty'],
-        'Ship Date': ['Ship Date', 'SHIP DATE', 'Ex-Factory Date']
-    }
+    Args:
+        df1: Prepared schedule data with 'EXTRACTED_JOB' and 'Order No_NORM' columns
+        production_index: Keyed table from build_production_index()
+        log: Callback for status messages
     
-    # Find available columns
-    available_cols = []
-    col_rename = {}
-    
-    for display_col, possible_names in column_mapping.items():
-        found = False
-        for name in possible_names:
-            if name in df_copy.columns:
-                available_cols.append(name)
-                col_rename[name] = display_col
-                print(f"Found column '{name}' for '{display_col}'")
-                found = True
-                break
-        if not found:
-            print(f"Warning: No column found for '{display_col}'")
-    
-    # If we have the basic columns, create a result
-    if available_cols:
-        result_df = df_copy.loc[mask, available_cols].copy()
-        result_df = result_df.rename(columns=col_rename)
-    else:
-        # Fallback: return whatever we have
-        print("No display columns found, returning basic info")
-        # Try to find at least Order No
-        order_cols = ['Order No', 'ORDER NO', 'Order_No']
-        order_col = None
-        for col in order_cols:
-            if col in df_copy.columns:
-                order_col = col
-                break
-        
-        if order_col:
-            result_df = df_copy.loc[mask, [job_col, order_col]].copy()
-            result_df = result_df.rename(columns={job_col: 'Job No', order_col: 'Order No'})
+    Returns:
+        Tuple of (output DataFrame, matched count, unmatched count)
+    """
+    # .array keeps the key dtype, so both sides of the merge agree
+    keys = pd.DataFrame({
+        'MATCH_JOB': df1['EXTRACTED_JOB'].array,
+        'MATCH_ORDER': df1['Order No_NORM'].array
+    })
+    
+    merged = keys.merge(production_index, on=MATCH_KEYS, how='left',
+                        indicator=True, validate='many_to_one')
+    matched = (merged['_merge'] == 'both').to_numpy()
+    
+    output_df = pd.DataFrame(index=range(len(df1)))
+    for col in SCHEDULE_COLS:
+        output_df[col] = df1[col].to_numpy() if col in df1.columns else ''
+    
+    for col in NUMERIC_COLS_DF2:
+        if col in merged.columns:
+            output_df[col] = merged[col].to_numpy()
         else:
-            result_df = df_copy.loc[mask, [job_col]].copy()
-            result_df = result_df.rename(columns={job_col: 'Job No'})
+            output_df[col] = np.nan
     
-    print(f"Returning {len(result_df)} results")
-    return result_df
+    # Missing sewing columns count as zero for matched rows
+    for col in ['Total Sew Input Qty', 'Total Sew Output Qty']:
+        output_df.loc[matched & output_df[col].isna().to_numpy(), col] = 0
+    
+    output_df['Sewing Balance'] = output_df['Total Sew Input Qty'] - output_df['Total Sew Output Qty']
+    output_df = output_df[OUTPUT_COLS]
+    
+    # Unmatched rows keep blank quantity cells
+    result_cols = OUTPUT_COLS[len(SCHEDULE_COLS):]
+    output_df[result_cols] = output_df[result_cols].astype(object).where(pd.Series(matched), '', axis=0)
+    
+    matched_count = int(matched.sum())
+    unmatched_count = len(merged) - matched_count
+    
+    # Log first few unmatched for debugging
+    known_jobs = set(production_index['MATCH_JOB'])
+    for idx in np.flatnonzero(~matched[:10]):
+        extracted_job = keys.at[idx, 'MATCH_JOB']
+        if extracted_job in known_jobs:
+            log(f"  Job '{extracted_job}' matched but Order No '{keys.at[idx, 'MATCH_ORDER']}' not found")
+        elif extracted_job:
+            log(f"  Job '{extracted_job}' not found in production data")
+    
+    return output_df, matched_count, unmatched_count
 
-def process_files(file1_path, file2_path, sheet_name, output_path, status_callback=None):
+def read_schedule_file(file_path, sheet_names):
     """
-    Main processing function to match and merge the two Excel files
+    Read one or more buyer sheets from the schedule file in a single open
     
     Args:
-        file1_path: Path to Data Sheet 1 (Schedule file with buyer orders)
-        file2_path: Path to Data Sheet 2 (Production data file)
-        sheet_name: Sheet name to read from Data Sheet 1 (e.g., 'Target', 'Kmart')
-        output_path: Path to save the output file
-        status_callback: Optional callback function for status updates
+        file_path: Path to Data Sheet 1 (Schedule file with buyer orders)
+        sheet_names: List of sheet names to read (e.g., ['Target', 'Kmart'])
     
     Returns:
-        Boolean indicating success/failure
+        Dict of sheet name -> DataFrame, in the order requested
     """
+    file_ext = os.path.splitext(file_path)[1].lower()
     
-    def log(message):
-        if status_callback:
-            status_callback(message)
-        print(message)
+    if file_ext == '.csv':
+        # CSV has only one sheet
+        return {sheet_names[0]: pd.read_csv(file_path, dtype=str)}
     
-    try:
-        # Step 1: Load the files
-        log("\n=== Loading Files ===")
-        log(f"File 1 (Schedule): {os.path.basename(file1_path)}")
-        log(f"File 2 (Production): {os.path.basename(file2_path)}")
-        log(f"Selected sheet: {sheet_name}")
-        
-        # Load File 1 (Schedule - Buyer Orders)
-        file_ext1 = os.path.splitext(file1_path)[1].lower()
-        
-        if file_ext1 == '.csv':
-            df1 = pd.read_csv(file1_path, dtype=str)
-        else:
-            df1 = pd.read_excel(file1_path, sheet_name=sheet_name, dtype=str)
-        
-        log(f"Loaded {len(df1)} rows from Schedule file")
-        
-        # Load File 2 (Production Data)
-        file_ext2 = os.path.splitext(file2_path)[1].lower()
-        
-        if file_ext2 == '.csv':
-            df2 = pd.read_csv(file2_path, dtype=str)
-        else:
-            # Production data is in the first/only sheet
-            df2 = pd.read_excel(file2_path, dtype=str)
-        
-        log(f"Loaded {len(df2)} rows from Production data")
-        
-        # Step 2: Map columns in File 1 (Schedule)
-        log("\n=== Mapping Schedule File Columns ===")
-        
-        # Schedule file columns: SL, JOB NO, Order No, Style, Color
-        col_mapping_df1 = {
-            'JOB NO': ['JOB NO', 'Job No', 'JOB_NUMBER'],
-            'Order No': ['Order No', 'ORDER NO', 'PO No'],
-            'STYLE NO': ['Style', 'STYLE', 'Style No', 'STYLE NO'],
-            'COLOR': ['Color', 'COLOR', 'Colour']
-        }
-        
+    sheets = pd.read_excel(file_path, sheet_name=list(sheet_names), dtype=str)
+    return {name: sheets[name] for name in sheet_names}
+
+def prepare_schedule_data(df1, log=print, report=None):
+    """
+    Map schedule columns and build the 'EXTRACTED_JOB' / 'Order No_NORM' match keys
+    
+    Args:
+        df1: Schedule sheet as read by read_schedule_file()
+        log: Callback for status messages
+        report: Optional RunReport collecting stage measurements
+    
+    Returns:
+        Prepared schedule DataFrame
+    """
+    # Map columns
+    log("\n=== Mapping Schedule File Columns ===")
+    
+    with measure(report, 'column mapping', len(df1)):
         df1_renamed = {}
-        for std_col, possible_names in col_mapping_df1.items():
+        for std_col, possible_names in COL_MAPPING_DF1.items():
             for name in possible_names:
                 if name in df1.columns:
                     df1_renamed[name] = std_col
@@ -217,57 +532,14 @@ def process_files(file1_path, file2_path, sheet_name, output_path, status_callba
         
         if df1_renamed:
             df1 = df1.rename(columns=df1_renamed)
-        
-        # Step 3: Map columns in File 2 (Production Data)
-        log("\n=== Mapping Production File Columns ===")
-        
-        # Production data columns based on the actual file
-        col_mapping_df2 = {
-            'Job No': ['Job No', 'JOB NO'],
-            'Order No': ['Order No', 'ORDER NO'],
-            'Order Qty.': ['Order Qty.', 'ORDER QTY'],
-            'Plan Cut Qty': ['Plan Cut Qty', 'PLAN CUT QTY'],
-            'Total Cut Qty': ['Total Cut Qty', 'TOTAL CUT QTY'],
-            'Cutting balance': ['Cutting balance', 'CUTTING BALANCE'],
-            'Total Sew Input Qty': ['Total Sew Input Qty', 'TOTAL SEW INPUT'],
-            'Total Sew Output Qty': ['Total Sew Output Qty', 'TOTAL SEW OUTPUT'],
-            'Total Iron Qty': ['Total Iron Qty', 'TOTAL IRON QTY'],
-            'Total Packing Finish Qty': ['Total Packing Finish Qty', 'TOTAL PACKING FINISH'],
-            'Total Ship Out': ['Total Ship Out', 'TOTAL SHIP OUT'],
-            'Style Name': ['Style Name', 'STYLE NAME'],
-            'Item Name': ['Item Name', 'ITEM NAME'],
-            'Ship Date': ['Ship Date', 'SHIP DATE', 'Ex-Factory Date']
-        }
-        
-        df2_renamed = {}
-        for std_col, possible_names in col_mapping_df2.items():
-            for name in possible_names:
-                if name in df2.columns:
-                    df2_renamed[name] = std_col
-                    log(f"  Mapped '{name}' to '{std_col}'")
-                    break
-        
-        if df2_renamed:
-            df2 = df2.rename(columns=df2_renamed)
-        
-        # Step 4: Convert numeric columns in production data
-        log("\n=== Converting Data Types ===")
-        
-        numeric_cols_df2 = ['Order Qty.', 'Plan Cut Qty', 'Total Cut Qty', 
-                           'Cutting balance', 'Total Sew Input Qty',
-                           'Total Sew Output Qty', 'Total Iron Qty', 
-                           'Total Packing Finish Qty', 'Total Ship Out']
-        
-        for col in numeric_cols_df2:
-            if col in df2.columns:
-                df2[col] = pd.to_numeric(df2[col], errors='coerce').fillna(0)
-        
-        # Step 5: Prepare File 1 for matching
-        log("\n=== Preparing Schedule Data for Matching ===")
-        
+    
+    # Build match keys
+    log("\n=== Preparing Schedule Data for Matching ===")
+    
+    with measure(report, 'normalization', len(df1)):
         # Extract numeric job number from File 1 (Schedule)
         if 'JOB NO' in df1.columns:
-            df1['EXTRACTED_JOB'] = df1['JOB NO'].apply(extract_numeric_from_job)
+            df1['EXTRACTED_JOB'] = to_key_series(extract_numeric_job_series(df1['JOB NO']))
             log(f"Extracted job numbers from Schedule data")
             # Show sample
             sample = df1[['JOB NO', 'EXTRACTED_JOB']].head(3)
@@ -279,148 +551,657 @@ def process_files(file1_path, file2_path, sheet_name, output_path, status_callba
         
         # Normalize Order No
         if 'Order No' in df1.columns:
-            df1['Order No_NORM'] = df1['Order No'].apply(normalize_text)
+            df1['Order No_NORM'] = to_key_series(normalize_text_series(df1['Order No']))
         else:
             df1['Order No_NORM'] = ""
-        
-        # Step 6: Prepare File 2 for matching
-        log("\n=== Preparing Production Data for Matching ===")
-        
-        # Production data already has numeric job numbers
-        if 'Job No' in df2.columns:
-            df2['JOB_STR'] = df2['Job No'].astype(str).str.strip()
-            unique_jobs = df2['JOB_STR'].unique()[:10]
-            log(f"Job numbers in production data: {unique_jobs}")
-        else:
-            df2['JOB_STR'] = ""
-            log("Warning: 'Job No' column not found in Production data")
-        
-        # Normalize Order No in production data
-        if 'Order No' in df2.columns:
-            df2['Order No_NORM'] = df2['Order No'].apply(normalize_text)
+    
+    # Ensure SL column exists
+    if 'SL' not in df1.columns:
+        df1['SL'] = range(1, len(df1) + 1)
+    
+    return df1
+
+def index_production_data(df2, log=print):
+    """
+    Build the production index and log its size
+    """
+    log("\n=== Creating Lookup Index ===")
+    
+    production_index = build_production_index(df2)
+    
+    has_job = df2['JOB_STR'] != ""
+    log(f"Created lookup with {len(production_index)} keys from {int(has_job.sum())} rows "
+        f"for {df2.loc[has_job, 'JOB_STR'].nunique()} unique jobs")
+    
+    collapsed = production_index[SOURCE_ROWS_COL] > 1
+    if collapsed.any():
+        log(f"Aggregated {int(production_index.loc[collapsed, SOURCE_ROWS_COL].sum())} rows "
+            f"sharing a (Job No, Order No) into {int(collapsed.sum())} keys")
+    
+    return production_index
+
+def combine_results(results):
+    """
+    Stack per-buyer results into one sheet with a leading 'Buyer' column
+    
+    Args:
+        results: Dict of sheet name -> output DataFrame
+    """
+    frames = []
+    for sheet_name, output_df in results.items():
+        frame = output_df.copy()
+        frame.insert(0, 'Buyer', sheet_name)
+        frames.append(frame)
+    
+    if not frames:
+        return pd.DataFrame(columns=['Buyer'] + OUTPUT_COLS + ANALYTICS_COLS)
+    return pd.concat(frames, ignore_index=True)
+
+def save_report(output_path, sheets, log=print, output_format='xlsx', highlights=None):
+    """
+    Write result sheets to an Excel workbook (or CSV files), streaming rows to disk
+    
+    Args:
+        output_path: Path to save the output file
+        sheets: Dict of sheet name -> DataFrame, written in order
+        log: Callback for status messages
+        output_format: 'xlsx' for one workbook, 'csv' for one file per sheet
+        highlights: Conditional formats for the workbook, see write_report()
+    
+    Returns:
+        List of written file paths
+    """
+    log(f"\n=== Saving Output ===")
+    log(f"Saving to: {output_path}")
+    
+    if output_format == 'csv':
+        written = write_csv_reports(output_path, sheets)
+    else:
+        write_report(output_path, sheets, highlights)
+        written = [output_path]
+    
+    log("✅ File saved successfully!")
+    return written
+
+def review_unmatched(df1, production_index, sheet_name, fuzzy_threshold, unmatched_count,
+                     log=print):
+    """
+    Fuzzy second pass over the unmatched rows of one prepared sheet
+    
+    Args:
+        fuzzy_threshold: Minimum similarity (0-1); None or 0 skips the pass
+        unmatched_count: Rows without an exact match, for the log
+    
+    Returns:
+        DataFrame of suggestions from suggest_matches(), or None when skipped
+    """
+    if not fuzzy_threshold or not unmatched_count:
+        return None
+    
+    suggestions = suggest_matches(df1, production_index, sheet_name, fuzzy_threshold)
+    if len(suggestions):
+        rows = suggestions['SL'].nunique()
+        log(f"Fuzzy review: {len(suggestions)} suggestions for {rows} of "
+            f"{unmatched_count} unmatched rows (score >= {fuzzy_threshold})")
+    return suggestions
+
+def match_schedule_sheet(df1, sheet_name, production_index, fuzzy_threshold=FUZZY_THRESHOLD):
+    """
+    Prepare and match one buyer sheet
+    
+    Args:
+        df1: Schedule sheet as read by read_schedule_file()
+        sheet_name: Sheet name, for log messages
+        production_index: Keyed table from build_production_index()
+        fuzzy_threshold: Minimum similarity for review suggestions; None or 0
+            skips the fuzzy pass
+    
+    Returns:
+        Tuple of (output DataFrame, matched count, unmatched count,
+        review suggestions or None, log messages)
+    """
+    messages = []
+    messages.append(f"Loaded {len(df1)} rows from Schedule sheet '{sheet_name}'")
+    
+    df1 = prepare_schedule_data(df1, messages.append)
+    output_df, matched_count, unmatched_count = match_schedule(df1, production_index, messages.append)
+    suggestions = review_unmatched(df1, production_index, sheet_name, fuzzy_threshold,
+                                   unmatched_count, messages.append)
+    
+    return output_df, matched_count, unmatched_count, suggestions, messages
+
+# Production index and fuzzy threshold held by each pool worker, set once by _init_worker
+_worker_index = None
+_worker_threshold = None
+
+def _init_worker(production_index, fuzzy_threshold):
+    global _worker_index, _worker_threshold
+    _worker_index = production_index
+    _worker_threshold = fuzzy_threshold
+
+def _run_worker_unit(unit):
+    file1_path, sheet_name, df1 = unit
+    if df1 is None:
+        # Unit not read by the caller: read it in this worker
+        df1 = read_schedule_file(file1_path, [sheet_name])[sheet_name]
+    return match_schedule_sheet(df1, sheet_name, _worker_index, _worker_threshold)
+
+def reconcile_units(units, production_index, workers=1, log=print, frames=None,
+                    fuzzy_threshold=FUZZY_THRESHOLD):
+    """
+    Match schedule units, in parallel when workers > 1
+    
+    The production index is sent to each worker process once through the
+    pool initializer, not with every unit, and the full production frame
+    never leaves the parent process.
+    
+    Args:
+        units: List of (label, schedule file path, sheet name)
+        production_index: Keyed table from build_production_index()
+        workers: Number of worker processes
+        log: Callback for status messages
+        frames: Optional schedule sheets already read, as returned by
+            read_schedule_frames(); units are read from disk otherwise
+        fuzzy_threshold: Minimum similarity for review suggestions, or None
+    
+    Returns:
+        Dict of label -> (output DataFrame, matched count, unmatched count,
+        review suggestions or None), in unit order
+    """
+    frames = frames or {}
+    # Preparing adds key columns, so matching works on a shallow copy of read sheets
+    work = [(file1_path, sheet_name,
+             frames[file1_path][sheet_name].copy(deep=False) if file1_path in frames else None)
+            for _, file1_path, sheet_name in units]
+    
+    if workers > 1 and len(units) > 1:
+        workers = min(workers, len(units))
+        log(f"Matching {len(units)} sheets on {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(production_index, fuzzy_threshold)) as executor:
+            outcomes = list(executor.map(_run_worker_unit, work))
+    else:
+        # Open each schedule file once for all of its sheets
+        sheets_by_file = {}
+        for file1_path, sheet_name, df1 in work:
+            if df1 is None:
+                sheets_by_file.setdefault(file1_path, []).append(sheet_name)
+        read = {file1_path: read_schedule_file(file1_path, names)
+                for file1_path, names in sheets_by_file.items()}
+        outcomes = [match_schedule_sheet(read[file1_path][sheet_name] if df1 is None else df1,
+                                         sheet_name, production_index, fuzzy_threshold)
+                    for file1_path, sheet_name, df1 in work]
+    
+    results = {}
+    for (label, _, _), outcome in zip(units, outcomes):
+        output_df, matched_count, unmatched_count, suggestions, messages = outcome
+        log(f"\n=== Matching Sheet: {label} ===")
+        for message in messages:
+            log(message)
+        if suggestions is not None:
+            suggestions['Sheet'] = label
+        results[label] = (output_df, matched_count, unmatched_count, suggestions)
+    
+    return results
+
+def schedule_units(file1_paths, sheet_names=None):
+    """
+    Expand schedule files into (label, file path, sheet name) units
+    
+    Args:
+        file1_paths: List of schedule file paths
+        sheet_names: Sheets to take from each file, or None for all sheets
+    
+    Returns:
+        List of units with labels that are unique, valid Excel sheet names
+    """
+    files = []
+    for file1_path in file1_paths:
+        if os.path.splitext(file1_path)[1].lower() == '.csv':
+            names = ['Sheet1']
+        elif sheet_names is None:
+            try:
+                with pd.ExcelFile(file1_path) as workbook:
+                    names = workbook.sheet_names
+            except Exception as e:
+                raise read_error(file1_path, e) from e
         else:
-            df2['Order No_NORM'] = ""
-        
-        # Step 7: Create lookup dictionary for fast matching
-        log("\n=== Creating Lookup Dictionary ===")
-        
-        job_lookup = {}
-        lookup_count = 0
-        
-        for idx, row in df2.iterrows():
-            job_num = row.get('JOB_STR', '')
-            order_norm = row.get('Order No_NORM', '')
+            names = list(sheet_names)
+        files.append((file1_path, names))
+    
+    return label_units(files)
+
+def label_units(files):
+    """
+    Label (file path, sheet names) pairs as schedule units
+    
+    Sheets are labelled by name, prefixed with the file name when there
+    is more than one file.
+    
+    Returns:
+        List of (label, file path, sheet name), as schedule_units()
+    """
+    units = []
+    labels = set()
+    for file1_path, names in files:
+        for sheet_name in names:
+            if len(files) > 1:
+                stem = os.path.splitext(os.path.basename(file1_path))[0]
+                label = f"{stem} {sheet_name}"
+            else:
+                label = sheet_name
+            label = label[:MAX_SHEET_NAME_LENGTH]
             
-            if job_num and job_num != "":
-                if job_num not in job_lookup:
-                    job_lookup[job_num] = {}
-                
-                job_lookup[job_num][order_norm] = row.to_dict()
-                lookup_count += 1
-        
-        log(f"Created lookup with {lookup_count} entries for {len(job_lookup)} unique jobs")
-        
-        # Step 8: Process each row in File 1
-        log("\n=== Matching Rows ===")
-        
-        # Ensure SL column exists
-        if 'SL' not in df1.columns:
-            df1['SL'] = range(1, len(df1) + 1)
-        
-        # Define output columns
-        output_cols = [
-            'SL', 'JOB NO', 'Order No', 'STYLE NO', 'COLOR',
-            'Order Qty.', 'Plan Cut Qty', 'Total Cut Qty', 'Cutting balance',
-            'Total Sew Input Qty', 'Total Sew Output Qty', 'Sewing Balance',
-            'Total Iron Qty', 'Total Packing Finish Qty', 'Total Ship Out'
-        ]
-        
-        output_df = pd.DataFrame(columns=output_cols)
-        
-        matched_count = 0
-        unmatched_count = 0
-        
-        for idx, row in df1.iterrows():
-            if idx % 50 == 0 and idx > 0:
-                log(f"Processed {idx} rows...")
+            # Keep labels unique after truncation
+            base, n = label, 2
+            while label in labels:
+                suffix = f" ({n})"
+                label = base[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+                n += 1
+            labels.add(label)
+            units.append((label, file1_path, sheet_name))
+    
+    return units
+
+def read_schedule_frames(file1_paths, sheet_names=None, workers=None):
+    """
+    Read the schedule sheets of every file, each file opened once
+    
+    Args:
+        file1_paths: List of schedule file paths
+        sheet_names: Sheets to take from each file, or None for all sheets
+        workers: Maximum number of processes (default: LOAD_WORKERS)
+    
+    Returns:
+        Dict of file path -> {sheet name: DataFrame}, for run_reconciliation()
+    """
+    reads = schedule_reads(schedule_units(file1_paths, sheet_names), workers)
+    return collect_schedule_frames(reads, read_concurrently(reads, workers))
+
+def schedule_reads(units, workers=None):
+    """
+    Reads of the schedule sheets of units, for read_concurrently()
+    
+    When read_concurrently() would parse the sheets in worker processes,
+    every sheet is its own read so the sheets of one workbook are parsed at
+    the same time; otherwise each file is opened once for all of its sheets.
+    """
+    sheets_by_file = {}
+    for _, file1_path, sheet_name in units:
+        sheets_by_file.setdefault(file1_path, []).append(sheet_name)
+    
+    sheet_paths = [file1_path for _, file1_path, _ in units]
+    if read_pool_size(sheet_paths, workers) > 1:
+        return [(file1_path, read_schedule_file, (file1_path, [sheet_name]))
+                for file1_path, names in sheets_by_file.items() for sheet_name in names]
+    return [(file1_path, read_schedule_file, (file1_path, names))
+            for file1_path, names in sheets_by_file.items()]
+
+def collect_schedule_frames(reads, results):
+    """
+    Group the results of schedule_reads() as {file path: {sheet name: DataFrame}}
+    """
+    frames = {}
+    for (file1_path, _, _), sheets in zip(reads, results):
+        frames.setdefault(file1_path, {}).update(sheets)
+    return frames
+
+def review_sheet(suggestions):
+    """
+    Combine per-sheet fuzzy suggestions into one review sheet
+    
+    Returns:
+        DataFrame, or None when no sheet has a suggestion
+    """
+    frames = [df for df in suggestions if df is not None and len(df)]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+def log_shortages(results, log=print):
+    """
+    Log how many rows of each sheet fall short of or exceed a stage
+    
+    Args:
+        results: Dict of sheet label -> output DataFrame with shortage analytics
+    """
+    log(f"\n=== Shortages ===")
+    for sheet_name, output_df in results.items():
+        shortage = (output_df[SHORTAGE_COL] != '').sum()
+        excess = (output_df[EXCESS_COL] != '').sum()
+        log(f"{sheet_name}: {shortage} rows with a shortage, {excess} with excess")
+
+def log_match_counts(counts, log=print):
+    """
+    Log per-sheet and overall match counts
+    
+    Args:
+        counts: Dict of sheet label -> (matched count, unmatched count)
+    """
+    log(f"\n=== Match Results ===")
+    for sheet_name, (matched_count, unmatched_count) in counts.items():
+        log(f"{sheet_name}: Matched {matched_count}, Unmatched {unmatched_count}, "
+            f"Total {matched_count + unmatched_count}")
+    total_matched = sum(m for m, _ in counts.values())
+    total_unmatched = sum(u for _, u in counts.values())
+    log(f"All sheets: Matched {total_matched}, Unmatched {total_unmatched}, "
+        f"Total {total_matched + total_unmatched}")
+
+def process_files(file1_path, file2_path, sheet_name, output_path, status_callback=None,
+                  report=None, report_path=None, profile_path=None, df2=None,
+                  fuzzy_threshold=FUZZY_THRESHOLD, tolerances=None, dedupe=DEDUPE_LATEST,
+                  workers=None):
+    """
+    Main processing function to match and merge the two Excel files
+    
+    Args:
+        file1_path: Path to Data Sheet 1 (Schedule file with buyer orders)
+        file2_path: Path to Data Sheet 2 (Production data file), a folder of
+            exports or a list of them, merged into one dataset
+        sheet_name: Sheet name to read from Data Sheet 1 (e.g., 'Target', 'Kmart')
+        output_path: Path to save the output file
+        status_callback: Optional callback function for status updates
+        report: Optional RunReport to fill with per-stage measurements;
+            pass RunReport(trace_memory=True) for peak memory per stage
+        report_path: Optional path to write the run report as JSON
+        profile_path: Optional path to dump cProfile stats for the run
+        df2: Production data already prepared from file2_path (e.g. the
+            table loaded for Job Lookup); loaded from file2_path when None
+        fuzzy_threshold: Minimum similarity (0-1) for the review sheet's
+            suggestions for unmatched rows; None or 0 skips the fuzzy pass
+        tolerances: Shortage/excess tolerances per stage, see
+            analytics.stage_tolerances(); None for the defaults
+        dedupe: How rows repeated across several exports are dropped, see
+            production_merge.merge_exports()
+        workers: Processes for reading the input files (default: LOAD_WORKERS)
+    
+    Returns:
+        Boolean indicating success/failure
+    """
+    
+    def log(message):
+        if status_callback:
+            status_callback(message)
+        print(message)
+    
+    if report is None:
+        report = RunReport()
+    
+    try:
+        with profiled(profile_path):
+            # Step 1: Load the files
+            log("\n=== Loading Files ===")
+            log(f"File 1 (Schedule): {os.path.basename(file1_path)}")
+            file2_paths = production_files(file2_path)
+            for path in file2_paths:
+                log(f"File 2 (Production): {os.path.basename(path)}")
+            log(f"Selected sheet: {sheet_name}")
             
-            extracted_job = row.get('EXTRACTED_JOB', '')
-            order_norm = row.get('Order No_NORM', '')
+            # Parse File 1 (Schedule - Buyer Orders) and File 2 (Production
+            # Data) at the same time; column mapping starts once both are read
+            with report.stage('load') as record:
+                reads = [(file1_path, read_schedule_file, (file1_path, [sheet_name]))]
+                cached = {}
+                if df2 is None:
+                    cached, production = production_reads(file2_paths, log)
+                    reads += production
+                results = read_concurrently(reads, workers)
+                df1 = results[0][sheet_name]
+                record['rows'] = (sum(len(df) for df in cached.values()) + len(df1) +
+                                  sum(len(df) for df in results[1:]))
             
-            # Try to find match
-            if extracted_job and extracted_job in job_lookup:
-                # Check if this specific Order No exists for this job
-                if order_norm in job_lookup[extracted_job]:
-                    match_dict = job_lookup[extracted_job][order_norm]
-                    matched_count += 1
-                    
-                    # Calculate sewing balance
-                    sew_input = match_dict.get('Total Sew Input Qty', 0) or 0
-                    sew_output = match_dict.get('Total Sew Output Qty', 0) or 0
-                    sewing_balance = sew_input - sew_output
-                    
-                    output_row = {
-                        'SL': row.get('SL', ''),
-                        'JOB NO': row.get('JOB NO', ''),
-                        'Order No': row.get('Order No', ''),
-                        'STYLE NO': row.get('STYLE NO', ''),
-                        'COLOR': row.get('COLOR', ''),
-                        'Order Qty.': match_dict.get('Order Qty.', ''),
-                        'Plan Cut Qty': match_dict.get('Plan Cut Qty', ''),
-                        'Total Cut Qty': match_dict.get('Total Cut Qty', ''),
-                        'Cutting balance': match_dict.get('Cutting balance', ''),
-                        'Total Sew Input Qty': sew_input,
-                        'Total Sew Output Qty': sew_output,
-                        'Sewing Balance': sewing_balance,
-                        'Total Iron Qty': match_dict.get('Total Iron Qty', ''),
-                        'Total Packing Finish Qty': match_dict.get('Total Packing Finish Qty', ''),
-                        'Total Ship Out': match_dict.get('Total Ship Out', '')
-                    }
-                else:
-                    # Job matched but Order No didn't match
-                    unmatched_count += 1
-                    output_row = create_empty_row(row)
-                    if idx < 10:  # Log first few unmatched for debugging
-                        log(f"  Job '{extracted_job}' matched but Order No '{order_norm}' not found")
+            log(f"Loaded {len(df1)} rows from Schedule file")
+            
+            # Map and normalize File 2 (Production Data)
+            if df2 is None:
+                df2 = prepare_exports(file2_paths, cached, results[1:], log, report=report,
+                                      dedupe=dedupe)
             else:
-                # No job match
-                unmatched_count += 1
-                output_row = create_empty_row(row)
-                if extracted_job and idx < 10:  # Log first few unmatched for debugging
-                    log(f"  Job '{extracted_job}' not found in production data")
+                log(f"Using {len(df2)} rows of Production data already loaded")
+            
+            # Step 2: Prepare File 1 for matching
+            df1 = prepare_schedule_data(df1, log, report)
+            
+            # Step 3: Index production data on the match keys
+            with report.stage('indexing', len(df2)):
+                production_index = index_production_data(df2, log)
             
-            output_df = pd.concat([output_df, pd.DataFrame([output_row])], ignore_index=True)
+            # Step 4: Match every schedule row in one keyed merge
+            log("\n=== Matching Rows ===")
+            
+            with report.stage('matching', len(df1)):
+                output_df, matched_count, unmatched_count = match_schedule(df1, production_index, log)
+            
+            log(f"\n=== Match Results ===")
+            log(f"Matched: {matched_count}")
+            log(f"Unmatched: {unmatched_count}")
+            log(f"Total: {matched_count + unmatched_count}")
+            
+            # Step 5: Stage balances, percentages and shortage flags
+            with report.stage('analytics', len(output_df)):
+                output_df = add_shortage_analytics(output_df, tolerances)
+            log_shortages({sheet_name: output_df}, log)
+            
+            # Step 6: Suggest near matches for unmatched rows
+            with report.stage('review', unmatched_count):
+                review = review_sheet([review_unmatched(df1, production_index, sheet_name,
+                                                        fuzzy_threshold, unmatched_count, log)])
+            
+            # Step 7: Save output file
+            sheets = {RESULT_SHEET_NAME: output_df}
+            if review is not None:
+                sheets[REVIEW_SHEET_NAME] = review
+            with report.stage('write', len(output_df)):
+                save_report(output_path, sheets, log, highlights=highlight_rules(tolerances))
         
-        log(f"\n=== Match Results ===")
-        log(f"Matched: {matched_count}")
-        log(f"Unmatched: {unmatched_count}")
-        log(f"Total: {matched_count + unmatched_count}")
+        log_run_report(report, log, report_path, profile_path)
+        return True
         
-        # Step 9: Save output file
-        log(f"\n=== Saving Output ===")
-        log(f"Saving to: {output_path}")
+    except Exception as e:
+        log(f"❌ Error in processing: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def log_run_report(report, log=print, report_path=None, profile_path=None):
+    """
+    Log the stage summary table and note where the report and profile went
+    """
+    log("\n=== Run Summary ===")
+    log(report.summary_table())
+    
+    if report_path:
+        report.write_json(report_path)
+        log(f"Run report saved: {report_path}")
+    if profile_path:
+        log(f"Profile saved: {profile_path}")
+
+def run_reconciliation(file1_paths, file2_path, output_path, sheet_names=None, workers=1,
+                       output_format='xlsx', log=print, use_cache=True, report=None,
+                       report_path=None, profile_path=None, df2=None, schedule_frames=None,
+                       fuzzy_threshold=FUZZY_THRESHOLD, tolerances=None, dedupe=DEDUPE_LATEST):
+    """
+    Reconcile schedule sheets against one production file and save the report
+    
+    The production data is loaded and indexed once. Every (file, sheet)
+    pair is matched against it, across worker processes when workers > 1.
+    The output has one result sheet per unit plus a combined sheet.
+    
+    Args:
+        file1_paths: List of schedule file paths
+        file2_path: Path to Data Sheet 2 (Production data file), a folder of
+            exports or a list of them, merged into one dataset
+        output_path: Path to save the output file
+        sheet_names: Sheets to take from each file, or None for all sheets
+        workers: Number of worker processes for reading and matching
+        output_format: 'xlsx' or 'csv'
+        log: Callback for status messages
+        use_cache: Whether to use the production dataset cache
+        report: Optional RunReport to fill with per-stage measurements
+        report_path: Optional path to write the run report as JSON
+        profile_path: Optional path to dump cProfile stats (this process only)
+        df2: Production data already prepared from file2_path, or None
+        schedule_frames: Schedule sheets already read by read_schedule_frames();
+            these sheets are matched instead of reading file1_paths again
+        fuzzy_threshold: Minimum similarity (0-1) for the review sheet's
+            suggestions for unmatched rows; None or 0 skips the fuzzy pass
+        tolerances: Shortage/excess tolerances per stage, see
+            analytics.stage_tolerances(); None for the defaults
+        dedupe: How rows repeated across several exports are dropped, see
+            production_merge.merge_exports()
+    
+    Returns:
+        Summary dict with per-sheet match counts, totals, written files,
+        per-stage timings in seconds and the full run report. Errors are raised.
+    """
+    if report is None:
+        report = RunReport()
+    
+    with profiled(profile_path):
+        # Step 1: Load the files
+        log("\n=== Loading Files ===")
+        for file1_path in file1_paths:
+            log(f"File 1 (Schedule): {os.path.basename(file1_path)}")
+        file2_paths = production_files(file2_path)
+        for path in file2_paths:
+            log(f"File 2 (Production): {os.path.basename(path)}")
         
-        # Reorder columns
-        existing_cols = [col for col in output_cols if col in output_df.columns]
-        output_df = output_df[existing_cols]
+        # Parse every schedule sheet and production export at the same time;
+        # column mapping starts once all of them are read
+        with report.stage('load') as record:
+            if schedule_frames is None:
+                units = schedule_units(file1_paths, sheet_names)
+                reads = schedule_reads(units, workers)
+            else:
+                units = label_units([(file1_path, list(schedule_frames[file1_path]))
+                                     for file1_path in file1_paths])
+                reads = []
+            schedule_count = len(reads)
+            cached = {}
+            if df2 is None:
+                cached, production = production_reads(file2_paths, log, use_cache)
+                reads += production
+            results = read_concurrently(reads, workers)
+            if schedule_frames is None:
+                schedule_frames = collect_schedule_frames(reads, results[:schedule_count])
+            record['rows'] = (sum(len(df) for df in cached.values()) +
+                              sum(len(df) for sheets in results[:schedule_count]
+                                  for df in sheets.values()) +
+                              sum(len(df) for df in results[schedule_count:]))
+        log(f"Selected sheets: {', '.join(label for label, _, _ in units)}")
         
-        # Save to Excel
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            output_df.to_excel(writer, sheet_name='Matched Results', index=False)
-            
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Matched Results']
-            for i, column in enumerate(output_df.columns):
-                if len(output_df) > 0:
-                    column_width = max(
-                        output_df[column].astype(str).map(len).max(),
-                        len(column)
-                    )
-                else:
-                    column_width = len(column)
-                worksheet.column_dimensions[chr(65 + i)].width = min(column_width + 2, 50)
+        if df2 is None:
+            df2 = prepare_exports(file2_paths, cached, results[schedule_count:], log, use_cache,
+                                  report, dedupe)
+        else:
+            log(f"Using {len(df2)} rows of Production data already loaded")
+        
+        # Step 2: Index production data once for all units
+        with report.stage('indexing', len(df2)):
+            production_index = index_production_data(df2, log)
+        
+        # Step 3: Match every unit
+        with report.stage('matching') as record:
+            matched = reconcile_units(units, production_index, workers, log, schedule_frames,
+                                      fuzzy_threshold)
+            record['rows'] = sum(len(output_df) for output_df, _, _, _ in matched.values())
+        counts = {label: (m, u) for label, (_, m, u, _) in matched.items()}
+        review = review_sheet([suggestions for _, _, _, suggestions in matched.values()])
+        log_match_counts(counts, log)
         
-        log("✅ File saved successfully!")
+        # Step 4: Stage balances, percentages and shortage flags
+        with report.stage('analytics', record['rows']):
+            results = {label: add_shortage_analytics(output_df, tolerances)
+                       for label, (output_df, _, _, _) in matched.items()}
+        log_shortages(results, log)
+        
+        # Step 5: Save one report with a sheet per unit, the combined sheet
+        # and the fuzzy review sheet when there are suggestions
+        sheets = dict(results)
+        sheets[COMBINED_SHEET_NAME] = combine_results(results)
+        if review is not None:
+            sheets[REVIEW_SHEET_NAME] = review
+        with report.stage('write', sum(len(df) for df in sheets.values())):
+            outputs = save_report(output_path, sheets, log, output_format,
+                                  highlight_rules(tolerances))
+    
+    log_run_report(report, log, report_path, profile_path)
+    
+    total_matched = sum(m for m, _ in counts.values())
+    total_unmatched = sum(u for _, u in counts.values())
+    
+    return {
+        'schedule_files': list(file1_paths),
+        'production_file': file2_path,
+        'production_files': file2_paths,
+        'outputs': outputs,
+        'workers': workers,
+        'sheets': {label: {'matched': m, 'unmatched': u, 'total': m + u}
+                   for label, (m, u) in counts.items()},
+        'matched': total_matched,
+        'unmatched': total_unmatched,
+        'total': total_matched + total_unmatched,
+        'suggestions': 0 if review is None else len(review),
+        'timings': report.timings(),
+        'run_report': report.to_dict()
+    }
+
+def process_all_sheets(file1_path, file2_path, sheet_names, output_path, status_callback=None,
+                       workers=1, df2=None):
+    """
+    Batch mode: match several buyer sheets against one production index
+    
+    The production data is loaded and indexed once. With one worker the
+    schedule workbook is opened once; with more, each worker process reads
+    and matches its own sheets. The output has one result sheet per buyer
+    plus a combined sheet.
+    
+    Args:
+        file1_path: Path to Data Sheet 1 (Schedule file with buyer orders)
+        file2_path: Path to Data Sheet 2 (Production data file), a folder of
+            exports or a list of them
+        sheet_names: Sheet names to read from Data Sheet 1
+        output_path: Path to save the output file
+        status_callback: Optional callback function for status updates
+        workers: Number of worker processes for reading and matching
+        df2: Production data already prepared from file2_path, or None
+    
+    Returns:
+        Boolean indicating success/failure
+    """
+    return process_schedule_files([file1_path], file2_path, output_path, sheet_names,
+                                  status_callback, workers, df2)
+
+def process_schedule_files(file1_paths, file2_path, output_path, sheet_names=None,
+                           status_callback=None, workers=1, df2=None):
+    """
+    Reconcile several schedule files against one production file
+    
+    Every (file, sheet) pair is an independent unit of work, spread over
+    worker processes when workers > 1.
+    
+    Args:
+        file1_paths: List of schedule file paths
+        file2_path: Path to Data Sheet 2 (Production data file), a folder of
+            exports or a list of them
+        output_path: Path to save the output file
+        sheet_names: Sheets to take from each file, or None for all sheets
+        status_callback: Optional callback function for status updates
+        workers: Number of worker processes for reading and matching
+        df2: Production data already prepared from file2_path, or None
+    
+    Returns:
+        Boolean indicating success/failure
+    """
+    
+    def log(message):
+        if status_callback:
+            status_callback(message)
+        print(message)
+    
+    try:
+        run_reconciliation(file1_paths, file2_path, output_path, sheet_names, workers,
+                           log=log, df2=df2)
         return True
         
     except Exception as e:
@@ -428,23 +1209,3 @@ def process_files(file1_path, file2_path, sheet_name, output_path, status_callba
         import traceback
         traceback.print_exc()
         return False
-
-def create_empty_row(row):
-    """Create an empty row template for unmatched entries"""
-    return {
-        'SL': row.get('SL', ''),
-        'JOB NO': row.get('JOB NO', ''),
-        'Order No': row.get('Order No', ''),
-        'STYLE NO': row.get('STYLE NO', ''),
-        'COLOR': row.get('COLOR', ''),
-        'Order Qty.': '',
-        'Plan Cut Qty': '',
-        'Total Cut Qty': '',
-        'Cutting balance': '',
-        'Total Sew Input Qty': '',
-        'Total Sew Output Qty': '',
-        'Sewing Balance': '',
-        'Total Iron Qty': '',
-        'Total Packing Finish Qty': '',
-        'Total Ship Out': ''
-    }
\ No newline at end of file
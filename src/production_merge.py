@@ -0,0 +1,194 @@
+"""
+Merge several Logic ERP exports into one production dataset
+
+Factory units export their production separately. The production side of
+a run can therefore be a list of exports or a folder of them. Exports found
+in the dataset cache are loaded directly; the rest are parsed at the same
+time by processor.read_concurrently(), so the combined load takes about as
+long as the slowest file. Every export then goes through the same column
+aliases (COL_MAPPING_DF2) before the tables are stacked, so differently
+named headers end up in the same column.
+
+By default each (job, order) is kept only from the most recently modified
+export that has it, so cumulative exports of the same orders are not
+added together. With dedupe='row' only exact duplicates of a row in an
+earlier export are dropped, for exports that split one order's rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import cache as dataset_cache
+from exports import scan_exports
+from run_report import measure
+
+DEDUPE_ROW = 'row'
+DEDUPE_LATEST = 'latest'
+DEDUPE_MODES = [DEDUPE_ROW, DEDUPE_LATEST]
+
+# Match key columns added by prepare_production_data()
+KEY_COLS = ['JOB_STR', 'Order No_NORM']
+
+def production_files(sources, patterns=None):
+    """
+    Expand production sources into a list of export paths
+
+    Args:
+        sources: A file or folder path, or a list of them
+        patterns: File name patterns of exports inside folders
+            (default: exports.EXPORT_PATTERNS)
+
+    Returns:
+        List of file paths; several exports are ordered oldest first by
+        modification time, so DEDUPE_LATEST keeps the newest rows
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+
+    files = []
+    for source in sources:
+        if not os.path.isdir(source):
+            files.append(source)
+            continue
+        stats = scan_exports(source, patterns)
+        if not stats:
+            raise FileNotFoundError(f"No production exports found in {source}")
+        files.extend(sorted(stats))
+    # The same export given twice is read once
+    files = list(dict.fromkeys(files))
+    if len(files) > 1:
+        files.sort(key=os.path.getmtime)
+    return files
+
+def production_reads(file_paths, log=print, use_cache=True):
+    """
+    Split exports into cache hits and files still to be parsed
+
+    Args:
+        file_paths: Export paths, as from production_files()
+        log: Callback for status messages
+        use_cache: Whether to read from the dataset cache
+
+    Returns:
+        Tuple of (dict of path -> prepared DataFrame for cache hits,
+        list of reads for processor.read_concurrently())
+    """
+    from processor import PRODUCTION_SCHEMA_VERSION, read_production_file
+
+    cached = {}
+    for file_path in file_paths if use_cache else []:
+        df2 = dataset_cache.load(file_path, PRODUCTION_SCHEMA_VERSION)
+        if df2 is not None:
+            source = ('Production data' if len(file_paths) == 1
+                      else os.path.basename(file_path))
+            log(f"Loaded {len(df2)} rows from {source} (cached)")
+            cached[file_path] = df2
+
+    reads = [(file_path, read_production_file, (file_path, str))
+             for file_path in file_paths if file_path not in cached]
+    return cached, reads
+
+def prepare_exports(file_paths, cached, raw_frames, log=print, use_cache=True, report=None,
+                    dedupe=DEDUPE_LATEST):
+    """
+    Prepare the exports read by production_reads() and merge them
+
+    Args:
+        file_paths: Export paths, as passed to production_reads()
+        cached: Cache hits returned by production_reads()
+        raw_frames: Results of its reads, in order
+
+    Returns:
+        Prepared production DataFrame (see prepare_production_data)
+    """
+    from processor import finish_production_data
+
+    raw_frames = iter(raw_frames)
+    frames = []
+    for file_path in file_paths:
+        if file_path in cached:
+            frames.append(cached[file_path])
+            continue
+        if len(file_paths) > 1:
+            log(f"\n--- {os.path.basename(file_path)} ---")
+        frames.append(finish_production_data(file_path, next(raw_frames), log, use_cache,
+                                             report))
+
+    if len(frames) == 1:
+        return frames[0]
+    return merge_exports(frames, dedupe, log)
+
+def merge_exports(frames, dedupe=DEDUPE_LATEST, log=print):
+    """
+    Stack prepared exports into one table and drop overlapping rows
+
+    Args:
+        frames: Prepared DataFrames, oldest export first
+        dedupe: DEDUPE_ROW to drop rows an earlier export already has, or
+            DEDUPE_LATEST to keep each (job, order) only from the last
+            export that has it
+
+    Returns:
+        Prepared production DataFrame in load_production_data() layout
+    """
+    if dedupe not in DEDUPE_MODES:
+        raise ValueError(f"Unknown dedupe mode '{dedupe}' (expected one of: "
+                         f"{', '.join(DEDUPE_MODES)})")
+
+    from processor import restore_production_dtypes
+
+    columns = list(dict.fromkeys(col for df2 in frames for col in df2.columns))
+    # Columns missing from some exports come back as NaN, and categoricals
+    # with different categories fall back to object
+    merged = restore_production_dtypes(pd.concat(frames, ignore_index=True)[columns])
+    # Position of each row's export, oldest = 0
+    source = np.repeat(np.arange(len(frames)), [len(df2) for df2 in frames])
+
+    if dedupe == DEDUPE_ROW:
+        # A row is dropped only when an earlier export has it; rows repeated
+        # within one export are real ERP rows and stay
+        hashes = pd.util.hash_pandas_object(merged, index=False).to_numpy()
+        first = pd.Series(source).groupby(hashes).transform('min')
+        keep = source == first.to_numpy()
+    else:
+        # Grouping on integer codes is faster than on the key strings
+        codes = [pd.factorize(merged[col])[0] for col in KEY_COLS]
+        latest = pd.Series(source).groupby(codes).transform('max')
+        keep = source == latest.to_numpy()
+
+    dropped = int(len(merged) - keep.sum())
+    if dropped:
+        merged = merged[keep].reset_index(drop=True)
+    log(f"Merged {len(frames)} exports into {len(merged)} rows "
+        f"({dropped} overlapping rows dropped, dedupe={dedupe})")
+    return merged
+
+def load_production_sources(sources, log=print, use_cache=True, report=None,
+                            workers=None, dedupe=DEDUPE_LATEST):
+    """
+    Load one or more production exports as a single prepared dataset
+
+    Args:
+        sources: Export path, folder of exports, or a list of them
+        log: Callback for status messages
+        use_cache: Whether to use the production dataset cache
+        report: Optional RunReport collecting stage measurements
+        workers: Processes for parsing exports (default: LOAD_WORKERS)
+        dedupe: How overlapping rows are dropped, see merge_exports()
+
+    Returns:
+        Prepared production DataFrame (see prepare_production_data)
+    """
+    from processor import read_concurrently
+
+    file_paths = production_files(sources)
+    if len(file_paths) > 1:
+        log(f"\n=== Merging {len(file_paths)} Production Exports ===")
+
+    with measure(report, 'load') as record:
+        cached, reads = production_reads(file_paths, log, use_cache)
+        raw_frames = read_concurrently(reads, workers)
+        record['rows'] = (sum(len(df2) for df2 in cached.values()) +
+                          sum(len(df2) for df2 in raw_frames))
+    return prepare_exports(file_paths, cached, raw_frames, log, use_cache, report, dedupe)
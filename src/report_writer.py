@@ -0,0 +1,184 @@
+"""
+Streaming Excel report writer
+
+Rows are streamed to disk in order, so memory stays bounded regardless of
+report size. XlsxWriter is used in constant_memory mode when installed,
+with openpyxl's write-only mode as fallback. Both give every data cell a
+thin border and the header row its own format. Highlights are
+conditional formats over whole column ranges, so they cost nothing per row.
+"""
+import os
+from utils import compute_column_widths
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Rows converted to Python values at a time while streaming
+WRITE_CHUNK_ROWS = 10000
+
+HEADER_STYLE = {'bold': True, 'bg_color': '#D3D3D3', 'border': 1}
+CELL_STYLE = {'border': 1}
+
+# Conditional format styles by name: (font color, fill color)
+HIGHLIGHT_STYLES = {
+    'shortage': ('9C0006', 'FFC7CE'),
+    'excess': ('9C5700', 'FFEB9C')
+}
+
+def iter_rows(df, chunk_rows=WRITE_CHUNK_ROWS):
+    """
+    Yield DataFrame rows as tuples with NaN/NA mapped to None, converting
+    one chunk at a time
+    """
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+def column_letter(col_num):
+    """Excel column letters for a 0-based column number (0 -> A, 27 -> AB)"""
+    letters = ''
+    col_num += 1
+    while col_num:
+        col_num, remainder = divmod(col_num - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def sheet_highlights(df, highlights):
+    """
+    Resolve highlight rules against one sheet's columns
+
+    Args:
+        df: Sheet DataFrame
+        highlights: List of (column name, formula with {cell}, style name)
+
+    Returns:
+        List of (column number, formula for the first data cell, style name)
+        for the rules whose column is in the sheet, empty for empty sheets
+    """
+    if not highlights or df.empty:
+        return []
+    positions = {col: num for num, col in enumerate(df.columns)}
+    return [(positions[col], formula.format(cell=f"{column_letter(positions[col])}2"), style)
+            for col, formula, style in highlights if col in positions]
+
+def _write_xlsxwriter(output_path, sheets, highlights=None):
+    workbook = xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd'
+    })
+    header_format = workbook.add_format(HEADER_STYLE)
+    cell_format = workbook.add_format(CELL_STYLE)
+    highlight_formats = {name: workbook.add_format({'font_color': f"#{font}", 'bg_color': f"#{fill}"})
+                         for name, (font, fill) in HIGHLIGHT_STYLES.items()}
+
+    try:
+        for sheet_name, df in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+
+            # Column formats carry the border and width for every data cell
+            for col_num, width in enumerate(compute_column_widths(df)):
+                worksheet.set_column(col_num, col_num, width, cell_format)
+
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+            for row_num, values in enumerate(iter_rows(df), start=1):
+                worksheet.write_row(row_num, 0, values)
+
+            for col_num, formula, style in sheet_highlights(df, highlights):
+                worksheet.conditional_format(1, col_num, len(df), col_num, {
+                    'type': 'formula', 'criteria': f"={formula}",
+                    'format': highlight_formats[style]
+                })
+    finally:
+        workbook.close()
+
+def _write_openpyxl(output_path, sheets, highlights=None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    side = Side(style='thin')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    font = Font(bold=True)
+    fill = PatternFill('solid', fgColor='D3D3D3')
+
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+
+        # Widths must be set before the first row is streamed; the column
+        # border covers empty cells, as the xlsxwriter column format does
+        for col_num, width in enumerate(compute_column_widths(df), start=1):
+            dimension = worksheet.column_dimensions[get_column_letter(col_num)]
+            dimension.width = width
+            dimension.border = border
+
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(worksheet, value=str(col))
+            cell.font = font
+            cell.fill = fill
+            cell.border = border
+            header.append(cell)
+        worksheet.append(header)
+
+        # One bordered cell per column, refilled for every row; the
+        # write-only sheet serializes each row as soon as it is appended
+        cells = [WriteOnlyCell(worksheet) for _ in df.columns]
+        for cell in cells:
+            cell.border = border
+        for values in iter_rows(df):
+            row = []
+            for cell, value in zip(cells, values):
+                if value is None:
+                    row.append(None)
+                else:
+                    cell.value = value
+                    row.append(cell)
+            worksheet.append(row)
+
+        for col_num, formula, style in sheet_highlights(df, highlights):
+            font_color, fill_color = HIGHLIGHT_STYLES[style]
+            letter = column_letter(col_num)
+            worksheet.conditional_formatting.add(
+                f"{letter}2:{letter}{len(df) + 1}",
+                FormulaRule(formula=[formula], font=Font(color=font_color),
+                            fill=PatternFill('solid', bgColor=fill_color)))
+
+    workbook.save(output_path)
+
+def write_report(output_path, sheets, highlights=None):
+    """
+    Stream result sheets to an .xlsx workbook
+
+    Args:
+        output_path: Path to save the output file
+        sheets: Dict of sheet name -> DataFrame, written in order
+        highlights: Optional conditional formats as (column name, formula
+            with {cell} for the first data cell, style name) rules, applied
+            to that column's full range in every sheet that has it
+    """
+    if xlsxwriter is not None:
+        _write_xlsxwriter(output_path, sheets, highlights)
+    else:
+        _write_openpyxl(output_path, sheets, highlights)
+
+def write_csv_reports(output_path, sheets):
+    """
+    Write result sheets as CSV: output_path itself for a single sheet,
+    otherwise one "<name>_<sheet>.csv" file per sheet next to it
+
+    Returns:
+        List of written file paths
+    """
+    stem = os.path.splitext(output_path)[0]
+    written = []
+    for sheet_name, df in sheets.items():
+        path = f"{stem}.csv" if len(sheets) == 1 else f"{stem}_{sheet_name}.csv"
+        df.to_csv(path, index=False)
+        written.append(path)
+    return written
@@ -0,0 +1,137 @@
+"""
+Per-stage run instrumentation
+
+A RunReport collects wall time, CPU time, row counts and (optionally) peak
+traced memory for each pipeline stage. Stages that run more than once, such
+as column mapping for the schedule and the production file, are added up
+under one name. The report can be logged as a table, returned as a dict or
+written as JSON. profiled() wraps a run in cProfile and dumps a pstats file.
+"""
+import contextlib
+import cProfile
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+# Pipeline stages, in the order they are shown
+STAGES = ['load', 'column mapping', 'type conversion', 'normalization',
+          'import', 'indexing', 'matching', 'analytics', 'review', 'write']
+
+class RunReport:
+    """
+    Stage measurements for one processing run
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started = datetime.now()
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        """
+        Measure the enclosed block as stage name
+
+        Yields a dict; set its 'rows' key when the row count is only known
+        at the end of the stage.
+        """
+        record = {'rows': rows}
+        start_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = None
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20
+            if start_tracing:
+                tracemalloc.stop()
+            self._add(name, wall, cpu, record['rows'], peak)
+
+    def _add(self, name, wall, cpu, rows, peak):
+        entry = self.stages.setdefault(name, {
+            'stage': name, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': None, 'peak_mb': None, 'calls': 0
+        })
+        entry['wall_s'] += wall
+        entry['cpu_s'] += cpu
+        entry['calls'] += 1
+        if rows is not None:
+            entry['rows'] = (entry['rows'] or 0) + rows
+        if peak is not None:
+            entry['peak_mb'] = max(entry['peak_mb'] or 0.0, peak)
+
+    def ordered_stages(self):
+        """Stage entries, known stages first in pipeline order"""
+        rank = {name: i for i, name in enumerate(STAGES)}
+        return sorted(self.stages.values(), key=lambda entry: rank.get(entry['stage'], len(STAGES)))
+
+    def timings(self):
+        """Stage name -> wall seconds"""
+        return {entry['stage']: round(entry['wall_s'], 3) for entry in self.ordered_stages()}
+
+    def to_dict(self):
+        stages = []
+        for entry in self.ordered_stages():
+            stage = dict(entry, wall_s=round(entry['wall_s'], 4), cpu_s=round(entry['cpu_s'], 4))
+            if stage['peak_mb'] is not None:
+                stage['peak_mb'] = round(stage['peak_mb'], 2)
+            stages.append(stage)
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'trace_memory': self.trace_memory,
+            'stages': stages,
+            'total_wall_s': round(sum(entry['wall_s'] for entry in stages), 4),
+            'total_cpu_s': round(sum(entry['cpu_s'] for entry in stages), 4)
+        }
+
+    def summary_table(self):
+        """Stage timings as a fixed-width text table"""
+        lines = [f"{'Stage':<16}{'Wall s':>9}{'CPU s':>9}{'Rows':>11}{'Peak MB':>9}"]
+        for entry in self.ordered_stages():
+            rows = f"{entry['rows']:,}" if entry['rows'] is not None else '-'
+            peak = f"{entry['peak_mb']:.1f}" if entry['peak_mb'] is not None else '-'
+            lines.append(f"{entry['stage']:<16}{entry['wall_s']:>9.3f}{entry['cpu_s']:>9.3f}"
+                         f"{rows:>11}{peak:>9}")
+        report = self.to_dict()
+        lines.append(f"{'Total':<16}{report['total_wall_s']:>9.3f}{report['total_cpu_s']:>9.3f}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+def measure(report, name, rows=None):
+    """report.stage(name, rows), or a no-op when report is None"""
+    if report is None:
+        return contextlib.nullcontext({'rows': rows})
+    return report.stage(name, rows)
+
+@contextlib.contextmanager
+def profiled(path):
+    """
+    Profile the enclosed block with cProfile and dump pstats to path
+
+    Only the calling thread is profiled; worker processes are not. Does
+    nothing when path is None.
+    """
+    if not path:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
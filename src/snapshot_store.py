@@ -0,0 +1,307 @@
+"""
+Local SQLite store of production snapshots
+
+Each imported ERP export becomes a dated snapshot: the prepared production
+table (standard column names, parsed quantities, match keys) written in
+batches inside one transaction. Rows are stored clustered by snapshot, so a
+whole snapshot loads back as one range scan, and indexed on (job, order,
+snapshot) for history queries across exports. A loaded snapshot can be
+passed to run_reconciliation() or JobIndex like a freshly read export.
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+from cache import content_hash
+from utils import normalize_text
+
+STORE_PATH = os.environ.get(
+    'PRODSYNC_STORE',
+    os.path.join(os.path.expanduser('~'), '.prodsync', 'snapshots.db')
+)
+# Bump when the table layout changes; older stores are not migrated
+STORE_SCHEMA_VERSION = 1
+INSERT_BATCH_SIZE = 10000
+HISTORY_SNAPSHOTS = 6
+
+# Match key columns of prepared production data -> store columns
+KEY_COLUMNS = {'JOB_STR': 'job', 'Order No_NORM': 'order_key'}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY,
+        taken_at TEXT NOT NULL,
+        imported_at TEXT NOT NULL,
+        source_path TEXT,
+        content_hash TEXT,
+        row_count INTEGER NOT NULL,
+        columns TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS snapshots_taken ON snapshots (taken_at, id)",
+    "CREATE INDEX IF NOT EXISTS snapshots_hash ON snapshots (content_hash)",
+    # One row per production row, clustered by snapshot in export order
+    """CREATE TABLE IF NOT EXISTS production (
+        snapshot_id INTEGER NOT NULL,
+        row_no INTEGER NOT NULL,
+        job TEXT,
+        order_key TEXT,
+        PRIMARY KEY (snapshot_id, row_no)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS production_key ON production (job, order_key, snapshot_id)",
+    # Job Lookup within one snapshot, already in export order
+    "CREATE INDEX IF NOT EXISTS production_job ON production (job, snapshot_id, row_no)"
+]
+
+def quote(name):
+    """SQL identifier for a column name such as 'Order Qty.'"""
+    return '"' + name.replace('"', '""') + '"'
+
+def sql_type(series):
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(series):
+        return 'REAL'
+    return 'TEXT'
+
+def column_values(series):
+    """Column as a list of Python values, missing values as None"""
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+        return series.tolist()
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+class SnapshotStore:
+    """
+    Production snapshots in one SQLite database file
+    """
+
+    def __init__(self, path=STORE_PATH):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, STORE_SCHEMA_VERSION):
+            self.conn.close()
+            raise ValueError(f"Snapshot store {path} has schema version {version}, "
+                             f"expected {STORE_SCHEMA_VERSION}")
+        with self.conn:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            self.conn.execute(f'PRAGMA user_version = {STORE_SCHEMA_VERSION}')
+
+    def close(self):
+        # Refresh planner statistics for tables that changed a lot
+        self.conn.execute('PRAGMA optimize')
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def table_columns(self):
+        """Columns of the production table, in table order"""
+        return [row[1] for row in self.conn.execute('PRAGMA table_info(production)')]
+
+    def find_snapshot(self, digest):
+        """Id of the snapshot imported from a file with this content hash, or None"""
+        row = self.conn.execute('SELECT id FROM snapshots WHERE content_hash = ? ORDER BY id',
+                                (digest,)).fetchone()
+        return row[0] if row else None
+
+    def import_frame(self, df2, taken_at=None, source_path=None, digest=None, log=print):
+        """
+        Store prepared production data as a new snapshot
+
+        Args:
+            df2: Production data from load_production_data()
+            taken_at: Snapshot date (datetime or ISO string); defaults to now
+            source_path: Export the data was read from, for reference
+            digest: Content hash of the export, used to skip re-imports
+            log: Callback for status messages
+
+        Returns:
+            Id of the new snapshot
+        """
+        if isinstance(taken_at, datetime):
+            taken_at = taken_at.isoformat(timespec='seconds')
+        taken_at = taken_at or datetime.now().isoformat(timespec='seconds')
+
+        frame = df2.rename(columns=KEY_COLUMNS)
+        data_columns = [col for col in frame.columns if col not in KEY_COLUMNS.values()]
+
+        with self.conn:
+            existing = set(self.table_columns())
+            for col in data_columns:
+                if col not in existing:
+                    self.conn.execute(f'ALTER TABLE production ADD COLUMN {quote(col)} '
+                                      f'{sql_type(frame[col])}')
+
+            cursor = self.conn.execute(
+                'INSERT INTO snapshots (taken_at, imported_at, source_path, content_hash, '
+                'row_count, columns) VALUES (?, ?, ?, ?, ?, ?)',
+                (taken_at, datetime.now().isoformat(timespec='seconds'), source_path, digest,
+                 len(frame), json.dumps(data_columns)))
+            snapshot_id = cursor.lastrowid
+
+            columns = ['job', 'order_key'] + data_columns
+            values = [column_values(frame[col]) if col in frame.columns else [None] * len(frame)
+                      for col in columns]
+            rows = zip([snapshot_id] * len(frame), range(len(frame)), *values)
+            insert = (f"INSERT INTO production (snapshot_id, row_no, "
+                      f"{', '.join(quote(col) for col in columns)}) "
+                      f"VALUES ({', '.join('?' * (len(columns) + 2))})")
+            while True:
+                batch = list(islice(rows, INSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                self.conn.executemany(insert, batch)
+
+        log(f"Stored {len(frame)} rows as snapshot {snapshot_id} ({taken_at})")
+        return snapshot_id
+
+    def import_file(self, file_path, taken_at=None, log=print, use_cache=True, df2=None):
+        """
+        Load a production export and store it as a snapshot
+
+        An export whose contents are already in the store is not parsed or
+        stored again. The snapshot date defaults to the file's mtime.
+
+        Args:
+            df2: Production data already prepared from file_path, or None
+
+        Returns:
+            Tuple of (snapshot id, True if a new snapshot was stored)
+        """
+        from processor import load_production_data
+
+        digest = content_hash(file_path)
+        snapshot_id = self.find_snapshot(digest)
+        if snapshot_id is not None:
+            log(f"{os.path.basename(file_path)} is already stored as snapshot {snapshot_id}")
+            return snapshot_id, False
+
+        if taken_at is None:
+            taken_at = datetime.fromtimestamp(os.path.getmtime(file_path))
+        if df2 is None:
+            df2 = load_production_data(file_path, log, use_cache)
+        snapshot_id = self.import_frame(df2, taken_at, os.path.abspath(file_path), digest, log)
+        return snapshot_id, True
+
+    def snapshots(self):
+        """DataFrame of stored snapshots, oldest first"""
+        return pd.read_sql_query(
+            'SELECT id, taken_at, imported_at, source_path, row_count FROM snapshots '
+            'ORDER BY taken_at, id', self.conn)
+
+    def latest_snapshot(self):
+        row = self.conn.execute(
+            'SELECT id FROM snapshots ORDER BY taken_at DESC, id DESC LIMIT 1').fetchone()
+        if row is None:
+            raise ValueError(f"No snapshots in {self.path}")
+        return row[0]
+
+    def snapshot_columns(self, snapshot_id):
+        row = self.conn.execute('SELECT columns FROM snapshots WHERE id = ?',
+                                (snapshot_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Snapshot {snapshot_id} not found in {self.path}")
+        return json.loads(row[0])
+
+    def load_snapshot(self, snapshot_id=None, log=print):
+        """
+        Load a snapshot as prepared production data
+
+        Args:
+            snapshot_id: Snapshot to load, or None for the latest
+
+        Returns:
+            DataFrame in the layout of load_production_data(), ready for
+            run_reconciliation(df2=...) and JobIndex
+        """
+        from processor import restore_production_dtypes
+
+        if snapshot_id is None:
+            snapshot_id = self.latest_snapshot()
+        data_columns = self.snapshot_columns(snapshot_id)
+
+        select = ', '.join(quote(col) for col in data_columns + ['job', 'order_key'])
+        df2 = pd.read_sql_query(
+            f'SELECT {select} FROM production WHERE snapshot_id = ? ORDER BY row_no',
+            self.conn, params=(snapshot_id,))
+        df2 = restore_production_dtypes(
+            df2.rename(columns={value: key for key, value in KEY_COLUMNS.items()}))
+
+        log(f"Loaded {len(df2)} rows from snapshot {snapshot_id}")
+        return df2
+
+    def find_job_rows(self, search_job, snapshot_id=None):
+        """
+        Job Lookup against a snapshot without loading it
+
+        Args:
+            search_job: Normalized job number, as from extract_numeric_from_job()
+            snapshot_id: Snapshot to search, or None for the latest
+
+        Returns:
+            DataFrame of the Job Lookup display columns (empty if none)
+        """
+        from job_index import JOB_LOOKUP_COLUMNS
+
+        if snapshot_id is None:
+            snapshot_id = self.latest_snapshot()
+        stored = set(self.snapshot_columns(snapshot_id))
+        display = [col for col in JOB_LOOKUP_COLUMNS if col in stored]
+        select = ', '.join(quote(col) for col in display) or 'job AS "Job No"'
+
+        # Same zero-padded fallback as JobIndex.find()
+        for job in dict.fromkeys([search_job, search_job.zfill(3)]):
+            rows = pd.read_sql_query(
+                f'SELECT {select} FROM production '
+                f'WHERE job = ? AND snapshot_id = ? ORDER BY row_no',
+                self.conn, params=(job, snapshot_id))
+            if not rows.empty:
+                return rows
+        return pd.DataFrame()
+
+    def job_history(self, search_job, stages=None, order_no=None, last=HISTORY_SNAPSHOTS):
+        """
+        Stage quantities for one job over the most recent snapshots
+
+        Args:
+            search_job: Normalized job number, as from extract_numeric_from_job()
+            stages: Quantity columns to return (default: all stage columns)
+            order_no: Optional order number to narrow the history to one PO
+            last: Number of most recent snapshots to cover
+
+        Returns:
+            DataFrame with snapshot_id, taken_at, Order No and the stage
+            columns, one row per production row, oldest snapshot first
+        """
+        from processor import NUMERIC_COLS_DF2
+
+        available = set(self.table_columns())
+        stages = [col for col in (stages or NUMERIC_COLS_DF2) if col in available]
+        order_col = 'p."Order No"' if 'Order No' in available else 'p.order_key'
+
+        query = (f'SELECT s.id AS snapshot_id, s.taken_at, {order_col} AS "Order No"'
+                 f'{"".join(", p." + quote(col) for col in stages)} '
+                 f'FROM (SELECT id, taken_at FROM snapshots ORDER BY taken_at DESC, id DESC '
+                 f'LIMIT ?) s JOIN production p ON p.snapshot_id = s.id '
+                 f'WHERE p.job = ?')
+        params = [last, search_job]
+        if order_no is not None:
+            query += ' AND p.order_key = ?'
+            params.append(normalize_text(order_no))
+        query += ' ORDER BY s.taken_at, s.id, p.row_no'
+
+        return pd.read_sql_query(query, self.conn, params=params)
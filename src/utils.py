@@ -2,6 +2,19 @@ import re
 import pandas as pd
 import numpy as np
 
+# Precompiled patterns shared by the scalar and Series normalizers
+LEADING_ZEROS_PATTERN = re.compile(r'^0+')
+NON_DIGIT_PATTERN = re.compile(r'\D+')
+# Everything up to the last hyphen, followed by any leading zeros
+JOB_PREFIX_PATTERN = re.compile(r'^(?:.*-)?0*', re.DOTALL)
+# Thousands separators between digits, e.g. "1,200"
+THOUSANDS_SEPARATOR_PATTERN = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+# Trailing unit after a number, e.g. "1200.00 pcs", "350 Pcs."
+UNIT_SUFFIX_PATTERN = re.compile(r'(?<=[\d.])\s*[A-Za-z]+\.?$')
+
+# Cells the ERP writes for "no quantity"; read as blank, not as errors
+QUANTITY_PLACEHOLDERS = ['', '-', '--', '–', '—', 'N/A', 'NA', 'NIL', 'NONE', 'NULL']
+
 def normalize_text(text):
     """
     Normalize text for matching:
@@ -33,20 +46,115 @@ def extract_job_number(job_string):
     job_str = str(job_string).strip()
     
     # Use regex to find all digits
-    digits = re.findall(r'\d+', job_str)
+    all_digits = NON_DIGIT_PATTERN.sub('', job_str)
     
-    if not digits:
+    if not all_digits:
         return ""
     
-    # Join all digits
-    all_digits = ''.join(digits)
-    
     # Remove leading zeros
-    result = re.sub(r'^0+', '', all_digits)
+    result = LEADING_ZEROS_PATTERN.sub('', all_digits)
     
     # If result is empty (all zeros), return "0"
     return result if result else "0"
 
+def to_text_series(series):
+    """
+    Convert a Series to strings, mapping None/NaN to ""
+    """
+    return series.astype(object).where(series.notna(), "").astype(str)
+
+def normalize_text_series(series):
+    """
+    Series version of normalize_text():
+    - Convert to string
+    - Strip whitespace
+    - Convert to uppercase
+    - None/NaN become ""
+    """
+    return to_text_series(series).str.strip().str.upper()
+
+def extract_numeric_job_series(series):
+    """
+    Series version of processor.extract_numeric_from_job():
+    keeps the part after the last hyphen and removes leading zeros
+    Examples:
+    "SGL-25-00196" -> "196"
+    "JOB-25-01062" -> "1062"
+    "196" -> "196"
+    None -> ""
+    """
+    return to_text_series(series).str.strip().str.replace(JOB_PREFIX_PATTERN, '', regex=True)
+
+# Compact dtype for match keys: Arrow-backed strings when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    KEY_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    KEY_DTYPE = pd.StringDtype('python')
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+def to_key_series(series):
+    """
+    Convert a Series of match keys to KEY_DTYPE, mapping None/NaN to ""
+    """
+    return to_text_series(series).astype(KEY_DTYPE)
+
+def downcast_quantity_series(series):
+    """
+    Compact dtype for a quantity Series without missing values:
+    int32 for whole numbers in range, int64 beyond it, float64 when any
+    value is fractional. Nothing narrower than int32, so stage arithmetic
+    such as Sewing Balance cannot overflow.
+    """
+    if series.dtype.kind == 'f':
+        values = series.to_numpy()
+        if not (np.isfinite(values).all() and np.array_equal(values, np.floor(values))):
+            return series.astype('float64')
+        series = series.astype('int64')
+    
+    if series.empty or (series.min() >= INT32_MIN and series.max() <= INT32_MAX):
+        return series.astype('int32')
+    return series.astype('int64')
+
+def parse_quantity_series(series):
+    """
+    Vectorized quantity parser for ERP text cells
+    Examples:
+    "1,200" -> 1200.0
+    " 350 " -> 350.0
+    "1200.00 pcs" -> 1200.0
+    "-" -> NaN (placeholder)
+    "approx 50" -> NaN (unparsed)
+    
+    Cells that already parse as numbers skip the string cleaning, so clean
+    columns cost one to_numeric() call.
+    
+    Returns:
+        Tuple of (float Series with NaN for blank, placeholder and
+        unparsed cells, boolean Series marking the unparsed cells)
+    """
+    values = pd.to_numeric(series, errors='coerce')
+    if values.dtype.kind not in 'fiub':
+        values = values.astype('float64')
+    failed = values.isna() & series.notna()
+    if not failed.any():
+        return values, failed
+    
+    text = to_text_series(series[failed]).str.strip()
+    placeholder = text.str.upper().isin(QUANTITY_PLACEHOLDERS)
+    cleaned = (text[~placeholder]
+               .str.replace(THOUSANDS_SEPARATOR_PATTERN, '', regex=True)
+               .str.replace(UNIT_SUFFIX_PATTERN, '', regex=True))
+    parsed = pd.to_numeric(cleaned, errors='coerce')
+    
+    values = values.astype('float64')
+    values.loc[parsed.index] = parsed
+    unparsed = pd.Series(False, index=series.index)
+    unparsed.loc[parsed.index[parsed.isna()]] = True
+    return values, unparsed
+
 def normalize_dataframe(df):
     """
     Create a normalized copy of dataframe with additional columns for matching
@@ -59,12 +167,10 @@ def normalize_dataframe(df):
     for col in text_columns:
         if col in df_norm.columns:
             norm_col_name = f"{col}_NORM"
-            df_norm[norm_col_name] = df_norm[col].apply(normalize_text)
+            df_norm[norm_col_name] = normalize_text_series(df_norm[col])
     
     # Ensure Order No column exists
-    if 'Order No' in df_norm.columns:
-        df_norm['Order No_NORM'] = df_norm['Order No'].apply(normalize_text)
-    else:
+    if 'Order No_NORM' not in df_norm.columns:
         df_norm['Order No_NORM'] = ""
     
     # Fill NaN values in numeric columns with 0
@@ -75,7 +181,7 @@ def normalize_dataframe(df):
     
     for col in numeric_columns:
         if col in df_norm.columns:
-            df_norm[col] = pd.to_numeric(df_norm[col], errors='coerce').fillna(0)
+            df_norm[col] = parse_quantity_series(df_norm[col])[0].fillna(0)
     
     return df_norm
 
@@ -111,9 +217,32 @@ def validate_columns(df, required_columns, df_name="DataFrame"):
     missing = [col for col in required_columns if col not in df.columns]
     return (len(missing) == 0, missing)
 
+def compute_column_widths(df, max_width=50, padding=2):
+    """
+    Display width for each column: the longest header or value plus
+    padding, capped at max_width
+    
+    String columns are measured in one vectorized pass; other columns
+    only format their distinct values, which are far fewer than the rows.
+    """
+    widths = []
+    for column in df.columns:
+        longest = len(str(column))
+        values = df[column].dropna()
+        if len(values) > 0:
+            if pd.api.types.is_string_dtype(values.dtype) and values.dtype != object:
+                longest = max(longest, int(values.str.len().max()))
+            else:
+                longest = max(longest, max(len(str(value)) for value in values.unique()))
+        widths.append(min(longest + padding, max_width))
+    return widths
+
 def format_excel_workbook(writer, df, sheet_name):
     """
-    Apply formatting to Excel workbook
+    Apply formatting to an XlsxWriter sheet already written by df.to_excel()
+    
+    Borders and widths are set once per column and the header is rewritten
+    as one row, instead of writing every cell again.
     """
     workbook = writer.book
     worksheet = writer.sheets[sheet_name]
@@ -130,18 +259,8 @@ def format_excel_workbook(writer, df, sheet_name):
     })
     
     # Write headers with formatting
-    for col_num, value in enumerate(df.columns.values):
-        worksheet.write(0, col_num, value, header_format)
-    
-    # Write data with formatting
-    for row_num in range(len(df)):
-        for col_num, value in enumerate(df.iloc[row_num]):
-            worksheet.write(row_num + 1, col_num, value, cell_format)
-    
-    # Auto-adjust column widths
-    for col_num, column in enumerate(df.columns):
-        max_length = max(
-            df[column].astype(str).map(len).max() if len(df) > 0 else 0,
-            len(column)
-        )
-        worksheet.set_column(col_num, col_num, min(max_length + 2, 50))
\ No newline at end of file
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+    
+    # Column formats cover the data cells, with auto-adjusted widths
+    for col_num, width in enumerate(compute_column_widths(df)):
+        worksheet.set_column(col_num, col_num, width, cell_format)
@@ -0,0 +1,292 @@
+"""
+Watch a folder for new ERP exports and reconcile each one
+
+The input directory is polled every few seconds. A file counts as new or
+changed when its size or mtime differs from the last time it was seen, and
+is only picked up once both have stayed the same for the settle time, so a
+half-written export is never read. Its content hash then filters out files
+that were only touched or copied. Each settled export is reconciled against
+the configured schedule sheets and written as a timestamped report.
+
+Schedule sheets are read once and kept in memory until a schedule file
+changes, so a refresh costs only the new export's parse and the match. No
+tkinter is imported; run it through `cli.py watch`.
+"""
+import os
+import time
+from datetime import datetime
+
+from cache import content_hash, file_signature
+from exports import scan_exports
+
+POLL_INTERVAL = 30
+SETTLE_SECONDS = 10
+REPORT_PREFIX = 'reconciliation'
+REPORT_TIMESTAMP = '%Y%m%d_%H%M%S'
+
+class ChangeTracker:
+    """
+    Debounced change detection for a set of files
+
+    update() takes the current (size, mtime) of each file and returns the
+    files that changed and have since been stable for settle_seconds, with
+    their content hash. A changed file whose contents match a file already
+    handed out is dropped.
+    """
+
+    def __init__(self, settle_seconds=SETTLE_SECONDS, clock=time.monotonic):
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self.seen = {}      # path -> (size, mtime, content hash or None)
+        self.pending = {}   # path -> ((size, mtime), time first seen like this)
+
+    def mark_seen(self, stats):
+        """Record files as already handled without hashing them"""
+        for path, stat in stats.items():
+            self.seen[path] = stat + (None,)
+
+    def update(self, stats):
+        """
+        Args:
+            stats: Dict of path -> (size, mtime in ns) for every file present
+
+        Returns:
+            List of (path, content hash) that are ready, oldest mtime first
+        """
+        now = self.clock()
+        ready = []
+        for path in list(self.pending):
+            if path not in stats:
+                del self.pending[path]
+
+        for path, stat in stats.items():
+            seen = self.seen.get(path)
+            if seen is not None and seen[:2] == stat:
+                self.pending.pop(path, None)
+                continue
+
+            pending = self.pending.get(path)
+            if pending is None or pending[0] != stat:
+                # New or still being written: restart the settle clock
+                self.pending[path] = (stat, now)
+                continue
+            if now - pending[1] < self.settle_seconds:
+                continue
+
+            try:
+                digest = content_hash(path)
+            except OSError:
+                # Locked by the writer; try again on the next poll
+                continue
+            del self.pending[path]
+
+            known = {entry[2] for entry in self.seen.values()}
+            self.seen[path] = stat + (digest,)
+            if digest not in known:
+                ready.append((stat[1], path, digest))
+
+        return [(path, digest) for _, path, digest in sorted(ready)]
+
+    def forget(self, paths):
+        """Hand files out again once they settle, as if never seen"""
+        for path in paths:
+            self.seen.pop(path, None)
+
+def report_path(output_dir, export_path, output_format='xlsx', now=None):
+    """
+    Timestamped report path for one export, e.g.
+    reconciliation_erp_20250101_083000.xlsx
+    """
+    stem = os.path.splitext(os.path.basename(export_path))[0]
+    stamp = (now or datetime.now()).strftime(REPORT_TIMESTAMP)
+    return os.path.join(output_dir, f"{REPORT_PREFIX}_{stem}_{stamp}.{output_format}")
+
+class ScheduleStore:
+    """
+    Schedule sheets kept in memory between runs, re-read when a file changes
+    """
+
+    def __init__(self, file1_paths, sheet_names=None, settle_seconds=SETTLE_SECONDS,
+                 clock=time.monotonic, workers=None):
+        self.file1_paths = [os.path.abspath(path) for path in file1_paths]
+        self.sheet_names = sheet_names
+        self.workers = workers
+        self.tracker = ChangeTracker(settle_seconds, clock)
+        self.frames = None
+
+    def stats(self):
+        stats = {}
+        for path in self.file1_paths:
+            _, size, mtime = file_signature(path)
+            stats[path] = (size, mtime)
+        return stats
+
+    def load(self, log=print):
+        """Read every schedule file"""
+        from processor import read_schedule_frames
+
+        self.tracker.mark_seen(self.stats())
+        self.frames = read_schedule_frames(self.file1_paths, self.sheet_names, self.workers)
+        sheets = sum(len(sheets) for sheets in self.frames.values())
+        log(f"Read {sheets} schedule sheets from {len(self.frames)} file(s)")
+
+    def refresh(self, log=print):
+        """
+        Re-read the schedule files that changed and have settled
+
+        A file that cannot be read keeps its previous sheets and is read
+        again on a later poll.
+
+        Returns:
+            True when any schedule file was re-read
+        """
+        from processor import read_schedule_frames
+
+        try:
+            stats = self.stats()
+        except OSError:
+            # Replaced while being saved; look again on the next poll
+            return False
+        changed = [path for path, _ in self.tracker.update(stats)]
+        if not changed:
+            return False
+        try:
+            frames = read_schedule_frames(changed, self.sheet_names, self.workers)
+        except Exception as e:
+            # Possibly saved half-way; the previous sheets stay in use
+            self.tracker.forget(changed)
+            log(f"❌ Error re-reading schedule, keeping previous sheets: {str(e)}")
+            return False
+        self.frames.update(frames)
+        for path in changed:
+            log(f"Schedule changed, re-read: {os.path.basename(path)}")
+        return True
+
+def try_scan_exports(input_dir, patterns=None, log=print):
+    """
+    scan_exports(), or None when the folder cannot be listed right now
+    (e.g. a network share that is offline or being renamed)
+    """
+    try:
+        return scan_exports(input_dir, patterns)
+    except OSError as e:
+        log(f"❌ Cannot read input folder, retrying on the next poll: {str(e)}")
+        return None
+
+def reconcile_export(export_path, schedules, output_dir, output_format='xlsx', workers=1,
+                     use_cache=True, store_path=None, log=print):
+    """
+    Reconcile one export against the schedule sheets in memory
+
+    Args:
+        store_path: Snapshot store to also import the export into, or None
+
+    Returns:
+        run_reconciliation() summary dict, with 'snapshot' when stored
+    """
+    from processor import run_reconciliation, load_production_data
+    from run_report import RunReport
+
+    report = RunReport()
+    df2 = None
+    snapshot = None
+    if store_path:
+        from snapshot_store import SnapshotStore
+
+        df2 = load_production_data(export_path, log, use_cache, report)
+        with SnapshotStore(store_path) as store, report.stage('import', len(df2)):
+            snapshot, _ = store.import_file(export_path, log=log, df2=df2)
+
+    output_path = report_path(output_dir, export_path, output_format)
+    summary = run_reconciliation(schedules.file1_paths, export_path, output_path,
+                                 workers=workers, output_format=output_format, log=log,
+                                 use_cache=use_cache, report=report, df2=df2,
+                                 schedule_frames=schedules.frames)
+    if snapshot is not None:
+        summary['snapshot'] = snapshot
+    return summary
+
+def watch_folder(input_dir, file1_paths, output_dir, sheet_names=None, output_format='xlsx',
+                 workers=1, interval=POLL_INTERVAL, settle_seconds=SETTLE_SECONDS,
+                 patterns=None, use_cache=True, run_existing=False, max_runs=None,
+                 store_path=None, log=print, on_run=None, sleep=time.sleep):
+    """
+    Poll input_dir and reconcile every new or changed export
+
+    Exports already in the folder at start are skipped unless run_existing
+    is set, in which case the newest one is reconciled first. A schedule
+    change re-runs the last export. A failed run, or an input folder that
+    cannot be listed, is logged and the watch goes on.
+
+    Args:
+        input_dir: Folder the ERP drops its exports into
+        file1_paths: List of schedule file paths
+        output_dir: Folder for the timestamped reports
+        sheet_names: Sheets to take from each schedule file, or None for all
+        output_format: 'xlsx' or 'csv'
+        workers: Number of worker processes for reading and matching
+        interval: Seconds between polls
+        settle_seconds: Seconds an export must stay unchanged before it is read
+        patterns: File name patterns of exports (default: exports.EXPORT_PATTERNS)
+        use_cache: Whether to use the production dataset cache
+        run_existing: Reconcile the newest existing export at start
+        max_runs: Stop after this many runs (None: run until interrupted)
+        store_path: Snapshot store to import every export into, or None
+        log: Callback for status messages
+        on_run: Optional callback with each run's summary dict; failed
+            runs pass {'status': 'error', 'production_file': ..., 'error': ...}
+        sleep: Sleep function between polls
+
+    Returns:
+        Number of runs made
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    log("\n=== Watching for Exports ===")
+    log(f"Input folder: {input_dir}")
+    log(f"Reports folder: {output_dir}")
+
+    schedules = ScheduleStore(file1_paths, sheet_names, settle_seconds, workers=workers)
+    schedules.load(log)
+
+    exports = ChangeTracker(settle_seconds)
+    existing = try_scan_exports(input_dir, patterns, log)
+    while existing is None:
+        sleep(interval)
+        existing = try_scan_exports(input_dir, patterns, log)
+    exports.mark_seen(existing)
+    last_export = None
+    queue = []
+    if run_existing and existing:
+        last_export = max(existing, key=lambda path: existing[path][1])
+        queue.append(last_export)
+    log(f"{len(existing)} existing export(s) in folder; polling every {interval}s")
+
+    runs = 0
+    while max_runs is None or runs < max_runs:
+        if schedules.refresh(log) and last_export and last_export not in queue:
+            queue.append(last_export)
+        stats = try_scan_exports(input_dir, patterns, log)
+        if stats is not None:
+            queue.extend(path for path, _ in exports.update(stats))
+
+        while queue and (max_runs is None or runs < max_runs):
+            export_path = queue.pop(0)
+            log(f"\n=== New Export: {os.path.basename(export_path)} ===")
+            try:
+                summary = reconcile_export(export_path, schedules, output_dir, output_format,
+                                           workers, use_cache, store_path, log)
+                summary['status'] = 'ok'
+                log(f"✅ Report saved: {', '.join(summary['outputs'])}")
+            except Exception as e:
+                log(f"❌ Error in processing: {str(e)}")
+                summary = {'status': 'error', 'production_file': export_path, 'error': str(e)}
+            last_export = export_path
+            runs += 1
+            if on_run:
+                on_run(summary)
+
+        if max_runs is None or runs < max_runs:
+            sleep(interval)
+
+    return runs
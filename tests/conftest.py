@@ -0,0 +1,10 @@
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks')
+
+# Modules in src/ import each other by bare name, as main.py does
+sys.path.insert(0, SRC_DIR)
+# The startup tests reuse the benchmark probes and synthetic data
+sys.path.insert(0, BENCHMARKS_DIR)
@@ -0,0 +1,17 @@
+"""
+Job Lookup index
+"""
+import pandas as pd
+
+from job_index import JobIndex
+
+def test_suggestions_count_distinct_pos():
+    df2 = pd.DataFrame({
+        'Job No': ['196', '196', '196', '197', '1962'],
+        # One PO split over two rows, spelled differently
+        'Order No': ['PO1', ' po1', 'PO2', None, 'PO7'],
+    })
+
+    suggestions = JobIndex(df2).suggest('196')
+
+    assert suggestions == [('196', 2), ('1962', 1)]
@@ -0,0 +1,108 @@
+"""
+Keyed matching engine against the original row-by-row matching loop
+"""
+import numpy as np
+import pandas as pd
+
+from processor import (prepare_schedule_data, prepare_production_data, build_production_index,
+                       match_schedule, extract_numeric_from_job, NUMERIC_COLS_DF2, OUTPUT_COLS,
+                       SCHEDULE_COLS, SOURCE_ROWS_COL)
+
+SCHEDULE = pd.DataFrame({
+    'SL': ['1', '2', '3', '4', '5', '6', '7'],
+    'JOB NO': ['SGL-25-00196', '00197', '198', 'JOB-25-01062', 'SGL-25-00199', '196', None],
+    'Order No': ['PO1', ' po2 ', 'Po3', 'PO4', 'PO5', 'PO9', 'PO1'],
+    'Style': ['S1', 'S2', 'S3', 'S4', 'S5', 'S6', 'S7'],
+    'Color': ['Red', 'Blue', 'Green', 'Black', 'White', 'Red', 'Red'],
+})
+
+PRODUCTION = pd.DataFrame({
+    'Job No': ['196', '197', '198', '1062', '200'],
+    'Order No': ['po1', 'PO2', ' PO3 ', 'PO4', 'PO5'],
+    'Order Qty.': ['100', '200', '300', '400', '500'],
+    'Plan Cut Qty': ['105', '210', '315', '420', '525'],
+    'Total Cut Qty': ['90', '190', '290', '390', '490'],
+    'Cutting balance': ['15', '20', '25', '30', '35'],
+    'Total Sew Input Qty': ['80', '180', '', '380', '480'],
+    'Total Sew Output Qty': ['70', '170', '270', '', '470'],
+    'Total Iron Qty': ['60', '160', '260', '360', '460'],
+    'Total Packing Finish Qty': ['50', '150', '250', '350', '450'],
+    'Total Ship Out': ['10', '20', '30', '40', '50'],
+})
+
+def baseline_match(df1, df2):
+    """
+    The matching loop the keyed engine replaced: one dict lookup per
+    schedule row, quantities taken from the production row
+    """
+    def normalize(value):
+        return "" if pd.isna(value) else str(value).strip().upper()
+
+    lookup = {}
+    for _, row in df2.iterrows():
+        job = str(row['Job No']).strip()
+        if job:
+            values = {col: pd.to_numeric(row.get(col), errors='coerce') for col in NUMERIC_COLS_DF2}
+            lookup.setdefault(job, {})[normalize(row['Order No'])] = {
+                col: 0 if pd.isna(value) else value for col, value in values.items()}
+
+    rows = []
+    for _, row in df1.iterrows():
+        output = {'SL': row['SL'], 'JOB NO': row['JOB NO'], 'Order No': row['Order No'],
+                  'STYLE NO': row['Style'], 'COLOR': row['Color']}
+        match = lookup.get(extract_numeric_from_job(row['JOB NO']), {}).get(
+            normalize(row['Order No']))
+        for col in OUTPUT_COLS[len(SCHEDULE_COLS):]:
+            output[col] = ''
+        if match is not None:
+            output.update(match)
+            output['Sewing Balance'] = (match['Total Sew Input Qty'] -
+                                        match['Total Sew Output Qty'])
+        rows.append(output)
+    return pd.DataFrame(rows, columns=OUTPUT_COLS)
+
+def keyed_match(df1, df2):
+    df1 = prepare_schedule_data(df1.copy(), log=lambda _: None)
+    df2 = prepare_production_data(df2.copy(), log=lambda _: None)
+    return match_schedule(df1, build_production_index(df2), log=lambda _: None)
+
+def test_keyed_match_agrees_with_row_loop():
+    expected = baseline_match(SCHEDULE, PRODUCTION)
+
+    output, matched, unmatched = keyed_match(SCHEDULE, PRODUCTION)
+
+    # Rows 1-4 match: prefixed and zero-padded jobs, order case and
+    # whitespace ignored. Rows 5-7: unknown job, unknown order, no job.
+    assert (matched, unmatched) == (4, 3)
+    assert list(output.columns) == OUTPUT_COLS
+    for col in SCHEDULE_COLS:
+        assert output[col].tolist() == expected[col].tolist(), col
+    for col in OUTPUT_COLS[len(SCHEDULE_COLS):]:
+        unmatched_rows = expected[col] == ''
+        assert (output[col] == '').tolist() == unmatched_rows.tolist(), col
+        assert np.array_equal(output.loc[~unmatched_rows, col].astype(float),
+                              expected.loc[~unmatched_rows, col].astype(float)), col
+
+def test_index_sums_rows_of_the_same_key():
+    # One order split over two colors, plus an unrelated order
+    df2 = prepare_production_data(pd.DataFrame({
+        'Job No': ['196', '196', '197'],
+        'Order No': ['PO1', ' po1', 'PO2'],
+        'Order Qty.': ['100', '50', '70'],
+        'Total Cut Qty': ['90', 'n/a', '60'],
+        'Style Name': [None, 'Tee', 'Polo'],
+        'Item Name': ['Shirt', 'Top', 'Shirt'],
+    }), log=lambda _: None)
+
+    index = build_production_index(df2).set_index(['MATCH_JOB', 'MATCH_ORDER'])
+
+    assert len(index) == 2
+    assert index.loc[('196', 'PO1'), 'Order Qty.'] == 150
+    # Unparsed quantities count as 0
+    assert index.loc[('196', 'PO1'), 'Total Cut Qty'] == 90
+    # Descriptive columns keep the first value present
+    assert index.loc[('196', 'PO1'), 'Item Name'] == 'Shirt'
+    assert index.loc[('196', 'PO1'), 'Style Name'] == 'Tee'
+    assert index.loc[('196', 'PO1'), SOURCE_ROWS_COL] == 2
+    assert index.loc[('197', 'PO2'), 'Order Qty.'] == 70
+    assert index.loc[('197', 'PO2'), SOURCE_ROWS_COL] == 1
@@ -0,0 +1,52 @@
+"""
+Merging several production exports into one dataset
+"""
+import os
+
+import pandas as pd
+
+from production_merge import load_production_sources, DEDUPE_ROW
+
+def write_export(path, rows, mtime):
+    pd.DataFrame(rows, columns=['Job No', 'Order No', 'Order Qty.']).to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+
+def load(paths, **kwargs):
+    return load_production_sources([str(path) for path in paths], log=lambda _: None,
+                                   use_cache=False, **kwargs)
+
+def test_row_dedupe_keeps_repeats_within_one_export(tmp_path):
+    older = tmp_path / 'unit1.csv'
+    newer = tmp_path / 'unit2.csv'
+    # Split deliveries can repeat a row exactly within one export
+    write_export(older, [['196', 'PO1', 100], ['196', 'PO1', 100], ['197', 'PO2', 50]], 1000)
+    write_export(newer, [['196', 'PO1', 100], ['198', 'PO3', 75], ['198', 'PO3', 75]], 2000)
+
+    df2 = load([older, newer], dedupe=DEDUPE_ROW)
+
+    assert df2['JOB_STR'].tolist() == ['196', '196', '197', '198', '198']
+    assert df2['Order Qty.'].tolist() == [100, 100, 50, 75, 75]
+
+def test_default_dedupe_takes_each_key_from_newest_export(tmp_path):
+    older = tmp_path / 'unit1.csv'
+    newer = tmp_path / 'unit2.csv'
+    write_export(older, [['196', 'PO1', 100], ['197', 'PO2', 50]], 1000)
+    # Cumulative exports: the newer one restates PO1 with its current total
+    write_export(newer, [['196', 'PO1', 120]], 2000)
+
+    df2 = load([newer, older])
+
+    assert df2['JOB_STR'].tolist() == ['197', '196']
+    assert df2['Order Qty.'].tolist() == [50, 120]
+
+def test_merge_keeps_missing_text_cells_missing(tmp_path):
+    older = tmp_path / 'unit1.csv'
+    newer = tmp_path / 'unit2.csv'
+    write_export(older, [['196', None, 100]], 1000)
+    write_export(newer, [[None, 'PO2', 50]], 2000)
+
+    df2 = load([older, newer])
+
+    # Not the string "nan", which Job Lookup would show
+    assert df2['Order No'].isna().tolist() == [True, False]
+    assert df2['Job No'].isna().tolist() == [False, True]
@@ -0,0 +1,60 @@
+"""
+main.py must open its window without waiting for the data modules, and
+the first Job Lookup must stay within a time budget
+
+The timings reuse the probes of benchmarks/bench_startup.py, each run in a
+fresh interpreter so import costs are counted.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+import bench_startup
+import synthetic
+from conftest import SRC_DIR
+
+DEFERRED = ['pandas', 'numpy', 'openpyxl', 'processor']
+
+# Small export, so the budgets hold on slow office PCs and CI machines
+STARTUP_ROWS = 2000
+# Seconds from process spawn, interpreter startup included
+WINDOW_BUDGET = 5
+LOOKUP_BUDGET = 20
+
+needs_display = pytest.mark.skipif(not bench_startup.display_available(),
+                                   reason='no display for Tk')
+
+@pytest.fixture(scope='module')
+def production(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('startup')
+    _, production_path = synthetic.generate_dataset(str(data_dir), STARTUP_ROWS, 'csv')
+    return production_path, synthetic.lookup_jobs(STARTUP_ROWS)[0]
+
+def test_import_main_defers_data_modules():
+    # A fresh interpreter, since this test session may already hold pandas
+    probe = ("import json, sys\n"
+             f"sys.path.insert(0, {SRC_DIR!r})\n"
+             "import main\n"
+             f"print(json.dumps([name for name in {DEFERRED!r} if name in sys.modules]))\n")
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+@needs_display
+def test_time_to_first_window(tmp_path):
+    result = bench_startup.run_probe('window', str(tmp_path))
+
+    assert 'error' not in result, result.get('error')
+    assert result['since_spawn_s'] < WINDOW_BUDGET
+
+def test_time_to_first_lookup(tmp_path, production):
+    production_path, job = production
+    # Through the window when there is a display, else the same calls without Tk
+    probe = 'lookup' if bench_startup.display_available() else 'lookup_headless'
+    result = bench_startup.run_probe(probe, str(tmp_path), production=production_path, job=job)
+
+    assert 'error' not in result, result.get('error')
+    assert result['rows_shown'] > 0
+    assert result['since_spawn_s'] < LOOKUP_BUDGET
@@ -0,0 +1,67 @@
+"""
+Vectorized normalizers and parsers in utils.py
+"""
+import math
+
+import pandas as pd
+import pytest
+
+from processor import prepare_production_data
+from utils import parse_quantity_series
+
+@pytest.mark.parametrize('cell, value, unparsed', [
+    # Clean numbers
+    ('1200', 1200, False),
+    ('0', 0, False),
+    ('-5', -5, False),
+    (' 350 ', 350, False),
+    # Thousands separators
+    ('1,200', 1200, False),
+    ('1,234,567', 1234567, False),
+    ('-1,200', -1200, False),
+    ('1,20', None, True),
+    # Trailing units
+    ('12 pcs', 12, False),
+    ('12pcs', 12, False),
+    ('1,200.00 PCS', 1200, False),
+    ('30 doz.', 30, False),
+    # Blanks and placeholders
+    (None, None, False),
+    ('', None, False),
+    ('   ', None, False),
+    ('-', None, False),
+    ('N/A', None, False),
+    ('nil', None, False),
+    # Text that is not a quantity
+    ('approx 50', None, True),
+    ('(5)', None, True),
+    ('1.200,50', None, True),
+])
+def test_parse_quantity_cell(cell, value, unparsed):
+    values, failed = parse_quantity_series(pd.Series(['7', cell], dtype=object))
+
+    assert values[0] == 7 and not failed[0]
+    if value is None:
+        assert math.isnan(values[1])
+    else:
+        assert values[1] == value
+    assert bool(failed[1]) == unparsed
+
+def test_unparsed_cells_are_counted_per_column():
+    messages = []
+    df2 = prepare_production_data(pd.DataFrame({
+        'Job No': ['196', '197', '198'],
+        'Order No': ['PO1', 'PO2', 'PO3'],
+        'Order Qty.': ['x', 'y', '1,500'],
+        'Total Cut Qty': ['10', '-', 'approx 3'],
+    }), log=messages.append)
+
+    warnings = [message for message in messages if message.startswith('Warning')]
+    assert warnings == [
+        "Warning: 2 'Order Qty.' cells could not be read as numbers and count as 0 "
+        "(e.g. 'x', 'y')",
+        "Warning: 1 'Total Cut Qty' cells could not be read as numbers and count as 0 "
+        "(e.g. 'approx 3')",
+    ]
+    assert df2['Order Qty.'].tolist() == [0, 0, 1500]
+    assert df2['Total Cut Qty'].tolist() == [10, 0, 0]
@@ -0,0 +1,76 @@
+"""
+watch_folder keeps polling through bad schedule and export files
+"""
+import pandas as pd
+
+from watch import watch_folder
+
+def write_schedule(path):
+    pd.DataFrame({'SL': [1, 2], 'JOB NO': ['SGL-25-00196', 'SGL-25-00197'],
+                  'Order No': ['PO1', 'PO2'], 'Style': ['S1', 'S2'],
+                  'Color': ['Red', 'Blue']}).to_excel(path, sheet_name='Target', index=False)
+
+def write_export(path):
+    pd.DataFrame({'Job No': ['196', '197'], 'Order No': ['PO1', 'PO2'],
+                  'Order Qty.': [100, 200], 'Total Cut Qty': [90, 180]}).to_csv(path, index=False)
+
+def test_bad_schedule_keeps_previous_sheets(tmp_path):
+    input_dir = tmp_path / 'exports'
+    input_dir.mkdir()
+    schedule = tmp_path / 'schedule.xlsx'
+    write_schedule(schedule)
+    write_export(input_dir / 'erp1.csv')
+
+    polls = []
+
+    def sleep(_):
+        polls.append(None)
+        if len(polls) == 1:
+            # Truncated save of the schedule workbook
+            schedule.write_bytes(b'not a workbook')
+        elif len(polls) == 4:
+            write_export(input_dir / 'erp2.csv')
+
+    messages = []
+    summaries = []
+    runs = watch_folder(str(input_dir), [str(schedule)], str(tmp_path / 'reports'),
+                        output_format='csv', settle_seconds=0, use_cache=False,
+                        run_existing=True, max_runs=2, log=messages.append,
+                        on_run=summaries.append, sleep=sleep)
+
+    assert runs == 2
+    assert [summary['status'] for summary in summaries] == ['ok', 'ok']
+    assert summaries[1]['production_file'].endswith('erp2.csv')
+    errors = [message for message in messages if 'Error re-reading schedule' in message]
+    # Left unseen, so every settled poll tries the file again
+    assert len(errors) >= 2
+
+def test_unreadable_input_folder_is_retried(tmp_path):
+    input_dir = tmp_path / 'exports'
+    moved = tmp_path / 'exports.offline'
+    schedule = tmp_path / 'schedule.xlsx'
+    write_schedule(schedule)
+
+    polls = []
+
+    def sleep(_):
+        polls.append(None)
+        if len(polls) == 1:
+            # Share comes online after the watch started
+            input_dir.mkdir()
+        elif len(polls) == 2:
+            input_dir.rename(moved)
+        elif len(polls) == 3:
+            moved.rename(input_dir)
+            write_export(input_dir / 'erp1.csv')
+
+    messages = []
+    summaries = []
+    runs = watch_folder(str(input_dir), [str(schedule)], str(tmp_path / 'reports'),
+                        output_format='csv', settle_seconds=0, use_cache=False, max_runs=1,
+                        log=messages.append, on_run=summaries.append, sleep=sleep)
+
+    assert runs == 1
+    assert summaries[0]['status'] == 'ok'
+    errors = [message for message in messages if 'Cannot read input folder' in message]
+    assert len(errors) == 2